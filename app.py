@@ -1,32 +1,34 @@
 # In app.py (project root: /Millit_ERP/)
 import os
+import logging
 import click
-import sqlite3
-
-from sqlalchemy import event
-from sqlalchemy.engine import Engine
 
 from flask import Flask, request
+from sqlalchemy.engine import make_url
 from dotenv import load_dotenv
-from flask_migrate import Migrate
 from werkzeug.security import generate_password_hash
 
 from modules.shared.op_links import op_queue_url
-from routes.auth import auth_bp
-from routes.dashboard import dashboard_bp
-from modules import module_blueprints
+from modules import load_module_blueprints
 from database.models import db, User
+from database.engine import (
+    POOL_CONFIG_KEYS,
+    database_uri,
+    engine_options,
+    install_sqlite_profile,
+    check_sqlite_profile,
+    profile_mismatches,
+)
 from modules.shared.nav_registry import DEPT_NAV, infer_department_from_request
 from modules.shared.secondary_nav import resolve_secondary_tabs
+from modules.shared.services.sql_profiler import init_sql_profiler
+from modules.shared.services.metrics import init_metrics
+from modules.shared.services.app_logging import init_logging
+from modules.shared.services.startup import in_cli, wants_routes
 
 load_dotenv()
 
-event.listens_for(Engine, "connect")
-def _set_sqlite_pragma(dbapi_connection, connection_record):
-    if isinstance(dbapi_connection, sqlite3.Connection):
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON;")
-        cursor.close()
+log = logging.getLogger(__name__)
 
 def register_cli(app):
     @app.cli.command("create-admin")
@@ -49,14 +51,398 @@ def register_cli(app):
         db.session.commit()
         click.echo("Admin user created.")
 
+    @app.cli.command("search-reindex")
+    def search_reindex():
+        """Rebuild the global FTS5 search index from source tables."""
+        from modules.shared.services.search_index import rebuild_search_index
+
+        counts = rebuild_search_index()
+        if not counts:
+            click.echo("Search index requires SQLite (FTS5); nothing to do.")
+            return
+        db.session.commit()
+        for entity_type, n in counts.items():
+            click.echo(f"{entity_type}: {n}")
+
+    @app.cli.command("stock-import")
+    @click.argument("csv_path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--apply", "apply_", is_flag=True, help="Post to the ledger (default is a dry run).")
+    @click.option("--chunk-size", default=500, show_default=True)
+    def stock_import(csv_path, apply_, chunk_size):
+        """Import a cycle count / movement CSV (see stock_import_service)."""
+        from modules.inventory.services.stock_import_service import (
+            import_stock_csv,
+            STATUS_ERROR,
+        )
+
+        with open(csv_path, newline="", encoding="utf-8-sig") as fh:
+            report = import_stock_csv(
+                fh,
+                dry_run=not apply_,
+                source_ref=os.path.basename(csv_path),
+                chunk_size=chunk_size,
+            )
+
+        for r in report.rows:
+            if r.status == STATUS_ERROR:
+                click.echo(f"line {r.line_no}: {r.item_code or '?'}: {r.message}")
+
+        click.echo(
+            f"{'dry run' if report.dry_run else 'applied'}: {report.total} rows, "
+            f"{report.changed} changed, {report.unchanged} unchanged, "
+            f"{report.errors} errors, {report.posted} posted"
+        )
+
+    @app.cli.command("ops-inventory-check")
+    def ops_inventory_check():
+        """Post a blank -> fg_complete op chain through every progress route on a scratch DB; exit 1 if it does not net out."""
+        from modules.shared.services.op_inventory_check import PROGRESS, check_stage_chain
+
+        problems, routes = check_stage_chain(create_app)
+        for mode, endpoints in routes.items():
+            click.echo(f"{mode}: " + ", ".join(f"{k} via {e}" for (k, _d, _s), e in zip(PROGRESS, endpoints)))
+        for p in problems:
+            click.echo(f"!! {p}")
+        if problems:
+            raise SystemExit(1)
+        click.echo("ok: every route nets to fg_complete; balances match the ledger.")
+
+    @app.cli.command("inventory-reconcile")
+    @click.option("--full", is_flag=True, help="Scan every row instead of only entities touched since the last run.")
+    @click.option("--repair", type=click.Choice(["ledger", "cache"]), default=None,
+                  help="ledger: set qty_on_hand from the ledger; cache: post reconcile entries to match qty_on_hand.")
+    @click.option("--type", "entity_types", multiple=True,
+                  type=click.Choice(["part_inventory", "raw_stock", "bulk_hardware"]))
+    def inventory_reconcile(full, repair, entity_types):
+        """Compare stock ledger balances against cached qty_on_hand."""
+        from modules.inventory.services.reconcile_service import reconcile_inventory
+
+        report = reconcile_inventory(
+            incremental=not full,
+            trust=repair,
+            entity_types=list(entity_types) or None,
+        )
+
+        for m in report.mismatches:
+            tag = "orphan" if m.orphan else "mismatch"
+            click.echo(
+                f"{tag} {m.entity_type}#{m.entity_id}: cached={m.cached_qty:g} "
+                f"ledger={m.ledger_qty:g} diff={m.diff:+g}"
+            )
+
+        checked = ", ".join(f"{k}={v}" for k, v in report.checked.items())
+        click.echo(
+            f"run {report.run_id} ({report.mode}): checked {checked}; "
+            f"{len(report.mismatches) - len(report.orphans)} mismatches, "
+            f"{len(report.orphans)} orphans, {report.repaired} repaired"
+        )
+
+    @app.cli.command("drawing-thumbnails")
+    def drawing_thumbnails():
+        """Render missing first-page thumbnails for part drawings (hashes pre-blob files)."""
+        from database.models import PartDrawing
+        from modules.shared.services.pdf_thumbnails import backfill_drawing_hash, ensure_thumbnail, thumbnail_path
+
+        made = skipped = 0
+        for d in PartDrawing.query.order_by(PartDrawing.id.asc()).all():
+            abs_path = os.path.join(app.root_path, d.stored_path)
+            if not backfill_drawing_hash(d, abs_path):
+                skipped += 1
+                continue
+            if ensure_thumbnail(abs_path, thumbnail_path(d.content_sha256)):
+                made += 1
+            else:
+                skipped += 1
+        db.session.commit()
+        click.echo(f"{made} thumbnails ready, {skipped} skipped (missing file or no PDF renderer).")
+
+    @app.cli.command("cad-worker")
+    @click.option("--once", is_flag=True, help="Exit when the queue is empty.")
+    @click.option("--poll", "poll_seconds", default=2.0, show_default=True, help="Seconds between queue checks.")
+    @click.option("--max-jobs", type=int, default=None)
+    def cad_worker(once, poll_seconds, max_jobs):
+        """Process queued STEP uploads (cad_jobs)."""
+        from modules.assembly.services.cad_job_service import run_worker
+
+        ran = run_worker(once=once, poll_seconds=poll_seconds, max_jobs=max_jobs, log=click.echo)
+        click.echo(f"Processed {ran} CAD job(s).")
+
+    @app.cli.group("cad-cache")
+    def cad_cache():
+        """STEP parse cache (content hash + parser version + tolerance)."""
+
+    @cad_cache.command("warm")
+    @click.argument("step_paths", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+    def cad_cache_warm(step_paths):
+        """Parse STEP files into the cache without linking them."""
+        from modules.assembly.parser.parse_cache import warm
+
+        for path in step_paths:
+            key, cached = warm(path)
+            click.echo(f"{'hit ' if cached else 'new '} {key[:16]}  {path}")
+
+    @cad_cache.command("purge")
+    @click.option("--all", "purge_all_", is_flag=True, help="Remove every entry instead of trimming to the budget.")
+    @click.option("--max-bytes", type=int, default=None, help="Trim to this many bytes (default MERP_CAD_CACHE_MAX_BYTES).")
+    def cad_cache_purge(purge_all_, max_bytes):
+        """Evict least-recently-used entries."""
+        from modules.assembly.parser import parse_cache
+
+        if purge_all_:
+            removed, freed = parse_cache.purge_all()
+        else:
+            budget = parse_cache.max_bytes() if max_bytes is None else max_bytes
+            removed, freed = parse_cache.evict(budget)
+        click.echo(f"Removed {removed} entries ({freed / 1024 ** 2:.1f} MiB).")
+
+    @cad_cache.command("stats")
+    def cad_cache_stats():
+        from modules.assembly.parser.parse_cache import cache_stats
+
+        st = cache_stats()
+        click.echo(
+            f"{st['root']}: {st['entries']} entries, "
+            f"{st['bytes'] / 1024 ** 2:.1f} / {st['max_bytes'] / 1024 ** 2:.0f} MiB"
+        )
+
+    @app.cli.command("db-bootstrap")
+    def db_bootstrap():
+        """Create an empty database from the models and stamp it at the migration head."""
+        from flask_migrate import stamp
+        from modules.shared.services.search_index import ensure_search_index
+
+        db.create_all()
+        ensure_search_index()
+        db.session.commit()
+        stamp()
+        click.echo(f"Created {len(db.metadata.tables)} tables on {db.engine.dialect.name}; stamped head.")
+
+    @app.cli.command("db-copy")
+    @click.argument("target_url")
+    @click.option("--chunk-size", default=1000, show_default=True)
+    def db_copy(target_url, chunk_size):
+        """Copy every row from the configured database into TARGET_URL (bootstrapped, empty)."""
+        from sqlalchemy import create_engine
+        from database.portability import copy_database
+
+        target = create_engine(target_url)
+        counts = copy_database(db.engine, target, db.metadata, chunk_size=chunk_size, log=click.echo)
+        click.echo(f"Copied {sum(counts.values())} rows in {len(counts)} tables.")
+        if target.dialect.name == "sqlite":
+            click.echo("Run `flask search-reindex` against the target to rebuild its search index.")
+
+    @app.cli.command("synth-data")
+    @click.option("--seed", default=42, show_default=True)
+    @click.option("--scale", default=1.0, show_default=True, help="Multiplier for master data, orders, jobs and ops.")
+    @click.option("--progress-rows", default=1_000_000, show_default=True)
+    @click.option("--ledger-rows", default=500_000, show_default=True)
+    @click.option("--chunk", default=20_000, show_default=True, help="Rows per executemany batch.")
+    def synth_data(seed, scale, progress_rows, ledger_rows, chunk):
+        """Fill an empty database with a deterministic production-scale dataset (database/synthetic.py)."""
+        import time
+        from database.portability import reset_sequences
+        from database.synthetic import TABLES, SYNTH_PASSWORD, SynthConfig, SynthError, generate
+        from modules.shared.services.search_index import rebuild_search_index
+
+        cfg = SynthConfig(seed=seed, scale=scale, progress_rows=progress_rows,
+                          ledger_rows=ledger_rows, chunk=chunk)
+        t0 = time.perf_counter()
+        try:
+            with db.engine.begin() as conn:
+                report = generate(conn, cfg, log=click.echo)
+                if conn.dialect.name == "postgresql":
+                    reset_sequences(conn, [m.__table__ for m in TABLES])
+                indexed = rebuild_search_index(conn)
+        except SynthError as e:
+            raise click.ClickException(str(e))
+        dt = time.perf_counter() - t0
+        click.echo(
+            f"{report.total_rows:,} rows in {dt:.1f} s ({report.total_rows / dt:,.0f} rows/s); "
+            f"search index {sum(indexed.values()):,} docs. Users synth001.. / password '{SYNTH_PASSWORD}'."
+        )
+
+    @app.cli.group("bench")
+    def bench():
+        """Core service benchmarks (modules/shared/services/benchmarks.py)."""
 
+    @bench.command("run")
+    @click.option("--rounds", default=10, show_default=True)
+    @click.option("--warmup", default=1, show_default=True)
+    @click.option("-k", "patterns", multiple=True, help="Only cases whose name matches (glob or substring).")
+    @click.option("--step", "step_files", multiple=True, type=click.Path(exists=True, dir_okay=False),
+                  help="STEP file for the parse_step cases (repeatable).")
+    @click.option("--name", default=None, help="Label for the results file (default: git commit).")
+    @click.option("--save/--no-save", default=True, show_default=True)
+    def bench_run(rounds, warmup, patterns, step_files, name, save):
+        """Time every case; results go to MERP_BENCH_DIR as JSON."""
+        from modules.shared.services.benchmarks import default_cases, run_suite, save_results, select_cases
 
+        cases = select_cases(default_cases(list(step_files)), list(patterns))
+        doc = run_suite(cases, rounds=rounds, warmup=warmup, log=click.echo)
+        if save:
+            click.echo(f"Saved {save_results(doc, name)}")
 
+    @bench.command("compare")
+    @click.argument("base", required=False, type=click.Path(exists=True, dir_okay=False))
+    @click.argument("new", required=False, type=click.Path(exists=True, dir_okay=False))
+    @click.option("--threshold", default=10.0, show_default=True, help="Percent change that counts as a regression.")
+    @click.option("--stat", default="median", show_default=True, type=click.Choice(["min", "max", "mean", "median", "stddev"]))
+    def bench_compare(base, new, threshold, stat):
+        """Compare two result files (default: the two newest); exit 1 on a regression."""
+        from modules.shared.services.benchmarks import compare_results, latest_results, load_results
 
-def create_app():
+        if not (base and new):
+            latest = latest_results(2)
+            if len(latest) < 2:
+                raise click.ClickException("Need two saved runs (or pass BASE and NEW).")
+            base, new = latest
+        a, b = load_results(base), load_results(new)
+        click.echo(f"base {a.get('commit')} {a['datetime']}  →  new {b.get('commit')} {b['datetime']}  ({stat})")
+        if a.get("dataset") != b.get("dataset"):
+            click.echo("!! dataset row counts differ; timings are not comparable")
+
+        rows = compare_results(a, b, threshold_pct=threshold, stat=stat)
+        for c in rows:
+            if c.change_pct is None:
+                click.echo(f"{c.status:<11} {c.name}")
+                continue
+            click.echo(
+                f"{c.status:<11} {c.name:<46} {c.base * 1000:9.2f} → {c.new * 1000:9.2f} ms "
+                f"({c.change_pct:+6.1f}%)  {c.base_queries:.0f} → {c.new_queries:.0f} q"
+            )
+        regressed = [c for c in rows if c.status == "regressed"]
+        click.echo(f"{len(regressed)} regression(s) over {threshold:g}%.")
+        if regressed:
+            raise SystemExit(1)
+
+    @app.cli.group("startup")
+    def startup():
+        """create_app cold-start timing (fresh interpreter per run)."""
+
+    @startup.command("importtime")
+    @click.option("--top", default=20, show_default=True)
+    @click.option("--depth", default=1, show_default=True, help="Dotted parts to group packages by.")
+    @click.option("--lazy", is_flag=True, help="Skip blueprints, as CLI commands do.")
+    def startup_importtime(top, depth, lazy):
+        """Digest of `python -X importtime` for import app + create_app()."""
+        from modules.shared.services.startup import digest_by_package, run_importtime
+
+        rows = run_importtime(app.root_path, load_blueprints=not lazy)
+        total_us = sum(r.self_us for r in rows)
+        click.echo(f"{len(rows)} modules, {total_us / 1000:.0f} ms import time")
+        click.echo("\nby package (self ms):")
+        for pkg, us in list(digest_by_package(rows, depth).items())[:top]:
+            click.echo(f"  {us / 1000:8.1f}  {pkg}")
+        click.echo("\nslowest modules (cumulative ms):")
+        for r in sorted(rows, key=lambda r: -r.cumulative_us)[:top]:
+            click.echo(f"  {r.cumulative_us / 1000:8.1f}  {r.module}")
+
+    @startup.command("check")
+    @click.option("--runs", default=3, show_default=True)
+    @click.option("--budget-ms", type=float, default=None, help="Default MERP_STARTUP_BUDGET_MS.")
+    def startup_check(runs, budget_ms):
+        """Time fresh create_app (web and CLI modes); exit 1 when over budget or OCC/numpy got imported."""
+        from modules.shared.services.startup import measure_startup, median_run
+
+        budget = float(budget_ms if budget_ms is not None else app.config["MERP_STARTUP_BUDGET_MS"])
+        failed = False
+        for label, load in (("web (all blueprints)", True), ("cli (no blueprints)", False)):
+            r = median_run([measure_startup(app.root_path, load_blueprints=load) for _ in range(runs)])
+            over = r.total_ms > budget
+            failed = failed or over or bool(r.forbidden)
+            click.echo(
+                f"{'FAIL' if over else 'ok  '} {label:<22} import {r.import_ms:6.0f} ms + "
+                f"create_app {r.create_ms:5.0f} ms = {r.total_ms:6.0f} ms "
+                f"(budget {budget:.0f}, {r.rules} routes)"
+            )
+            if r.forbidden:
+                click.echo(f"FAIL {label}: imported at startup: {', '.join(r.forbidden)}")
+        if failed:
+            raise SystemExit(1)
+
+    @app.cli.group("db-profile")
+    def db_profile():
+        """Connection profile (database/engine.py)."""
+
+    @db_profile.command("show")
+    def db_profile_show():
+        """Print wanted vs effective SQLite pragmas and the engine options."""
+        report = check_sqlite_profile(app, db)
+        if not report:
+            click.echo(f"{db.engine.dialect.name}: no pragma profile.")
+        bad = profile_mismatches(report)
+        for name, (wanted, effective) in report.items():
+            click.echo(f"{'!!' if name in bad else 'ok'} {name}: wanted={wanted} effective={effective}")
+        click.echo(f"engine options: {app.config['SQLALCHEMY_ENGINE_OPTIONS']}")
+
+    @db_profile.command("ddl")
+    @click.option("--dialect", "dialect_name", type=click.Choice(["postgresql"]), default="postgresql", show_default=True)
+    def db_profile_ddl(dialect_name):
+        """Compile every model table for another backend (no server needed)."""
+        from database.portability import ddl_errors
+
+        errors = ddl_errors(db.metadata, dialect_name)
+        for table, err in errors.items():
+            click.echo(f"!! {table}: {err}")
+        click.echo(f"{len(db.metadata.tables) - len(errors)}/{len(db.metadata.tables)} tables compile for {dialect_name}.")
+
+    @db_profile.command("explain")
+    @click.option("--verbose", "-v", is_flag=True, help="Print every plan, not only regressions.")
+    def db_profile_explain(verbose):
+        """EXPLAIN the hot query catalog; exit 1 if one needs a full scan (database/query_plans.py)."""
+        from database.query_plans import check_plans
+
+        results = check_plans(db.engine)
+        for r in results:
+            click.echo(f"{'ok ' if r.ok else 'BAD'}  {r.query.name:<22} {r.query.source}")
+            for problem in r.problems:
+                click.echo(f"       !! {problem}")
+            if verbose or not r.ok:
+                for line in r.plan:
+                    click.echo(f"       | {line}")
+        bad = sum(1 for r in results if not r.ok)
+        click.echo(f"{len(results) - bad}/{len(results)} hot queries pass.")
+        if bad:
+            raise SystemExit(1)
+
+    @db_profile.command("bench")
+    @click.option("--threads", default=8, show_default=True)
+    @click.option("--seconds", default=3.0, show_default=True)
+    @click.option("--rows", "rows_per_commit", default=5, show_default=True, help="Inserts per transaction.")
+    def db_profile_bench(threads, seconds, rows_per_commit):
+        """Concurrent writers on a scratch DB: untuned defaults vs the configured profile."""
+        from database.engine import bench_concurrent_writers, sqlite_pragmas
+
+        runs = [
+            bench_concurrent_writers(None, label="before (defaults)", threads=threads,
+                                     seconds=seconds, rows_per_commit=rows_per_commit),
+            bench_concurrent_writers(sqlite_pragmas(app.config), label="after (profile)", threads=threads,
+                                     seconds=seconds, rows_per_commit=rows_per_commit),
+        ]
+        for r in runs:
+            click.echo(
+                f"{r.label:<18} {r.commits_per_sec:8.0f} commits/s  "
+                f"p95 {r.p95_ms:6.1f} ms  {r.locked_errors} 'database is locked'"
+            )
+
+
+
+
+
+def create_app(load_blueprints=None):
+    """load_blueprints=None: register routes unless a `flask` command that never serves pages is running."""
     app = Flask(__name__)
     app.secret_key = os.getenv("SECRET_KEY")
 
+    # Logging (modules/shared/services/app_logging.py): JSON lines in MERP_LOG_DIR (default instance/logs)
+    app.config.setdefault("MERP_LOG_DIR", os.getenv("MERP_LOG_DIR"))
+    app.config.setdefault("MERP_LOG_LEVEL", os.getenv("MERP_LOG_LEVEL", "INFO"))
+    app.config.setdefault("MERP_LOG_LEVELS", os.getenv("MERP_LOG_LEVELS", "werkzeug=WARNING"))
+    app.config.setdefault("MERP_LOG_CONSOLE_LEVEL", os.getenv("MERP_LOG_CONSOLE_LEVEL", "INFO"))
+    app.config.setdefault("MERP_LOG_MAX_BYTES", 20 * 1024 * 1024)
+    app.config.setdefault("MERP_LOG_BACKUPS", 5)
+    init_logging(app)
+
     @app.context_processor
     def inject_department_nav():
         dept = infer_department_from_request(request)
@@ -78,45 +464,108 @@ def create_app():
     
     app.jinja_env.globals["op_queue_url"] = op_queue_url
 
-    # ✅ Database path (env override for worktrees)
+    # ✅ Database URL (env override for worktrees / server databases, see database/engine.py)
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
-    db_path = os.getenv("MERP_DB_PATH") or os.path.join(
-        BASE_DIR, "instance", "database.db"
-    )
-    db_path = os.path.abspath(db_path)
-
-    # Ensure DB directory exists (safe for both cases)
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-
-    print("✅ DB:", db_path)
-    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+    db_uri = database_uri(BASE_DIR)
+    log.info("database", extra={"db_url": make_url(db_uri).render_as_string(hide_password=True)})
+    app.config["SQLALCHEMY_DATABASE_URI"] = db_uri
 
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+    # Engine / connection profile (database/engine.py); MERP_SQLITE_PRAGMAS overrides pragmas
+    for key, _ in POOL_CONFIG_KEYS:
+        if os.getenv(key):
+            app.config.setdefault(key, int(os.getenv(key)))
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(
+        app.config["SQLALCHEMY_DATABASE_URI"], app.config
+    )
+
     # Claim system v0
     app.config.setdefault("MERP_CLAIM_STALE_SECONDS", 2 * 60 * 60)  # 2 hours
+
+    # Reorder engine (modules/inventory/services/reorder_service.py)
+    app.config.setdefault("MERP_REORDER_LEAD_DAYS", 14)
+    app.config.setdefault("MERP_REORDER_COVER_DAYS", 30)
+    app.config.setdefault("MERP_REORDER_FULL_REFRESH_SECONDS", 15 * 60)
+
+    # Content-addressed uploads (modules/shared/services/blob_store.py); default instance/blobs
+    app.config.setdefault("MERP_BLOB_DIR", os.getenv("MERP_BLOB_DIR"))
+
+    # CAD upload mesh output: "binary" (manifest + .bin) or "json" (legacy)
+    app.config.setdefault("MERP_CAD_MESH_FORMAT", os.getenv("MERP_CAD_MESH_FORMAT", "binary"))
+
+    # STEP parse cache (modules/assembly/parser/parse_cache.py); dir defaults to instance/cad_parse_cache
+    app.config.setdefault("MERP_CAD_CACHE_DIR", os.getenv("MERP_CAD_CACHE_DIR"))
+    app.config.setdefault("MERP_CAD_CACHE_MAX_BYTES", int(os.getenv("MERP_CAD_CACHE_MAX_BYTES", 2 * 1024 ** 3)))
+    # STEP meshing processes; None = every core, 1 = serial
+    workers_env = os.getenv("MERP_CAD_PARSE_WORKERS")
+    app.config.setdefault("MERP_CAD_PARSE_WORKERS", int(workers_env) if workers_env else None)
+    # cad-worker: a running job's heartbeat is refreshed every HEARTBEAT seconds;
+    # one silent for STALE seconds belongs to a dead worker and is requeued
+    app.config.setdefault("MERP_CAD_JOB_HEARTBEAT_SECONDS", 30)
+    app.config.setdefault("MERP_CAD_JOB_STALE_SECONDS", 5 * 60)
+
+    # `flask startup check`: median cold import + create_app must stay under this
+    app.config.setdefault("MERP_STARTUP_BUDGET_MS", float(os.getenv("MERP_STARTUP_BUDGET_MS", 1500)))
+
+    # SQL profiler (modules/shared/services/sql_profiler.py): /admin/sql-profile
+    app.config.setdefault("MERP_SQL_PROFILE", os.getenv("MERP_SQL_PROFILE", "1") == "1")
+    app.config.setdefault("MERP_SQL_PROFILE_SAMPLE", float(os.getenv("MERP_SQL_PROFILE_SAMPLE", 0.1)))
+    app.config.setdefault("MERP_SQL_PROFILE_N1_THRESHOLD", 5)
+    app.config.setdefault("MERP_SQL_PROFILE_RING", 200)
+    app.config.setdefault("MERP_SQL_PROFILE_HEADER", os.getenv("MERP_SQL_PROFILE_HEADER") == "1")
+
+    # Metrics (modules/shared/services/metrics.py): /metrics; dir = aggregate across worker processes
+    app.config.setdefault("MERP_METRICS", os.getenv("MERP_METRICS", "1") == "1")
+    app.config.setdefault("MERP_METRICS_DIR", os.getenv("MERP_METRICS_DIR"))
+    app.config.setdefault("MERP_METRICS_FLUSH_SECONDS", 5)
+    app.config.setdefault("MERP_METRICS_TOKEN", os.getenv("MERP_METRICS_TOKEN"))
+
+    # Benchmark results (modules/shared/services/benchmarks.py); default instance/benchmarks
+    app.config.setdefault("MERP_BENCH_DIR", os.getenv("MERP_BENCH_DIR"))
     
     db.init_app(app)
+    install_sqlite_profile(app, db)
+    init_sql_profiler(app, db)
+    init_metrics(app)
     register_cli(app)
-    Migrate(app, db)
+    if in_cli():
+        # `flask db ...`; alembic is the largest import at startup, servers never need it
+        from flask_migrate import Migrate
+
+        Migrate(app, db)
 
     if os.getenv("MERP_CREATE_DB") == "1":
         with app.app_context():
             db.create_all()
+            from modules.shared.services.search_index import ensure_search_index
+            ensure_search_index()
+            db.session.commit()
 
+    # Startup self-check: effective pragmas (WAL can be refused, e.g. on network shares)
+    profile = check_sqlite_profile(app, db)
+    if profile:
+        log.info("sqlite profile", extra={"pragmas": {k: eff for k, (_, eff) in profile.items()}})
+        for name, (wanted, effective) in profile_mismatches(profile).items():
+            log.warning("sqlite pragma %s: wanted %s, got %s", name, wanted, effective)
 
+    # Register Blueprints (skipped for CLI commands that never render a page)
+    if load_blueprints is None:
+        load_blueprints = wants_routes()
+    if load_blueprints:
+        from routes.auth import auth_bp
+        from routes.dashboard import dashboard_bp
+        from routes.search import search_bp
+
+        app.register_blueprint(auth_bp)
+        app.register_blueprint(dashboard_bp)
+        app.register_blueprint(search_bp)
+
+        for name, blueprint, prefix in load_module_blueprints():
+            log.debug("register blueprint", extra={"blueprint": name, "url_prefix": prefix})
+            app.register_blueprint(blueprint, url_prefix=prefix)
 
-    # Register Blueprints
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(dashboard_bp)
-    
-    
-    for name, blueprint, prefix in module_blueprints:
-        print(f"🧠 Registering {name} → prefix: {prefix}, blueprint ID: {id(blueprint)}")
-        app.register_blueprint(blueprint, url_prefix=prefix)
-    
-    
     return app
 
 
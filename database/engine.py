@@ -0,0 +1,283 @@
+# File path: database/engine.py
+# V2 - Engine options + per-connection SQLite pragma profile; server database URLs
+"""
+Database URL (database_uri): MERP_DATABASE_URL, else DATABASE_URL, else the
+SQLite file at MERP_DB_PATH (default instance/database.db). Server URLs need
+their driver installed, e.g. postgresql+psycopg://user:pw@host/merp with
+psycopg, or postgresql://... with psycopg2.
+
+SQLite settings are per connection (journal_mode=WAL is the exception: it is
+stored in the file), so they are applied from a "connect" listener on the
+app's engine rather than once at startup.
+
+Default profile (override any key with MERP_SQLITE_PRAGMAS, a dict):
+
+    foreign_keys = ON
+    journal_mode = WAL       readers no longer block the writer (and vice versa)
+    busy_timeout = 5000      wait up to 5 s for the write lock instead of
+                             failing at once with "database is locked"
+    synchronous  = NORMAL    fsync at checkpoints only; safe with WAL
+    cache_size   = -20000    ~20 MB page cache per connection (negative = KiB)
+    mmap_size    = 256 MB
+    temp_store   = MEMORY
+
+Pool options go through SQLALCHEMY_ENGINE_OPTIONS (pool_pre_ping always on;
+MERP_DB_POOL_SIZE / MERP_DB_MAX_OVERFLOW / MERP_DB_POOL_TIMEOUT /
+MERP_DB_POOL_RECYCLE when set). Server backends get SERVER_POOL_DEFAULTS:
+each gunicorn/flask worker holds its own pool, so size it against the
+server's max_connections.
+
+check_sqlite_profile() reads the pragmas back; create_app logs them (and a
+warning per mismatch) so a file system that refuses WAL (network shares) is
+visible at startup.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from sqlalchemy import event
+
+DEFAULT_SQLITE_PRAGMAS: Dict[str, object] = {
+    "foreign_keys": "ON",
+    "journal_mode": "WAL",
+    "busy_timeout": 5000,
+    "synchronous": "NORMAL",
+    "cache_size": -20000,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+SERVER_POOL_DEFAULTS = {
+    "pool_size": 10,
+    "max_overflow": 20,
+    "pool_timeout": 30,
+    "pool_recycle": 30 * 60,   # drop connections before server/firewall idle cutoffs
+}
+
+# What PRAGMA <name> reads back as for the symbolic values above
+_READBACK = {
+    ("foreign_keys", "ON"): 1,
+    ("foreign_keys", "OFF"): 0,
+    ("synchronous", "OFF"): 0,
+    ("synchronous", "NORMAL"): 1,
+    ("synchronous", "FULL"): 2,
+    ("synchronous", "EXTRA"): 3,
+    ("temp_store", "DEFAULT"): 0,
+    ("temp_store", "FILE"): 1,
+    ("temp_store", "MEMORY"): 2,
+}
+
+
+def database_uri(base_dir: str) -> str:
+    url = os.getenv("MERP_DATABASE_URL") or os.getenv("DATABASE_URL")
+    if url:
+        # Heroku-style scheme; SQLAlchemy only knows "postgresql"
+        if url.startswith("postgres://"):
+            url = "postgresql://" + url[len("postgres://"):]
+        return url
+
+    db_path = os.getenv("MERP_DB_PATH") or os.path.join(base_dir, "instance", "database.db")
+    db_path = os.path.abspath(db_path)
+    # Ensure DB directory exists (safe for both cases)
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    return f"sqlite:///{db_path}"
+
+
+def is_sqlite(uri: str) -> bool:
+    return uri.startswith("sqlite")
+
+
+def sqlite_pragmas(config) -> Dict[str, object]:
+    """Default profile merged with MERP_SQLITE_PRAGMAS (a value of None drops that pragma)."""
+    merged = dict(DEFAULT_SQLITE_PRAGMAS)
+    merged.update(config.get("MERP_SQLITE_PRAGMAS") or {})
+    return {k: v for k, v in merged.items() if v is not None}
+
+
+def apply_pragmas(dbapi_connection, pragmas: Dict[str, object]) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value};")
+    finally:
+        cursor.close()
+
+
+POOL_CONFIG_KEYS = (
+    ("MERP_DB_POOL_SIZE", "pool_size"),
+    ("MERP_DB_MAX_OVERFLOW", "max_overflow"),
+    ("MERP_DB_POOL_TIMEOUT", "pool_timeout"),
+    ("MERP_DB_POOL_RECYCLE", "pool_recycle"),
+)
+
+
+def engine_options(uri: str, config) -> dict:
+    """SQLALCHEMY_ENGINE_OPTIONS for uri (explicit keys already in config win)."""
+    opts = {"pool_pre_ping": True}
+    if not is_sqlite(uri):
+        opts.update(SERVER_POOL_DEFAULTS)
+    for key, opt in POOL_CONFIG_KEYS:
+        if config.get(key) is not None:
+            opts[opt] = int(config[key])
+
+    if is_sqlite(uri):
+        # Let pysqlite wait too (seconds); busy_timeout covers statements after connect
+        busy_ms = sqlite_pragmas(config).get("busy_timeout", 0)
+        opts["connect_args"] = {"timeout": int(busy_ms) / 1000.0}
+
+    opts.update(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    return opts
+
+
+def install_sqlite_profile(app, db) -> None:
+    """Register the pragma listener on app's engine (no-op for other backends)."""
+    pragmas = sqlite_pragmas(app.config)
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name != "sqlite":
+            return
+
+        @event.listens_for(engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            if isinstance(dbapi_connection, sqlite3.Connection):
+                apply_pragmas(dbapi_connection, pragmas)
+
+
+def check_sqlite_profile(app, db) -> Dict[str, tuple]:
+    """{pragma: (wanted, effective)} as read back from a pooled connection."""
+    wanted = sqlite_pragmas(app.config)
+    out = {}
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name != "sqlite":
+            return out
+        with engine.connect() as conn:
+            for name, value in wanted.items():
+                effective = conn.exec_driver_sql(f"PRAGMA {name};").scalar()
+                out[name] = (value, effective)
+    return out
+
+
+def profile_mismatches(report: Dict[str, tuple]) -> Dict[str, tuple]:
+    bad = {}
+    for name, (wanted, effective) in report.items():
+        expected = _READBACK.get((name, str(wanted).upper()), wanted)
+        if isinstance(expected, str) and isinstance(effective, str):
+            same = expected.lower() == effective.lower()
+        else:
+            same = str(expected) == str(effective)
+        if not same:
+            bad[name] = (wanted, effective)
+    return bad
+
+
+# -----------------------------
+# Concurrent writer benchmark
+# -----------------------------
+
+@dataclass
+class WriterBenchResult:
+    label: str
+    threads: int
+    seconds: float
+    commits: int = 0
+    locked_errors: int = 0
+    latencies_ms: list = field(default_factory=list)
+
+    @property
+    def commits_per_sec(self) -> float:
+        return self.commits / self.seconds if self.seconds else 0.0
+
+    @property
+    def p95_ms(self) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+def bench_concurrent_writers(
+    pragmas: Optional[Dict[str, object]],
+    *,
+    label: str,
+    threads: int = 8,
+    seconds: float = 3.0,
+    rows_per_commit: int = 5,
+) -> WriterBenchResult:
+    """Hammer a scratch database with `threads` writers (plus one reader each).
+
+    pragmas=None is the baseline the app ran with before the profile:
+    rollback journal and pysqlite's default 5 s lock timeout (SQLAlchemy
+    passes no timeout of its own). Uses its own temp file; never touches the
+    app database.
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="merp-writers-")
+    path = os.path.join(tmp_dir, "bench.db")
+
+    def connect():
+        if pragmas is None:
+            return sqlite3.connect(path, isolation_level=None)
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        apply_pragmas(conn, pragmas)
+        return conn
+
+    setup = connect()
+    setup.execute(
+        "CREATE TABLE progress (id INTEGER PRIMARY KEY, station INTEGER, qty REAL, note TEXT)"
+    )
+    setup.close()
+
+    result = WriterBenchResult(label=label, threads=threads, seconds=seconds)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def writer(station: int):
+        conn = connect()
+        commits = locked = 0
+        lat = []
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for i in range(rows_per_commit):
+                    conn.execute(
+                        "INSERT INTO progress (station, qty, note) VALUES (?, ?, ?)",
+                        (station, float(i), "bench"),
+                    )
+                conn.execute("COMMIT")
+                commits += 1
+                lat.append((time.perf_counter() - t0) * 1000.0)
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) and "busy" not in str(e):
+                    raise
+                locked += 1
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+            # A reader per station (dashboard polling) competes for the file too
+            try:
+                conn.execute("SELECT COUNT(*) FROM progress WHERE station = ?", (station,)).fetchone()
+            except sqlite3.OperationalError:
+                locked += 1
+        conn.close()
+        with lock:
+            result.commits += commits
+            result.locked_errors += locked
+            result.latencies_ms.extend(lat)
+
+    workers = [threading.Thread(target=writer, args=(n,)) for n in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+    for name in os.listdir(tmp_dir):
+        os.remove(os.path.join(tmp_dir, name))
+    os.rmdir(tmp_dir)
+    return result
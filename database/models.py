@@ -192,6 +192,11 @@ class BuildDrawing(db.Model):
 
     filename = db.Column(db.String(260), nullable=False)
     stored_path = db.Column(db.String(500), nullable=False)
+
+    # Blob store (modules/shared/services/blob_store.py); NULL for pre-blob files
+    content_sha256 = db.Column(db.String(64), nullable=True, index=True)
+    size_bytes = db.Column(db.Integer, nullable=True)
+
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
 class PartDrawing(db.Model):
@@ -212,6 +217,10 @@ class PartDrawing(db.Model):
     filename = db.Column(db.String(260), nullable=False)
     stored_path = db.Column(db.String(500), nullable=False)
 
+    # Blob store (modules/shared/services/blob_store.py); NULL for pre-blob files
+    content_sha256 = db.Column(db.String(64), nullable=True, index=True)
+    size_bytes = db.Column(db.Integer, nullable=True)
+
     # Optional metadata (future-proof, zero cost now)
     drawing_type = db.Column(db.String(32))  # cad_pdf | step | dwg | image
     rev = db.Column(db.String(16), default="A")
@@ -339,6 +348,10 @@ class RoutingStep(db.Model):
 
     is_outsourced = db.Column(db.Boolean, default=False, nullable=False)
 
+    # PartInventory stage good qty lands in when this step reports progress
+    # (blank / mfg_wip / mfg_complete / ... / fg_complete). NULL = no inventory posting.
+    output_stage_key = db.Column(db.String(32), nullable=True)
+
     notes = db.Column(db.Text, nullable=True)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -385,6 +398,9 @@ class BuildOperation(db.Model):
 
     is_outsourced = db.Column(db.Boolean, default=False, nullable=False)
     vendor = db.Column(db.String(120))   # for outsourced ops later (heat treat)
+
+    # Snapshot of RoutingStep.output_stage_key (drives op-progress inventory postings)
+    output_stage_key = db.Column(db.String(32), nullable=True)
     notes = db.Column(db.Text)
     
     
@@ -407,12 +423,21 @@ class BuildOperation(db.Model):
     
     __table_args__ = (
         UniqueConstraint("build_id", "bom_item_id", "op_key", name="uq_build_bom_op"),
+        # Module queues: module_key + op_key IN (...) + released + open statuses
+        Index("ix_build_operations_queue", "module_key", "op_key", "is_released", "status"),
+        Index("ix_build_operations_bom_item_status", "bom_item_id", "status"),
+        # "My active ops"
+        Index("ix_build_operations_claimed_by_status", "claimed_by_user_id", "status"),
         {"sqlite_autoincrement": True},
     )
 
 class BuildOperationProgress(db.Model):
     __tablename__ = "build_operation_progress"
-    __table_args__ = {"sqlite_autoincrement": True}
+    __table_args__ = (
+        # Per-op history in time order (also serves build_operation_id-only lookups)
+        Index("ix_build_operation_progress_op_created", "build_operation_id", "created_at"),
+        {"sqlite_autoincrement": True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True, index=True)
@@ -427,7 +452,6 @@ class BuildOperationProgress(db.Model):
         db.Integer,
         db.ForeignKey("build_operations.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
     qty_done_delta = db.Column(db.Float, nullable=False, default=0.0)
@@ -553,15 +577,59 @@ class PartInventory(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+class PartReservation(db.Model):
+    """
+    Qty of a PartInventory bucket (part, stage_key, rev, config_key) held for a BOMItem.
+    Available-to-promise = PartInventory.qty_on_hand - sum(active reservations).
+    """
+    __tablename__ = "part_reservations"
+    __table_args__ = (
+        # ATP lookups: active reservations per inventory bucket
+        Index("ix_part_reservations_bucket", "part_id", "stage_key", "rev", "config_key", "status"),
+        Index("ix_part_reservations_build_status", "build_id", "status"),
+        {"sqlite_autoincrement": True},
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    part_id = db.Column(db.Integer, db.ForeignKey("parts.id"), nullable=False)
+    part = db.relationship("Part")
+
+    stage_key = db.Column(db.String(32), nullable=False)
+    rev = db.Column(db.String(16), nullable=False, default="A")
+    config_key = db.Column(db.String(64), nullable=True)
+
+    build_id = db.Column(db.Integer, db.ForeignKey("builds.id", ondelete="CASCADE"), nullable=False)
+    build = db.relationship("Build")
+
+    bom_item_id = db.Column(db.Integer, db.ForeignKey("bom_items.id", ondelete="CASCADE"), nullable=True, index=True)
+    bom_item = db.relationship("BOMItem")
+
+    # Set when the build came from a WO apply; netting credits an open WO with its own holds
+    work_order_id = db.Column(db.Integer, db.ForeignKey("work_orders.id"), nullable=True, index=True)
+
+    qty_reserved = db.Column(db.Float, nullable=False, default=0.0)
+
+    # active | released | consumed
+    status = db.Column(db.String(16), nullable=False, default="active")
+    note = db.Column(db.String(255), nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    released_at = db.Column(db.DateTime, nullable=True)
+
 class StockLedgerEntry(db.Model):
     __tablename__ = "stock_ledger"
-    __table_args__ = {"sqlite_autoincrement": True}
+    __table_args__ = (
+        # On-hand sums, history pages and reconcile scans (also serves entity_type-only filters)
+        Index("ix_stock_ledger_entity_created", "entity_type", "entity_id", "created_at"),
+        {"sqlite_autoincrement": True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
     # What kind of thing moved?
     # 'raw_stock' | 'bulk_hardware' | 'part_inventory'
-    entity_type = db.Column(db.String(32), nullable=False, index=True)
+    entity_type = db.Column(db.String(32), nullable=False)
     entity_id = db.Column(db.Integer, nullable=False, index=True)
 
     qty_delta = db.Column(db.Float, nullable=False)
@@ -579,6 +647,72 @@ class StockLedgerEntry(db.Model):
     created_by_user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+class InventoryReconcileRun(db.Model):
+    """
+    One ledger-vs-qty_on_hand reconciliation pass.
+    ledger_watermark / started_at bound the next incremental run of each
+    entity type listed in entity_types.
+    """
+    __tablename__ = "inventory_reconcile_runs"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    mode = db.Column(db.String(16), nullable=False, default="full")       # full | incremental
+    trust = db.Column(db.String(16), nullable=True)                       # ledger | cache (NULL = report only)
+    # Comma-separated entity types this run covered (NULL = all, runs before the column)
+    entity_types = db.Column(db.String(128), nullable=True)
+
+    # Highest stock_ledger.id visible when the run started
+    ledger_watermark = db.Column(db.Integer, nullable=False, default=0)
+
+    checked = db.Column(db.Integer, nullable=False, default=0)
+    mismatches = db.Column(db.Integer, nullable=False, default=0)
+    orphans = db.Column(db.Integer, nullable=False, default=0)
+    repaired = db.Column(db.Integer, nullable=False, default=0)
+
+    started_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+
+class CadJob(db.Model):
+    """
+    Background STEP parse (modules/assembly/services/cad_job_service.py).
+    Upload enqueues; `flask cad-worker` claims, parses and links.
+    """
+    __tablename__ = "cad_jobs"
+    __table_args__ = (
+        db.Index("ix_cad_jobs_status_id", "status", "id"),
+        {"sqlite_autoincrement": True},
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    status = db.Column(db.String(16), nullable=False, default="queued")   # queued | running | done | failed
+
+    filename = db.Column(db.String(255), nullable=False)                  # original upload name
+    content_sha256 = db.Column(db.String(64), nullable=True)              # blob store key
+    size_bytes = db.Column(db.Integer, nullable=True)
+
+    # Assembly to link on completion (no FK: assemblies live with the assembly module)
+    assembly_id = db.Column(db.Integer, nullable=True, index=True)
+
+    # Result
+    shapes_filename = db.Column(db.String(255), nullable=True)
+    part_count = db.Column(db.Integer, nullable=True)
+    cache_hit = db.Column(db.Boolean, nullable=False, default=False)
+    error = db.Column(db.Text, nullable=True)
+
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    worker = db.Column(db.String(64), nullable=True)
+
+    created_by_user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    # Refreshed by the running worker; a stale heartbeat means the worker died
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
 
 class WaterjetOperationDetail(db.Model):
     __tablename__ = "waterjet_operation_details"
@@ -765,6 +899,7 @@ class BOMHeader(db.Model):
     __tablename__ = "bom_headers"
     __table_args__ = (
         Index("ix_bom_headers_assembly_rev", "assembly_part_id", "rev"),
+        Index("ix_bom_headers_assembly_active", "assembly_part_id", "is_active"),
         {"sqlite_autoincrement": True},
     )
 
@@ -0,0 +1,98 @@
+# File path: database/portability.py
+# V1 - Cross-backend checks and SQLite → server database copy
+"""
+The migration chain starts from an existing schema (its first revision alters
+build_operation_progress), so a brand-new database is created from the models
+and stamped at head instead (`flask db-bootstrap`). Later revisions then run
+with `flask db upgrade` on either backend.
+
+ddl_errors() compiles every model table for another dialect without needing
+a server or driver, which catches type/default constructs that only SQLite
+accepts.
+
+copy_database() moves rows table by table in FK order (models' metadata),
+in chunks, then resets server sequences past the copied ids. The FTS5
+search index is SQLite-only and not copied: list filters fall back to their
+ILIKE scans and the global search page reports the index as unavailable.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+COPY_CHUNK = 1000
+
+DIALECTS = {
+    "postgresql": postgresql.dialect,
+}
+
+
+def ddl_errors(metadata, dialect_name: str = "postgresql") -> Dict[str, str]:
+    """{table: error} for tables whose CREATE TABLE / CREATE INDEX will not compile on dialect."""
+    dialect = DIALECTS[dialect_name]()
+    errors = {}
+    for table in metadata.sorted_tables:
+        try:
+            str(CreateTable(table).compile(dialect=dialect))
+            for index in table.indexes:
+                str(CreateIndex(index).compile(dialect=dialect))
+        except Exception as e:
+            errors[table.name] = f"{type(e).__name__}: {e}"
+    return errors
+
+
+def copy_database(
+    src_engine,
+    dst_engine,
+    metadata,
+    *,
+    chunk_size: int = COPY_CHUNK,
+    tables: Optional[List[str]] = None,
+    log: Callable[[str], None] = print,
+) -> Dict[str, int]:
+    """Copy rows for every metadata table from src to dst (dst tables must exist and be empty)."""
+    counts = {}
+    ordered = [t for t in metadata.sorted_tables if tables is None or t.name in tables]
+
+    with src_engine.connect() as src, dst_engine.begin() as dst:
+        for table in ordered:
+            existing = dst.execute(select(func.count()).select_from(table)).scalar()
+            if existing:
+                raise RuntimeError(f"Target table {table.name} already has {existing} rows.")
+
+            pk = list(table.primary_key.columns)
+            q = select(table).order_by(*pk) if pk else select(table)
+            result = src.execution_options(stream_results=True).execute(q)
+
+            n = 0
+            while True:
+                rows = result.fetchmany(chunk_size)
+                if not rows:
+                    break
+                dst.execute(insert(table), [dict(r._mapping) for r in rows])
+                n += len(rows)
+
+            counts[table.name] = n
+            log(f"{table.name}: {n}")
+
+        if dst.dialect.name == "postgresql":
+            reset_sequences(dst, ordered)
+    return counts
+
+
+def reset_sequences(conn, tables) -> None:
+    """Move each serial/identity sequence past max(id) after an explicit-id copy (PostgreSQL)."""
+    for table in tables:
+        if "id" not in table.c or not table.c.id.primary_key:
+            continue
+        conn.execute(
+            text(
+                "SELECT setval(pg_get_serial_sequence(:t, 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+            ),
+            {"t": table.name},
+        )
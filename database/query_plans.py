@@ -0,0 +1,259 @@
+# File path: database/query_plans.py
+# V1 - EXPLAIN catalog for the hot query shapes
+"""
+HOT_QUERIES lists the query shapes the queue pages, planning and the
+ledger run on every request. Each one mirrors the filter/order of the
+service or route named in its `source`, with sample values. The values do
+not need to exist; the planner decides from the shape.
+
+check_plans() runs EXPLAIN on each one and reports a regression when a
+table in `must_search` is read with a full scan (or, with `no_sort`, when
+the ORDER BY needs a temporary sort). Run it with `flask db-profile explain`
+after changing models, indexes or these queries. It exits non-zero on a
+regression.
+
+SQLite: EXPLAIN QUERY PLAN. "SCAN <table>" (with or without USING INDEX)
+reads every row or index entry; "SEARCH <table> USING ..." seeks into an index.
+
+PostgreSQL: plain EXPLAIN with enable_seqscan off, inside a transaction that
+is rolled back. An empty or small table is always seq-scanned, so forcing
+the planner off seq scans shows whether an index can serve the shape at all.
+A "Seq Scan on <table>" that is still there means no index can.
+
+part_inventory has no index of its own here: get_atp_map's part_id IN
+(...) shape is already served by uq_part_inventory_part_stage_rev_cfg
+(part_id leads). The catalog keeps that verified.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, List, Tuple
+
+from sqlalchemy import func, select, text
+
+from database.models import (
+    BOMHeader,
+    BuildOperation,
+    BuildOperationProgress,
+    CadJob,
+    PartInventory,
+    PartReservation,
+    StockLedgerEntry,
+)
+from modules.shared.status import TERMINAL_STATUSES
+
+
+@dataclass
+class HotQuery:
+    name: str
+    source: str
+    build: Callable[[], object]
+    must_search: Tuple[str, ...]
+    no_sort: bool = False
+
+
+@dataclass
+class PlanResult:
+    query: HotQuery
+    plan: List[str]
+    problems: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery(
+        "module_queue",
+        "manufacturing/*/routes/queue.py",
+        lambda: select(BuildOperation.id).where(
+            BuildOperation.module_key == "heat_treat",
+            BuildOperation.op_key.in_(["heat_treat", "in_house_ht"]),
+            BuildOperation.is_released.is_(True),
+            BuildOperation.status.in_(["queue", "in_progress", "blocked"]),
+        ),
+        ("build_operations",),
+    ),
+    HotQuery(
+        "my_active_ops",
+        "shared/services/build_op_queries.py:query_my_active_ops",
+        lambda: select(BuildOperation.id).where(
+            BuildOperation.claimed_by_user_id == 1,
+            ~BuildOperation.status.in_(TERMINAL_STATUSES),
+        ),
+        ("build_operations",),
+    ),
+    HotQuery(
+        "ops_for_bom_item",
+        "jobs_management/services/routing.py, build_bom_service.py",
+        lambda: select(BuildOperation.id).where(
+            BuildOperation.bom_item_id == 1,
+            BuildOperation.status == "queue",
+        ),
+        ("build_operations",),
+    ),
+    HotQuery(
+        "op_progress_history",
+        "admin/routes/op_detail.py",
+        lambda: (
+            select(BuildOperationProgress.id)
+            .where(BuildOperationProgress.build_operation_id == 1)
+            .order_by(BuildOperationProgress.created_at.asc())
+        ),
+        ("build_operation_progress",),
+        no_sort=True,
+    ),
+    HotQuery(
+        "progress_for_ops",
+        "jobs_management/routes/ops_progress.py, daily_update.py",
+        lambda: (
+            select(BuildOperationProgress.id)
+            .where(BuildOperationProgress.build_operation_id.in_([1, 2, 3]))
+            .order_by(BuildOperationProgress.created_at.desc(), BuildOperationProgress.id.desc())
+        ),
+        ("build_operation_progress",),
+    ),
+    HotQuery(
+        "stock_history",
+        "inventory/services/stock_history_service.py:get_stock_history",
+        lambda: (
+            select(StockLedgerEntry.id)
+            .where(StockLedgerEntry.entity_type == "raw_stock", StockLedgerEntry.entity_id == 1)
+            .order_by(StockLedgerEntry.created_at.desc(), StockLedgerEntry.id.desc())
+            .limit(250)
+        ),
+        ("stock_ledger",),
+        no_sort=True,
+    ),
+    HotQuery(
+        "ledger_on_hand_map",
+        "inventory/services/stock_ledger_service.py:get_on_hand_map",
+        lambda: (
+            select(StockLedgerEntry.entity_id, func.sum(StockLedgerEntry.qty_delta))
+            .where(StockLedgerEntry.entity_type == "raw_stock", StockLedgerEntry.entity_id.in_([1, 2, 3]))
+            .group_by(StockLedgerEntry.entity_id)
+        ),
+        ("stock_ledger",),
+    ),
+    HotQuery(
+        "ledger_sums_by_type",
+        "inventory/services/reconcile_service.py:_ledger_sums",
+        lambda: (
+            select(StockLedgerEntry.entity_id, func.sum(StockLedgerEntry.qty_delta))
+            .where(StockLedgerEntry.entity_type == "raw_stock")
+            .group_by(StockLedgerEntry.entity_id)
+        ),
+        ("stock_ledger",),
+        no_sort=True,
+    ),
+    HotQuery(
+        "atp_on_hand",
+        "inventory/services/reservation_service.py:get_atp_map",
+        lambda: select(
+            PartInventory.part_id,
+            PartInventory.stage_key,
+            PartInventory.rev,
+            PartInventory.config_key,
+            PartInventory.qty_on_hand,
+        ).where(PartInventory.part_id.in_([1, 2, 3])),
+        ("part_inventory",),
+    ),
+    HotQuery(
+        "sum_reserved",
+        "inventory/services/reservation_service.py:sum_reserved",
+        lambda: select(func.sum(PartReservation.qty_reserved)).where(
+            PartReservation.part_id == 1,
+            PartReservation.stage_key.in_(["mfg_complete", "finish_complete"]),
+            PartReservation.status == "active",
+            PartReservation.rev == "A",
+            PartReservation.config_key.is_(None),
+        ),
+        ("part_reservations",),
+    ),
+    HotQuery(
+        "active_bom",
+        "inventory/services/planning.py:_get_active_bom",
+        lambda: select(BOMHeader.id).where(
+            BOMHeader.assembly_part_id == 1,
+            BOMHeader.rev == "A",
+            BOMHeader.is_active.is_(True),
+        ),
+        ("bom_headers",),
+    ),
+    HotQuery(
+        "active_bom_any_rev",
+        "jobs_management/routes/detail.py, work_orders/services/apply.py",
+        lambda: select(BOMHeader.id).where(
+            BOMHeader.assembly_part_id == 1,
+            BOMHeader.is_active.is_(True),
+        ),
+        ("bom_headers",),
+    ),
+    HotQuery(
+        "cad_job_claim",
+        "assembly/services/cad_job_service.py",
+        lambda: (
+            select(CadJob.id)
+            .where(CadJob.status == "queued")
+            .order_by(CadJob.id.asc())
+            .limit(1)
+        ),
+        ("cad_jobs",),
+        no_sort=True,
+    ),
+]
+
+
+_RE_SQLITE_SCAN = re.compile(r"^SCAN (\w+)")
+_RE_PG_SEQ_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def _sql(conn, stmt) -> str:
+    return str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def explain(conn, stmt) -> List[str]:
+    """Plan lines for stmt on this connection's backend."""
+    sql = _sql(conn, stmt)
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        return [r[-1] for r in rows]
+    if conn.dialect.name == "postgresql":
+        trans = conn.begin_nested() if conn.in_transaction() else conn.begin()
+        try:
+            conn.execute(text("SET LOCAL enable_seqscan = off"))
+            return [r[0] for r in conn.exec_driver_sql(f"EXPLAIN {sql}").fetchall()]
+        finally:
+            trans.rollback()
+    raise NotImplementedError(f"No plan check for {conn.dialect.name}")
+
+
+def plan_problems(dialect_name: str, plan: List[str], query: HotQuery) -> List[str]:
+    problems = []
+    for line in plan:
+        detail = line.strip()
+        if dialect_name == "sqlite":
+            m = _RE_SQLITE_SCAN.match(detail)
+            if m and m.group(1) in query.must_search:
+                problems.append(f"full scan: {detail}")
+            elif query.no_sort and detail.startswith("USE TEMP B-TREE"):
+                problems.append(f"sort: {detail}")
+        else:
+            m = _RE_PG_SEQ_SCAN.search(detail)
+            if m and m.group(1) in query.must_search:
+                problems.append(f"full scan: {detail}")
+            elif query.no_sort and re.match(r"(->\s*)?(Incremental )?Sort\b", detail):
+                problems.append(f"sort: {detail}")
+    return problems
+
+
+def check_plans(engine, queries: List[HotQuery] = None) -> List[PlanResult]:
+    results = []
+    with engine.connect() as conn:
+        for q in queries or HOT_QUERIES:
+            plan = explain(conn, q.build())
+            results.append(PlanResult(q, plan, plan_problems(conn.dialect.name, plan, q)))
+    return results
@@ -0,0 +1,553 @@
+# File path: database/synthetic.py
+# V1 - Deterministic production-scale dataset generator
+"""
+generate(conn, SynthConfig(...)) fills an empty database with a shop-sized
+dataset for performance work (`flask synth-data`).
+
+Volumes at scale 1.0:
+
+    parts 5,000 (assemblies / sub-assemblies / components / hardware / raw)
+    bom_headers ~1,300 (two levels; some assemblies have an inactive older rev)
+    routing_headers ~3,000, steps from ROUTING_STEP_PRESETS
+    work_orders 500, jobs 1,500, builds ~3,000, bom_items ~19,000
+    build_operations ~33,000
+    build_operation_progress  progress_rows (default 1,000,000)
+    stock_ledger              ledger_rows   (default 500,000)
+
+Row counts are fixed by the config. Values come from one random.Random(seed),
+and timestamps are offsets back from a fixed anchor date. The same seed and
+config therefore give the same database. Records stay consistent with each
+other:
+  - op qty_done equals the sum of its progress deltas
+  - qty_on_hand on raw_stock / bulk_hardware / part_inventory equals the
+    sum of that entity's ledger entries (`flask inventory-reconcile` finds
+    nothing)
+  - BOM items and ops follow the active BOMs and routings
+
+Rows go in as Core executemany batches of `chunk` rows with explicit ids. No
+ORM objects are built, so the search index (kept in sync by an ORM flush
+hook) is rebuilt once at the end. Every table written here must be empty
+beforehand. No commit here.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import func, select
+from werkzeug.security import generate_password_hash
+
+from database.models import (
+    BOMHeader,
+    BOMItem,
+    BOMLine,
+    Build,
+    BuildOperation,
+    BuildOperationProgress,
+    BulkHardware,
+    Customer,
+    Job,
+    Part,
+    PartInventory,
+    PartType,
+    RawStock,
+    RoutingHeader,
+    RoutingStep,
+    StockLedgerEntry,
+    User,
+    WorkOrder,
+    WorkOrderLine,
+)
+from modules.inventory.config.routing_presets import ROUTING_STEP_PRESETS
+from modules.shared.status import (
+    STATUS_BLOCKED,
+    STATUS_CANCELLED,
+    STATUS_COMPLETED,
+    STATUS_IN_PROGRESS,
+    STATUS_QUEUE,
+)
+
+ANCHOR = datetime(2026, 1, 1, 8, 0, 0)
+HISTORY_DAYS = 730
+
+SYNTH_PASSWORD = "synthetic"
+
+# key, name, category_key, code
+PART_TYPES = [
+    ("knife", "Knife", "assembly", "KN"),
+    ("kit", "Kit", "assembly", "KT"),
+    ("handle_assy", "Handle Assembly", "sub_assembly", "HA"),
+    ("sheath_assy", "Sheath Assembly", "sub_assembly", "SA"),
+    ("blade", "Blade", "component", "BL"),
+    ("scale", "Handle Scale", "component", "SC"),
+    ("liner", "Liner", "component", "LN"),
+    ("bolster", "Bolster", "component", "BO"),
+    ("pin", "Pin", "hardware", "PN"),
+    ("screw", "Screw", "hardware", "SW"),
+    ("bar_stock", "Bar Stock", "raw", "BS"),
+    ("sheet_stock", "Sheet Stock", "raw", "SS"),
+]
+
+TYPE_NAME = {key: name for key, name, _cat, _code in PART_TYPES}
+
+# Share of parts per category at any scale
+CATEGORY_SHARE = {
+    "assembly": 0.06,
+    "sub_assembly": 0.14,
+    "component": 0.60,
+    "hardware": 0.14,
+    "raw": 0.06,
+}
+
+# Routings by component type: (one cut op, middle ops, finishing ops)
+CUT_OPS = ("waterjet_cut", "laser_cut", "edm_cut", "bandsaw_cut", "tablesaw_cut")
+ROUTE_SHAPES = {
+    "blade": (("surface_grind", "cnc_profile"), ("heat_treat", "in_house_ht"), ("bevel_grind",)),
+    "scale": (("cnc_profile",), (), ()),
+    "liner": (("surface_grind", "cnc_profile"), (), ()),
+    "bolster": (("cnc_profile",), ("heat_treat",), ()),
+}
+
+MATERIALS = [
+    ("steel", "Magnacut"), ("steel", "AEB-L"), ("steel", "S35VN"), ("steel", "14C28N"),
+    ("titanium", "Ti-6Al-4V"), ("g10", None), ("micarta", None), ("cf", None), ("wood", "Desert Ironwood"),
+]
+WORDS = [
+    "Ranger", "Summit", "Falcon", "Drift", "Harbor", "Ember", "Granite", "Cedar", "Nomad",
+    "Atlas", "Vector", "Talon", "Ridge", "Warden", "Pilot", "Anvil", "Marlin", "Badger",
+]
+
+WO_STATUSES = (("open", 0.3), ("in_progress", 0.3), ("complete", 0.35), ("cancelled", 0.05))
+LEDGER_SPLIT = (("part_inventory", 0.5), ("bulk_hardware", 0.3), ("raw_stock", 0.2))
+
+
+class SynthError(RuntimeError):
+    pass
+
+
+@dataclass
+class SynthConfig:
+    seed: int = 42
+    scale: float = 1.0
+    progress_rows: int = 1_000_000
+    ledger_rows: int = 500_000
+    chunk: int = 20_000
+
+    def n(self, base: int, minimum: int = 1) -> int:
+        return max(minimum, int(round(base * self.scale)))
+
+
+@dataclass
+class SynthReport:
+    rows: Dict[str, int] = field(default_factory=dict)
+    seconds: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.rows.values())
+
+
+TABLES = [
+    User, Customer, PartType, Part, RoutingHeader, RoutingStep, BOMHeader, BOMLine,
+    WorkOrder, WorkOrderLine, Job, Build, BOMItem, BuildOperation, BuildOperationProgress,
+    RawStock, BulkHardware, PartInventory, StockLedgerEntry,
+]
+
+
+def _pick_weighted(rng: random.Random, choices) -> str:
+    r = rng.random()
+    acc = 0.0
+    for value, weight in choices:
+        acc += weight
+        if r < acc:
+            return value
+    return choices[-1][0]
+
+
+def _ago(days: float) -> datetime:
+    return ANCHOR - timedelta(days=days)
+
+
+class _Writer:
+    """Chunked Core executemany per table; counts rows and time into the report."""
+
+    def __init__(self, conn, cfg: SynthConfig, report: SynthReport, log: Callable[[str], None]):
+        self.conn = conn
+        self.cfg = cfg
+        self.report = report
+        self.log = log
+
+    def write(self, model, rows: Iterable[dict]) -> int:
+        table = model.__table__
+        stmt = table.insert()
+        t0 = time.perf_counter()
+        n = 0
+        batch: List[dict] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.cfg.chunk:
+                self.conn.execute(stmt, batch)
+                n += len(batch)
+                batch = []
+        if batch:
+            self.conn.execute(stmt, batch)
+            n += len(batch)
+        dt = time.perf_counter() - t0
+        self.report.rows[table.name] = self.report.rows.get(table.name, 0) + n
+        self.report.seconds[table.name] = self.report.seconds.get(table.name, 0.0) + dt
+        self.log(f"{table.name:<26} {n:>10,} rows  {dt:6.1f} s")
+        return n
+
+
+def check_empty(conn) -> None:
+    busy = [
+        m.__tablename__ for m in TABLES
+        if conn.execute(select(func.count()).select_from(m.__table__)).scalar()
+    ]
+    if busy:
+        raise SynthError(f"Tables already have rows: {', '.join(busy)}. Use an empty (bootstrapped) database.")
+
+
+def generate(conn, cfg: SynthConfig, log: Callable[[str], None] = print) -> SynthReport:
+    check_empty(conn)
+    rng = random.Random(cfg.seed)
+    report = SynthReport()
+    w = _Writer(conn, cfg, report, log)
+
+    # -----------------------------
+    # People
+    # -----------------------------
+    pw = generate_password_hash(SYNTH_PASSWORD)
+    n_users = cfg.n(20, 2)
+    w.write(User, (
+        {"id": i, "username": f"synth{i:03d}", "password_hash": pw, "role": "admin" if i == 1 else "employee"}
+        for i in range(1, n_users + 1)
+    ))
+    user_ids = list(range(1, n_users + 1))
+
+    n_customers = cfg.n(200)
+    w.write(Customer, (
+        {"id": i, "name": f"{rng.choice(WORDS)} Outfitters {i:04d}", "email": f"buyer{i}@example.com",
+         "created_at": _ago(HISTORY_DAYS + rng.random() * 365)}
+        for i in range(1, n_customers + 1)
+    ))
+
+    # -----------------------------
+    # Part master
+    # -----------------------------
+    w.write(PartType, (
+        {"id": i, "key": key, "name": name, "category_key": cat, "code": code, "created_at": _ago(HISTORY_DAYS + 30)}
+        for i, (key, name, cat, code) in enumerate(PART_TYPES, start=1)
+    ))
+    types_by_cat: Dict[str, List[Tuple[int, str, str]]] = {}
+    for i, (key, _name, cat, code) in enumerate(PART_TYPES, start=1):
+        types_by_cat.setdefault(cat, []).append((i, key, code))
+
+    n_parts = cfg.n(5000, 50)
+    parts_by_cat: Dict[str, List[int]] = {cat: [] for cat in CATEGORY_SHARE}
+    part_type_key: Dict[int, str] = {}
+    part_rows = []
+    pid = 0
+    for cat, share in CATEGORY_SHARE.items():
+        for _ in range(max(2, int(n_parts * share))):
+            pid += 1
+            type_id, key, code = rng.choice(types_by_cat[cat])
+            parts_by_cat[cat].append(pid)
+            part_type_key[pid] = key
+            part_rows.append({
+                "id": pid,
+                "part_number": f"{code}-{pid:06d}",
+                "name": f"{rng.choice(WORDS)} {TYPE_NAME[key]}",
+                "part_type_id": type_id,
+                "status": "active" if rng.random() < 0.9 else "draft",
+                "unit": "ea",
+                "created_at": _ago(HISTORY_DAYS * rng.random() + 30),
+            })
+    w.write(Part, part_rows)
+    part_number = {r["id"]: r["part_number"] for r in part_rows}
+    part_name = {r["id"]: r["name"] for r in part_rows}
+
+    # -----------------------------
+    # Routings (components)
+    # -----------------------------
+    routing_steps: Dict[int, List[dict]] = {}   # part_id → steps (sequence order)
+    header_rows, step_rows = [], []
+    step_id = 0
+    for rid, part_id in enumerate(parts_by_cat["component"], start=1):
+        middle, heat, finish = ROUTE_SHAPES.get(part_type_key[part_id], (("cnc_profile",), (), ()))
+        op_keys = [rng.choice(CUT_OPS)]
+        op_keys += [k for k in middle if rng.random() < 0.85] or [middle[0]]
+        if heat:
+            op_keys.append(rng.choice(heat))
+        op_keys += list(finish)
+        created = _ago(HISTORY_DAYS * rng.random() + 20)
+        header_rows.append({"id": rid, "part_id": part_id, "rev": "A", "is_active": True,
+                            "created_at": created, "updated_at": created})
+        steps = []
+        for op_key in op_keys:
+            preset = ROUTING_STEP_PRESETS[op_key]
+            step_id += 1
+            steps.append({
+                "id": step_id, "routing_id": rid, "op_key": op_key, "op_name": preset["op_name"].strip(),
+                "module_key": preset["module_key"], "sequence": preset["sequence"],
+                "is_outsourced": preset["is_outsourced"], "output_stage_key": preset["output_stage_key"],
+                "created_at": created, "updated_at": created,
+            })
+        # Last step finishes the part
+        steps[-1]["output_stage_key"] = "mfg_complete"
+        routing_steps[part_id] = steps
+        step_rows.extend(steps)
+    w.write(RoutingHeader, header_rows)
+    w.write(RoutingStep, step_rows)
+
+    # -----------------------------
+    # BOMs: sub-assemblies (components + hardware), assemblies (sub-assemblies + components + hardware)
+    # -----------------------------
+    comps, hw, subs = parts_by_cat["component"], parts_by_cat["hardware"], parts_by_cat["sub_assembly"]
+    bom_rows, line_rows = [], []
+    active_lines: Dict[int, List[Tuple[int, float, str]]] = {}   # assembly part → [(component, qty_per, make_method)]
+    bid = lid = 0
+
+    def add_bom(assembly_id: int, picks: List[Tuple[int, float, str]]) -> None:
+        nonlocal bid, lid
+        revs = ["A", "B"] if rng.random() < 0.25 else ["A"]
+        for rev in revs:
+            bid += 1
+            created = _ago(HISTORY_DAYS * rng.random() + 10)
+            is_active = rev == revs[-1]
+            bom_rows.append({"id": bid, "assembly_part_id": assembly_id, "rev": rev, "is_active": is_active,
+                             "created_at": created, "updated_at": created})
+            for line_no, (comp_id, qty_per, method) in enumerate(picks, start=1):
+                lid += 1
+                line_rows.append({"id": lid, "bom_id": bid, "component_part_id": comp_id, "qty_per": qty_per,
+                                  "line_no": line_no, "make_method": method,
+                                  "created_at": created, "updated_at": created})
+        active_lines[assembly_id] = picks
+
+    def make_method() -> str:
+        return "OUTSOURCE" if rng.random() < 0.05 else "MAKE"
+
+    for sub_id in subs:
+        picks = [(c, float(rng.choice((1, 1, 2))), make_method()) for c in rng.sample(comps, rng.randint(2, 4))]
+        picks += [(h, float(rng.randint(2, 6)), "BUY") for h in rng.sample(hw, rng.randint(0, 2))]
+        add_bom(sub_id, picks)
+    for assy_id in parts_by_cat["assembly"]:
+        picks = [(s, 1.0, "MAKE") for s in rng.sample(subs, rng.randint(1, 2))]
+        picks += [(c, float(rng.choice((1, 1, 2))), make_method()) for c in rng.sample(comps, rng.randint(2, 5))]
+        picks += [(h, float(rng.randint(1, 4)), "BUY") for h in rng.sample(hw, rng.randint(0, 3))]
+        add_bom(assy_id, picks)
+    w.write(BOMHeader, bom_rows)
+    w.write(BOMLine, line_rows)
+    active_bom_id = {r["assembly_part_id"]: r["id"] for r in bom_rows if r["is_active"]}
+
+    # -----------------------------
+    # Work orders
+    # -----------------------------
+    assemblies = parts_by_cat["assembly"]
+    n_wos = cfg.n(500)
+    wo_rows, wol_rows = [], []
+    wol_id = 0
+    for wo_id in range(1, n_wos + 1):
+        created = _ago(HISTORY_DAYS * (1 - wo_id / (n_wos + 1)) + rng.random())
+        wo_rows.append({"id": wo_id, "customer_id": rng.randint(1, n_customers), "wo_number": f"WO-{wo_id:06d}",
+                        "status": _pick_weighted(rng, WO_STATUSES), "title": f"{rng.choice(WORDS)} order",
+                        "created_at": created, "updated_at": created})
+        for line_no, part_id in enumerate(rng.sample(assemblies, min(len(assemblies), rng.randint(1, 4))), start=1):
+            wol_id += 1
+            wol_rows.append({"id": wol_id, "work_order_id": wo_id, "part_id": part_id, "line_no": line_no,
+                             "part_number": part_number[part_id], "name": part_name[part_id],
+                             "qty_requested": float(rng.randint(1, 40)), "make_method": "MAKE",
+                             "source": "manual", "created_at": created, "updated_at": created})
+    w.write(WorkOrder, wo_rows)
+    w.write(WorkOrderLine, wol_rows)
+
+    # -----------------------------
+    # Jobs → builds → BOM items → operations
+    # -----------------------------
+    n_jobs = cfg.n(1500)
+    job_rows, build_rows, item_rows, op_rows = [], [], [], []
+    build_id = item_id = op_id = 0
+    for job_id in range(1, n_jobs + 1):
+        age = HISTORY_DAYS * (1 - job_id / (n_jobs + 1))     # older ids first
+        created = _ago(age + rng.random())
+        # Progress through the routing: old jobs are done, new ones just started
+        done_frac = min(1.0, max(0.0, age / 120.0 + rng.uniform(-0.2, 0.2)))
+        archived = age > 240 and rng.random() < 0.6
+        job_rows.append({
+            "id": job_id, "customer_id": rng.randint(1, n_customers), "job_number": f"J-{job_id:06d}",
+            "title": f"{rng.choice(WORDS)} run", "status": "complete" if done_frac >= 1.0 else "in_progress",
+            "priority": rng.choice(("normal", "normal", "high", "low")),
+            "due_date": (created + timedelta(days=rng.randint(14, 90))).date(),
+            "created_at": created, "updated_at": created, "is_archived": archived,
+            "archived_at": created + timedelta(days=200) if archived else None,
+        })
+        for _ in range(rng.randint(1, 3)):
+            build_id += 1
+            assy_id = rng.choice(assemblies)
+            qty = rng.randint(1, 50)
+            build_rows.append({
+                "id": build_id, "job_id": job_id, "name": f"{part_name[assy_id]} x{qty}",
+                "status": "complete" if done_frac >= 1.0 else "in_progress", "assembly_part_id": assy_id,
+                "qty_ordered": qty, "qty_completed": qty if done_frac >= 1.0 else 0, "created_at": created,
+            })
+            for line_no, (comp_id, qty_per, _method) in enumerate(active_lines[assy_id], start=1):
+                item_id += 1
+                planned = qty_per * qty
+                item_rows.append({
+                    "id": item_id, "build_id": build_id, "bom_header_id": active_bom_id[assy_id],
+                    "part_id": comp_id, "line_no": line_no, "part_number": part_number[comp_id],
+                    "name": part_name[comp_id], "qty": planned, "qty_per": qty_per, "qty_planned": planned,
+                    "source": "template", "created_at": created,
+                })
+                steps = routing_steps.get(comp_id)
+                if not steps:
+                    continue
+                n_done = int(round(done_frac * len(steps)))
+                for idx, step in enumerate(steps):
+                    op_id += 1
+                    if idx < n_done:
+                        status, qty_done = STATUS_COMPLETED, planned
+                    elif idx == n_done:
+                        status = _pick_weighted(rng, ((STATUS_IN_PROGRESS, 0.5), (STATUS_QUEUE, 0.4),
+                                                      (STATUS_BLOCKED, 0.07), (STATUS_CANCELLED, 0.03)))
+                        qty_done = float(rng.randint(0, int(planned))) if status == STATUS_IN_PROGRESS else 0.0
+                    else:
+                        status, qty_done = STATUS_QUEUE, 0.0
+                    claimed = rng.choice(user_ids) if status == STATUS_IN_PROGRESS and rng.random() < 0.7 else None
+                    op_created = created + timedelta(hours=idx)
+                    op_rows.append({
+                        "id": op_id, "build_id": build_id, "bom_item_id": item_id,
+                        "department": "manufacturing", "op_key": step["op_key"], "op_name": step["op_name"],
+                        "module_key": step["module_key"], "sequence": step["sequence"], "status": status,
+                        "is_released": idx <= n_done, "qty_planned": planned, "qty_required": planned,
+                        "qty_done": qty_done, "qty_scrap": 0.0, "is_outsourced": step["is_outsourced"],
+                        "output_stage_key": step["output_stage_key"], "created_at": op_created,
+                        "cancelled_at": op_created + timedelta(days=2) if status == STATUS_CANCELLED else None,
+                        "claimed_by_user_id": claimed, "claimed_at": op_created if claimed else None,
+                        "claim_touched_at": op_created if claimed else None, "allow_multi_user": False,
+                    })
+    w.write(Job, job_rows)
+    w.write(Build, build_rows)
+    w.write(BOMItem, item_rows)
+    w.write(BuildOperation, op_rows)
+
+    # -----------------------------
+    # Progress events (streamed)
+    # -----------------------------
+    active_ops = [op for op in op_rows if op["qty_done"] > 0 or op["status"] == STATUS_IN_PROGRESS]
+    w.write(BuildOperationProgress, _progress_rows(rng, active_ops, cfg.progress_rows, user_ids))
+
+    # -----------------------------
+    # Stock: ledger first (streamed), then the entities with their balances
+    # -----------------------------
+    n_raw = max(1, len(parts_by_cat["raw"]) * 5)
+    n_bulk = max(1, len(hw))
+    buckets: List[Tuple[int, str]] = []
+    for part_id in comps:
+        buckets += [(part_id, "blank"), (part_id, "mfg_wip"), (part_id, "mfg_complete")]
+    for part_id in subs:
+        buckets.append((part_id, "finish_complete"))
+    for part_id in assemblies:
+        buckets.append((part_id, "fg_complete"))
+
+    counts = {"part_inventory": len(buckets), "bulk_hardware": n_bulk, "raw_stock": n_raw}
+    balances = {etype: [0.0] * (n + 1) for etype, n in counts.items()}
+    w.write(StockLedgerEntry, _ledger_rows(rng, cfg.ledger_rows, counts, balances, user_ids, len(op_rows)))
+
+    w.write(RawStock, (
+        _raw_stock_row(rng, i, balances["raw_stock"][i]) for i in range(1, n_raw + 1)
+    ))
+    w.write(BulkHardware, (
+        {"id": i, "item_code": f"BH-{i:06d}", "name": f"{rng.choice(('Torx', 'Pivot', 'Thumb', 'Lanyard'))} "
+         f"{rng.choice(('screw', 'pin', 'washer', 'stud'))} {i}", "vendor": rng.choice(WORDS) + " Supply",
+         "uom": "ea", "qty_on_hand": balances["bulk_hardware"][i], "is_active": True,
+         "created_at": _ago(HISTORY_DAYS + 10), "updated_at": ANCHOR}
+        for i in range(1, n_bulk + 1)
+    ))
+    w.write(PartInventory, (
+        {"id": i, "part_id": part_id, "stage_key": stage, "rev": "A", "config_key": None,
+         "qty_on_hand": balances["part_inventory"][i], "uom": "ea", "is_active": True,
+         "created_at": _ago(HISTORY_DAYS + 10), "updated_at": ANCHOR}
+        for i, (part_id, stage) in enumerate(buckets, start=1)
+    ))
+    return report
+
+
+def _progress_rows(rng: random.Random, ops: List[dict], target: int, user_ids: List[int]) -> Iterator[dict]:
+    """~target events over ops; each op's progress deltas add up to its qty_done."""
+    if not ops or target <= 0:
+        return
+    avg = target / len(ops)
+    pid = 0
+    for op in ops:
+        n_events = max(1, int(avg * rng.uniform(0.5, 1.5)))
+        user_id = op["claimed_by_user_id"] or rng.choice(user_ids)
+        done = int(op["qty_done"])
+        # One claim, then progress posts carrying the done qty (integer split, exact sum)
+        n_posts = max(1, n_events - 1)
+        base, extra = divmod(done, n_posts)
+        t = op["created_at"]
+        step = timedelta(minutes=max(1, int(14 * 24 * 60 / n_events)))
+        pid += 1
+        yield {
+            "id": pid, "build_operation_id": op["id"], "user_id": user_id, "event_type": "claim",
+            "actor_role": "editor", "is_override": False, "qty_done_delta": 0.0, "qty_scrap_delta": 0.0,
+            "created_at": t,
+        }
+        for k in range(n_posts):
+            pid += 1
+            t = t + step
+            yield {
+                "id": pid, "build_operation_id": op["id"], "user_id": user_id, "event_type": "progress",
+                "actor_role": "editor", "is_override": False,
+                "qty_done_delta": float(base + (1 if k < extra else 0)), "qty_scrap_delta": 0.0,
+                "created_at": t,
+            }
+
+
+def _ledger_rows(
+    rng: random.Random,
+    target: int,
+    counts: Dict[str, int],
+    balances: Dict[str, List[float]],
+    user_ids: List[int],
+    n_ops: int,
+) -> Iterator[dict]:
+    """target entries, oldest first; a few hot entities get most of the traffic."""
+    span = HISTORY_DAYS * 24 * 3600.0
+    for i in range(1, target + 1):
+        etype = _pick_weighted(rng, LEDGER_SPLIT)
+        n = counts[etype]
+        # Skewed pick: low ids are the hot items
+        eid = min(n, 1 + int(n * rng.random() ** 2.5))
+        bal = balances[etype]
+        if bal[eid] >= 1 and rng.random() < 0.45:
+            qty = -float(rng.randint(1, max(1, min(20, int(bal[eid])))))
+            reason = "op_progress" if etype == "part_inventory" else "consume"
+        else:
+            qty = float(rng.randint(1, 50))
+            reason = "op_progress" if etype == "part_inventory" else "receive"
+        bal[eid] += qty
+        from_op = etype == "part_inventory"
+        yield {
+            "id": i, "entity_type": etype, "entity_id": eid, "qty_delta": qty, "uom": "ea", "reason": reason,
+            "source_type": "build_operation" if from_op else None,
+            "source_ref": f"op-{rng.randint(1, max(1, n_ops))}" if from_op else None,
+            "created_by_user_id": rng.choice(user_ids),
+            "created_at": ANCHOR - timedelta(seconds=span * (1 - i / (target + 1))),
+        }
+
+
+def _raw_stock_row(rng: random.Random, i: int, qty: float) -> dict:
+    material, grade = rng.choice(MATERIALS)
+    form = rng.choice(("sheet", "plate", "bar", "scale"))
+    return {
+        "id": i, "name": f"{grade or material.title()} {form} {i}", "material_type": material, "grade": grade,
+        "form": form, "thickness_in": rng.choice((0.125, 0.156, 0.187, 0.25)), "width_in": 12.0,
+        "length_in": 24.0, "qty_on_hand": qty, "uom": "sheet" if form == "sheet" else "ea",
+        "is_active": True, "created_at": _ago(HISTORY_DAYS + 10), "updated_at": ANCHOR,
+    }
@@ -101,6 +101,13 @@ def run_migrations_online():
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        if connection.dialect.name == "sqlite":
+            # The app's connection profile turns FK enforcement on; batch
+            # migrations copy/drop tables and must run with it off.
+            connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            # End the implicit transaction the PRAGMA began; otherwise alembic
+            # sees an outer transaction and never commits its own
+            connection.commit()
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
@@ -21,7 +21,7 @@ def upgrade():
         batch.add_column(sa.Column("event_type", sa.String(length=50), nullable=False, server_default="progress"))
         batch.add_column(sa.Column("actor_role", sa.String(length=32), nullable=True))  # editor|contributor|admin_override|system
         batch.add_column(sa.Column("event_note", sa.String(length=255), nullable=True))
-        batch.add_column(sa.Column("is_override", sa.Boolean(), nullable=False, server_default=sa.text("0")))
+        batch.add_column(sa.Column("is_override", sa.Boolean(), nullable=False, server_default=sa.false()))
 
     op.create_index(
         "ix_bop_event_type",
@@ -0,0 +1,32 @@
+"""add content_sha256 / size_bytes to drawings
+
+Revision ID: 3f9d2c7b1a64
+Revises: e6a1b4f09c32
+Create Date: 2026-02-20 08:41:17.552904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9d2c7b1a64'
+down_revision = 'e6a1b4f09c32'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ("part_drawings", "build_drawings"):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column("content_sha256", sa.String(length=64), nullable=True))
+            batch_op.add_column(sa.Column("size_bytes", sa.Integer(), nullable=True))
+            batch_op.create_index(batch_op.f(f"ix_{table}_content_sha256"), ["content_sha256"], unique=False)
+
+
+def downgrade():
+    for table in ("build_drawings", "part_drawings"):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f"ix_{table}_content_sha256"))
+            batch_op.drop_column("size_bytes")
+            batch_op.drop_column("content_sha256")
@@ -0,0 +1,27 @@
+"""add entity_types to inventory_reconcile_runs
+
+Revision ID: 4a7d2e9c1b36
+Revises: 9e4b7c1d2a58
+Create Date: 2026-02-26 14:41:57.082316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a7d2e9c1b36'
+down_revision = '9e4b7c1d2a58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # NULL on existing runs: they count as covering every type
+    with op.batch_alter_table("inventory_reconcile_runs", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("entity_types", sa.String(length=128), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("inventory_reconcile_runs", schema=None) as batch_op:
+        batch_op.drop_column("entity_types")
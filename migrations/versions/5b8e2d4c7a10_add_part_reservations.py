@@ -0,0 +1,65 @@
+"""add part_reservations
+
+Revision ID: 5b8e2d4c7a10
+Revises: a3f1c9d27e41
+Create Date: 2026-02-16 10:04:22.517930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2d4c7a10'
+down_revision = 'a3f1c9d27e41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "part_reservations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("part_id", sa.Integer(), sa.ForeignKey("parts.id"), nullable=False),
+        sa.Column("stage_key", sa.String(length=32), nullable=False),
+        sa.Column("rev", sa.String(length=16), nullable=False, server_default="A"),
+        sa.Column("config_key", sa.String(length=64), nullable=True),
+        sa.Column("build_id", sa.Integer(), sa.ForeignKey("builds.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("bom_item_id", sa.Integer(), sa.ForeignKey("bom_items.id", ondelete="CASCADE"), nullable=True),
+        sa.Column("work_order_id", sa.Integer(), sa.ForeignKey("work_orders.id"), nullable=True),
+        sa.Column("qty_reserved", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="active"),
+        sa.Column("note", sa.String(length=255), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("released_at", sa.DateTime(), nullable=True),
+        sqlite_autoincrement=True,
+    )
+
+    op.create_index(
+        "ix_part_reservations_bucket",
+        "part_reservations",
+        ["part_id", "stage_key", "rev", "config_key", "status"],
+    )
+    op.create_index(
+        "ix_part_reservations_build_status",
+        "part_reservations",
+        ["build_id", "status"],
+    )
+    op.create_index(
+        "ix_part_reservations_bom_item_id",
+        "part_reservations",
+        ["bom_item_id"],
+    )
+    op.create_index(
+        "ix_part_reservations_work_order_id",
+        "part_reservations",
+        ["work_order_id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_part_reservations_work_order_id", table_name="part_reservations")
+    op.drop_index("ix_part_reservations_bom_item_id", table_name="part_reservations")
+    op.drop_index("ix_part_reservations_build_status", table_name="part_reservations")
+    op.drop_index("ix_part_reservations_bucket", table_name="part_reservations")
+    op.drop_table("part_reservations")
@@ -0,0 +1,60 @@
+"""add composite indexes for the hot query shapes
+
+Revision ID: 6d0b3e8a4f27
+Revises: 3f9d2c7b1a64
+Create Date: 2026-02-23 09:15:38.204611
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d0b3e8a4f27'
+down_revision = '3f9d2c7b1a64'
+branch_labels = None
+depends_on = None
+
+
+# (table, index name, columns); checked by `flask db-profile explain`
+INDEXES = [
+    ("build_operations", "ix_build_operations_queue", ["module_key", "op_key", "is_released", "status"]),
+    ("build_operations", "ix_build_operations_bom_item_status", ["bom_item_id", "status"]),
+    ("build_operations", "ix_build_operations_claimed_by_status", ["claimed_by_user_id", "status"]),
+    ("build_operation_progress", "ix_build_operation_progress_op_created", ["build_operation_id", "created_at"]),
+    ("stock_ledger", "ix_stock_ledger_entity_created", ["entity_type", "entity_id", "created_at"]),
+    ("bom_headers", "ix_bom_headers_assembly_active", ["assembly_part_id", "is_active"]),
+]
+
+# Single-column indexes that are now a leading prefix of a composite above
+SUPERSEDED = [
+    ("build_operation_progress", "ix_build_operation_progress_build_operation_id", ["build_operation_id"]),
+    ("stock_ledger", "ix_stock_ledger_entity_type", ["entity_type"]),
+]
+
+
+def _existing(table):
+    return {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    for table, name, columns in INDEXES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(name, columns, unique=False)
+
+    # Older databases were created without some of these; drop only what is there
+    for table, name, _columns in SUPERSEDED:
+        if name in _existing(table):
+            with op.batch_alter_table(table, schema=None) as batch_op:
+                batch_op.drop_index(name)
+
+
+def downgrade():
+    for table, name, columns in SUPERSEDED:
+        if name not in _existing(table):
+            with op.batch_alter_table(table, schema=None) as batch_op:
+                batch_op.create_index(name, columns, unique=False)
+
+    for table, name, _columns in reversed(INDEXES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(name)
@@ -0,0 +1,37 @@
+"""add inventory_reconcile_runs
+
+Revision ID: 8c41f0e7b2d9
+Revises: 5b8e2d4c7a10
+Create Date: 2026-02-17 21:30:05.771204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c41f0e7b2d9'
+down_revision = '5b8e2d4c7a10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "inventory_reconcile_runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("mode", sa.String(length=16), nullable=False, server_default="full"),
+        sa.Column("trust", sa.String(length=16), nullable=True),
+        sa.Column("ledger_watermark", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("checked", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("mismatches", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("orphans", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("repaired", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sqlite_autoincrement=True,
+    )
+
+
+def downgrade():
+    op.drop_table("inventory_reconcile_runs")
@@ -17,6 +17,11 @@ depends_on = None
 
 
 def upgrade():
+    # SQLite-only table option (ids never reused); server backends already
+    # use sequences / identity columns, and recreating the table there is wasteful
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
     with op.batch_alter_table(
         "build_operations",
         recreate="always",
@@ -25,6 +30,9 @@ def upgrade():
         pass
 
 def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
     with op.batch_alter_table(
         "build_operations",
         recreate="always",
@@ -0,0 +1,85 @@
+"""rebuild search_index with the trigram tokenizer
+
+Revision ID: 9e4b7c1d2a58
+Revises: 6d0b3e8a4f27
+Create Date: 2026-02-26 10:04:12.530917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4b7c1d2a58'
+down_revision = '6d0b3e8a4f27'
+branch_labels = None
+depends_on = None
+
+
+# Frozen copies of the service's DDL and backfill at this revision, so the
+# migration does not change when search_index.py does.
+TRIGRAM_SQL = (
+    "CREATE VIRTUAL TABLE search_index USING fts5("
+    "code, title, body, "
+    "tokenize = 'trigram'"
+    ")"
+)
+UNICODE61_SQL = (
+    "CREATE VIRTUAL TABLE search_index USING fts5("
+    "code, title, body, "
+    "tokenize = 'unicode61 remove_diacritics 2', "
+    "prefix = '1 2 3'"
+    ")"
+)
+
+# (rowid slot, SELECT id, code, title, body)
+BACKFILL = [
+    (1, "SELECT id, part_number AS code, name AS title, description AS body FROM parts"),
+    (2, "SELECT id, printf('RS-%06d', id) AS code, name AS title, "
+        "trim(coalesce(material_type, '') || ' ' || coalesce(grade, '') || ' ' || coalesce(form, '') "
+        "|| ' ' || coalesce(vendor, '') || ' ' || coalesce(location, '')) AS body FROM raw_stock"),
+    (3, "SELECT id, item_code AS code, name AS title, "
+        "trim(coalesce(description, '') || ' ' || coalesce(vendor, '') || ' ' || coalesce(vendor_sku, '')) "
+        "AS body FROM bulk_hardware"),
+    (4, "SELECT id, part_number AS code, name AS title, "
+        "trim(coalesce(category, '') || ' ' || coalesce(vendor, '') || ' ' || coalesce(location, '')) "
+        "AS body FROM waterjet_consumables"),
+    (5, "SELECT id, NULL AS code, name AS title, "
+        "trim(coalesce(email, '') || ' ' || coalesce(phone, '') || ' ' || coalesce(notes, '')) "
+        "AS body FROM customers"),
+    (6, "SELECT id, job_number AS code, title, notes AS body FROM jobs"),
+    (7, "SELECT id, wo_number AS code, title, notes AS body FROM work_orders"),
+]
+
+
+def _recreate(create_sql):
+    op.execute("DROP TABLE IF EXISTS search_index")
+    op.execute(create_sql)
+    for slot, select_sql in BACKFILL:
+        op.execute(
+            "INSERT INTO search_index(rowid, code, title, body) "
+            f"SELECT {slot << 32} + s.id, s.code, s.title, s.body FROM ({select_sql}) AS s"
+        )
+    op.execute("INSERT INTO search_index(search_index) VALUES ('optimize')")
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+
+    version = bind.execute(sa.text("SELECT sqlite_version()")).scalar()
+    if tuple(int(x) for x in version.split(".")[:3]) < (3, 34, 0):
+        # No trigram tokenizer: drop the word index, list pages use ILIKE
+        op.execute("DROP TABLE IF EXISTS search_index")
+        return
+
+    _recreate(TRIGRAM_SQL)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+
+    _recreate(UNICODE61_SQL)
@@ -0,0 +1,70 @@
+"""add search_index fts5 table
+
+Revision ID: a3f1c9d27e41
+Revises: 2741bfb39609
+Create Date: 2026-02-14 09:12:40.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f1c9d27e41'
+down_revision = '2741bfb39609'
+branch_labels = None
+depends_on = None
+
+
+# Frozen copies of the service's DDL and backfill at this revision, so the
+# migration does not change when search_index.py does.
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+    "code, title, body, "
+    "tokenize = 'unicode61 remove_diacritics 2', "
+    "prefix = '1 2 3'"
+    ")"
+)
+
+# (rowid slot, SELECT id, code, title, body)
+BACKFILL = [
+    (1, "SELECT id, part_number AS code, name AS title, description AS body FROM parts"),
+    (2, "SELECT id, printf('RS-%06d', id) AS code, name AS title, "
+        "trim(coalesce(material_type, '') || ' ' || coalesce(grade, '') || ' ' || coalesce(form, '') "
+        "|| ' ' || coalesce(vendor, '') || ' ' || coalesce(location, '')) AS body FROM raw_stock"),
+    (3, "SELECT id, item_code AS code, name AS title, "
+        "trim(coalesce(description, '') || ' ' || coalesce(vendor, '') || ' ' || coalesce(vendor_sku, '')) "
+        "AS body FROM bulk_hardware"),
+    (4, "SELECT id, part_number AS code, name AS title, "
+        "trim(coalesce(category, '') || ' ' || coalesce(vendor, '') || ' ' || coalesce(location, '')) "
+        "AS body FROM waterjet_consumables"),
+    (5, "SELECT id, NULL AS code, name AS title, "
+        "trim(coalesce(email, '') || ' ' || coalesce(phone, '') || ' ' || coalesce(notes, '')) "
+        "AS body FROM customers"),
+    (6, "SELECT id, job_number AS code, title, notes AS body FROM jobs"),
+    (7, "SELECT id, wo_number AS code, title, notes AS body FROM work_orders"),
+]
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        # FTS5 is SQLite-only; other backends keep the ILIKE fallback
+        return
+
+    # Create the virtual table and backfill every indexed entity
+    op.execute(CREATE_SQL)
+    op.execute("DELETE FROM search_index")
+    for slot, select_sql in BACKFILL:
+        op.execute(
+            "INSERT INTO search_index(rowid, code, title, body) "
+            f"SELECT {slot << 32} + s.id, s.code, s.title, s.body FROM ({select_sql}) AS s"
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+
+    op.execute("DROP TABLE IF EXISTS search_index")
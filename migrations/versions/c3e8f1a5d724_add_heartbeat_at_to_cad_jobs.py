@@ -0,0 +1,26 @@
+"""add heartbeat_at to cad_jobs
+
+Revision ID: c3e8f1a5d724
+Revises: 4a7d2e9c1b36
+Create Date: 2026-02-27 11:22:48.913504
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e8f1a5d724'
+down_revision = '4a7d2e9c1b36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("cad_jobs", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("cad_jobs", schema=None) as batch_op:
+        batch_op.drop_column("heartbeat_at")
@@ -0,0 +1,41 @@
+"""add output_stage_key to routing_steps and build_operations
+
+Revision ID: d27a9c3e5f18
+Revises: 8c41f0e7b2d9
+Create Date: 2026-02-19 07:48:51.093362
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd27a9c3e5f18'
+down_revision = '8c41f0e7b2d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("routing_steps") as batch:
+        batch.add_column(sa.Column("output_stage_key", sa.String(length=32), nullable=True))
+
+    with op.batch_alter_table("build_operations") as batch:
+        batch.add_column(sa.Column("output_stage_key", sa.String(length=32), nullable=True))
+
+    # Backfill: raw-materials cut ops already posted "blank" inventory
+    for table in ("routing_steps", "build_operations"):
+        op.execute(f"""
+            UPDATE {table}
+            SET output_stage_key = 'blank'
+            WHERE module_key = 'raw_materials'
+              AND op_key IN ('waterjet_cut', 'laser_cut', 'bandsaw_cut', 'tablesaw_cut', 'edm_cut');
+        """)
+
+
+def downgrade():
+    with op.batch_alter_table("build_operations") as batch:
+        batch.drop_column("output_stage_key")
+
+    with op.batch_alter_table("routing_steps") as batch:
+        batch.drop_column("output_stage_key")
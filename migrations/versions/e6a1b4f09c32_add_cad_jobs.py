@@ -0,0 +1,49 @@
+"""add cad_jobs
+
+Revision ID: e6a1b4f09c32
+Revises: d27a9c3e5f18
+Create Date: 2026-02-19 10:12:44.318027
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6a1b4f09c32'
+down_revision = 'd27a9c3e5f18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "cad_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="queued"),
+        sa.Column("filename", sa.String(length=255), nullable=False),
+        sa.Column("content_sha256", sa.String(length=64), nullable=True),
+        sa.Column("size_bytes", sa.Integer(), nullable=True),
+        sa.Column("assembly_id", sa.Integer(), nullable=True),
+        sa.Column("shapes_filename", sa.String(length=255), nullable=True),
+        sa.Column("part_count", sa.Integer(), nullable=True),
+        sa.Column("cache_hit", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("worker", sa.String(length=64), nullable=True),
+        sa.Column("created_by_user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sqlite_autoincrement=True,
+    )
+    with op.batch_alter_table("cad_jobs", schema=None) as batch_op:
+        batch_op.create_index("ix_cad_jobs_status_id", ["status", "id"], unique=False)
+        batch_op.create_index(batch_op.f("ix_cad_jobs_assembly_id"), ["assembly_id"], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table("cad_jobs", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_cad_jobs_assembly_id"))
+        batch_op.drop_index("ix_cad_jobs_status_id")
+    op.drop_table("cad_jobs")
@@ -21,7 +21,7 @@ def upgrade():
         batch.add_column(sa.Column("claimed_by_user_id", sa.Integer(), nullable=True))
         batch.add_column(sa.Column("claimed_at", sa.DateTime(), nullable=True))
         batch.add_column(sa.Column("claim_touched_at", sa.DateTime(), nullable=True))
-        batch.add_column(sa.Column("allow_multi_user", sa.Boolean(), nullable=False, server_default=sa.text("0")))
+        batch.add_column(sa.Column("allow_multi_user", sa.Boolean(), nullable=False, server_default=sa.false()))
         batch.add_column(sa.Column("claim_note", sa.String(length=255), nullable=True))
 
         batch.create_foreign_key(
@@ -1,43 +1,47 @@
 # Original modules route, hiding assembly and cad viewer routes
 # File path: /modules/__init__.py
 
-# Import each module's blueprint
-from .inventory import inventory_bp
-from .manufacturing.surface_grinding.routes import surface_bp
-from .manufacturing.bevel_grinding.routes import bevel_bp
-from .jobs_management import jobs_bp
-from .manufacturing.machining.routes import mfg_bp
-#from .waterjet.routes import waterjet_bp
-# from .assembly.routes import assembly_bp, cad_upload_bp
-#from .assembly.routes.assembly_bom import assembly_bom_bp
-from .analytics.routes import analytics_bp
-from .user.routes import admin_users_bp
-#from .operations.routes import operations_bp
-from .manufacturing.raw_materials.routes import raw_mats_bp
-from .manufacturing.raw_materials.waterjet.routes import raw_mats_waterjet_bp
-from .manufacturing.heat_treat.routes import heat_treat_bp
-from .work_orders.routes import work_orders_bp
-from .admin.routes import admin_bp
-
-module_blueprints = [
-    ("inventory_bp", inventory_bp, "/inventory"),
-    ("surface_grinding_bp", surface_bp, "/surface"),
-    ("bevel_bp", bevel_bp, "/bevel"),
-    ("jobs_bp", jobs_bp, "/jobs"),
-    ("mfg_bp", mfg_bp, "/manufacturing"),
-    #("waterjet_bp", waterjet_bp, "/waterjet"),
-    #("assembly_bp", assembly_bp, "/assembly"),
-    #("upload_cad", cad_upload_bp, "/assembly"),
-    #("assembly_bom_bp", assembly_bom_bp, "/"),
-    ("analytics_bp", analytics_bp, "/analytics"),
-    ("admin_users_bp", admin_users_bp, "/user"),
-	#("operations_bp", operations_bp, "/ops"),
-	("raw_materials_bp", raw_mats_bp, "/raw_mats"),
-	("raw_mats_waterjet_bp", raw_mats_waterjet_bp, "/raw_mats/waterjet"),
-	("heat_treat_bp", heat_treat_bp, "/heat_treat"),
-	("work_orders_bp", work_orders_bp, "/work_orders"),
-    ("admin_bp", admin_bp, "/admin"),
-]	
-
-# Optional: export list so app.py can loop through them
-__all__ = ["module_blueprints"]
+# Blueprints are listed as import paths and only imported by
+# load_module_blueprints() (create_app), so importing a service from
+# modules.* no longer pulls in every route module.
+# (name, "module.path:attribute", url_prefix)
+BLUEPRINT_SPECS = [
+    ("inventory_bp", "modules.inventory:inventory_bp", "/inventory"),
+    ("surface_grinding_bp", "modules.manufacturing.surface_grinding.routes:surface_bp", "/surface"),
+    ("bevel_bp", "modules.manufacturing.bevel_grinding.routes:bevel_bp", "/bevel"),
+    ("jobs_bp", "modules.jobs_management:jobs_bp", "/jobs"),
+    ("mfg_bp", "modules.manufacturing.machining.routes:mfg_bp", "/manufacturing"),
+    #("waterjet_bp", "modules.waterjet.routes:waterjet_bp", "/waterjet"),
+    #("assembly_bp", "modules.assembly.routes:assembly_bp", "/assembly"),
+    #("upload_cad", "modules.assembly.routes:cad_upload_bp", "/assembly"),
+    #("assembly_bom_bp", "modules.assembly.routes.assembly_bom:assembly_bom_bp", "/"),
+    ("analytics_bp", "modules.analytics.routes:analytics_bp", "/analytics"),
+    ("admin_users_bp", "modules.user.routes:admin_users_bp", "/user"),
+    #("operations_bp", "modules.operations.routes:operations_bp", "/ops"),
+    ("raw_materials_bp", "modules.manufacturing.raw_materials.routes:raw_mats_bp", "/raw_mats"),
+    ("raw_mats_waterjet_bp", "modules.manufacturing.raw_materials.waterjet.routes:raw_mats_waterjet_bp", "/raw_mats/waterjet"),
+    ("heat_treat_bp", "modules.manufacturing.heat_treat.routes:heat_treat_bp", "/heat_treat"),
+    ("work_orders_bp", "modules.work_orders.routes:work_orders_bp", "/work_orders"),
+    ("admin_bp", "modules.admin.routes:admin_bp", "/admin"),
+]
+
+
+def load_module_blueprints():
+    """Import and return [(name, blueprint, url_prefix)] in registration order."""
+    from importlib import import_module
+
+    out = []
+    for name, target, prefix in BLUEPRINT_SPECS:
+        module_path, attr = target.split(":")
+        out.append((name, getattr(import_module(module_path), attr), prefix))
+    return out
+
+
+def __getattr__(name):
+    # Back-compat: `from modules import module_blueprints` still works (and imports them)
+    if name == "module_blueprints":
+        return load_module_blueprints()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["BLUEPRINT_SPECS", "load_module_blueprints"]
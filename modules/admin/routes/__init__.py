@@ -3,4 +3,4 @@
 from .index import * # noqa
 from .ops_audit import * # noqa
 from .op_detail import * # noqa
-
+from .sql_profile import * # noqa
@@ -0,0 +1,40 @@
+# File path: modules/admin/routes/sql_profile.py
+
+from datetime import datetime
+
+from flask import flash, redirect, render_template, url_for
+from modules.admin import admin_bp
+from modules.user.decorators import admin_required
+from modules.shared.services.sql_profiler import profile_store
+
+
+@admin_bp.get("/sql-profile")
+@admin_required
+def sql_profile():
+    store = profile_store()
+    if store is None:
+        return render_template("admin/sql_profile.html", enabled=False, endpoints=[], recent=[])
+
+    recent, endpoints = store.snapshot()
+    # Worst offenders first: N+1 requests, then average query count
+    endpoint_rows = sorted(
+        endpoints.items(),
+        key=lambda kv: (-kv[1].n_plus_one_requests, -kv[1].avg_queries),
+    )
+    return render_template(
+        "admin/sql_profile.html",
+        enabled=True,
+        endpoints=endpoint_rows,
+        recent=recent,
+        fmt_ts=lambda ts: datetime.utcfromtimestamp(ts),
+    )
+
+
+@admin_bp.post("/sql-profile/reset")
+@admin_required
+def sql_profile_reset():
+    store = profile_store()
+    if store is not None:
+        store.clear()
+    flash("SQL profile cleared.", "success")
+    return redirect(url_for("admin_bp.sql_profile"))
@@ -1,10 +1,12 @@
 import os
+import logging
 from flask import Blueprint, render_template
 
+log = logging.getLogger(__name__)
 
 analytics_bp = Blueprint("analytics_bp", __name__)
 
 @analytics_bp.route("/")
 def analytics_index():
-    print("📊 Analytics route HIT")
+    log.debug("analytics index")
     return render_template("analytics/index.html")
@@ -0,0 +1,137 @@
+# File: modules/assembly/parser/mesh_binary.py
+# Purpose: Write parsed CAD meshes as a packed binary buffer + small JSON manifest
+# Notes:
+# - <stem>.bin  : per part, little-endian float32 vertices then uint32 triangle indices
+# - <stem>.json : the usual viewer payload (version=3) with each shape's vertices/triangles
+#                 replaced by {"offset": byte_offset, "count": n_values} into <stem>.bin
+# - Instance parts (see step_parser "instance_of") reuse their representative's buffer ranges
+# - <stem>.<lod>.bin per level of detail (part["lods"][lod] holds its refs, see step_parser)
+# - <stem>.bin.gz is written alongside for gzip-capable clients (see upload_cad.cad_mesh_file)
+# - Every section is 4-byte aligned, so the viewer can wrap slices of the fetched
+#   ArrayBuffer in Float32Array / Uint32Array without copying
+
+import gzip
+import json
+import os
+
+import numpy as np
+
+MESH_BIN_FORMAT = "merp-mesh-bin/1"
+
+# Gzip level for the .bin.gz sibling (float data rarely gains past 6)
+GZIP_LEVEL = 6
+
+
+def _section(arr, dtype):
+    return np.ascontiguousarray(np.asarray(arr).ravel(), dtype=dtype)
+
+
+class _BufferPacker:
+    """Appends float32 vertex / uint32 index sections to one buffer, once per array object."""
+
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+        self._written = {}  # id(vertices array) -> (vertices ref, triangles ref)
+
+    def add(self, vertices, triangles):
+        refs = self._written.get(id(vertices))
+        if refs is None:
+            verts = _section(vertices, "<f4")
+            tris = _section(triangles, "<u4")
+
+            v_ref = {"offset": self.offset, "count": int(verts.size)}
+            self.chunks.append(verts.tobytes())
+            self.offset += verts.nbytes
+
+            t_ref = {"offset": self.offset, "count": int(tris.size)}
+            self.chunks.append(tris.tobytes())
+            self.offset += tris.nbytes
+
+            refs = self._written[id(vertices)] = (v_ref, t_ref)
+        return dict(refs[0]), dict(refs[1])
+
+
+def pack_shapes(shapes):
+    """Split a parse_step() payload into (manifest dict, main chunks, {lod: chunks}).
+
+    Instance parts share their representative's array objects; those are
+    written once and both parts point at the same offsets. Each level of
+    detail gets its own buffer so the viewer can fetch the coarsest first.
+    """
+    main = _BufferPacker()
+    levels = {}
+    parts = []
+
+    for part in shapes.get("parts", []):
+        shape = dict(part["shape"])
+        shape["vertices"], shape["triangles"] = main.add(shape["vertices"], shape["triangles"])
+        entry = {**part, "shape": shape}
+
+        if part.get("lods"):
+            entry["lods"] = {}
+            for name, lod in part["lods"].items():
+                packer = levels.setdefault(name, _BufferPacker())
+                v_ref, t_ref = packer.add(lod["vertices"], lod["triangles"])
+                entry["lods"][name] = {"vertices": v_ref, "triangles": t_ref}
+
+        parts.append(entry)
+
+    manifest = {**shapes, "parts": parts, "format": MESH_BIN_FORMAT, "byte_length": main.offset}
+    return manifest, main.chunks, {name: p.chunks for name, p in levels.items()}
+
+
+def _write_buffer(path, chunks):
+    with open(path, "wb") as bf:
+        for c in chunks:
+            bf.write(c)
+
+    with open(path, "rb") as src, gzip.open(path + ".gz", "wb", compresslevel=GZIP_LEVEL) as gz:
+        while True:
+            block = src.read(1 << 20)
+            if not block:
+                break
+            gz.write(block)
+
+
+def write_mesh_bundle(shapes, out_dir, stem):
+    """Write <stem>.bin (+ <stem>.<lod>.bin per level, each with a .gz) and <stem>.json under out_dir.
+
+    Returns the manifest filename (what Assembly.shapes_filename should point at).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest, chunks, lod_chunks = pack_shapes(shapes)
+
+    manifest["buffer"] = f"{stem}.bin"
+    _write_buffer(os.path.join(out_dir, manifest["buffer"]), chunks)
+
+    manifest["lod_buffers"] = {}
+    for name, level_chunks in lod_chunks.items():
+        manifest["lod_buffers"][name] = f"{stem}.{name}.bin"
+        _write_buffer(os.path.join(out_dir, manifest["lod_buffers"][name]), level_chunks)
+
+    manifest_name = f"{stem}.json"
+    with open(os.path.join(out_dir, manifest_name), "w") as jf:
+        json.dump(manifest, jf)
+
+    return manifest_name
+
+
+def shapes_to_lists(shapes):
+    """Array payload -> legacy JSON payload (plain float/int lists)."""
+    parts = []
+    def as_list(val):
+        return val.tolist() if hasattr(val, "tolist") else list(val)
+
+    for part in shapes.get("parts", []):
+        shape = dict(part["shape"])
+        for key in ("vertices", "triangles"):
+            shape[key] = as_list(shape[key])
+        entry = {**part, "shape": shape}
+        if part.get("lods"):
+            entry["lods"] = {
+                name: {key: as_list(lod[key]) for key in ("vertices", "triangles")}
+                for name, lod in part["lods"].items()
+            }
+        parts.append(entry)
+    return {**shapes, "parts": parts}
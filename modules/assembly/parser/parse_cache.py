@@ -0,0 +1,231 @@
+# File: modules/assembly/parser/parse_cache.py
+# Purpose: Content-hash keyed cache of parsed STEP mesh bundles
+# Notes:
+# - Key = sha256(upload bytes) + PARSER_VERSION + mesh deflection + LOD levels, so a re-upload of the
+#   same file (under any name) skips OCC entirely, and a parser change invalidates everything
+# - Each entry is a mesh_binary bundle (shapes.json manifest + shapes[.<lod>].bin + .gz);
+#   the manifest carries per-part bb / metrics / color, which is all ParsedComponent needs
+# - LRU: a hit touches the manifest mtime; store() evicts oldest entries past the disk budget
+# - Config: MERP_CAD_CACHE_DIR, MERP_CAD_CACHE_MAX_BYTES (see app.py)
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from flask import current_app, has_app_context
+
+# OCC / NumPy (step_parser, mesh_binary) load lazily so stats / purge work without them
+
+ENTRY_STEM = "shapes"
+MANIFEST_NAME = ENTRY_STEM + ".json"
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+def _config(key, default):
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def cache_root():
+    root = _config("MERP_CAD_CACHE_DIR", None)
+    if not root:
+        base = current_app.instance_path if has_app_context() else "instance"
+        root = os.path.join(base, "cad_parse_cache")
+    return os.path.abspath(root)
+
+
+def parse_workers():
+    """MERP_CAD_PARSE_WORKERS (None → step_parser.resolve_workers default)."""
+    return _config("MERP_CAD_PARSE_WORKERS", None)
+
+
+def max_bytes():
+    return int(_config("MERP_CAD_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+
+
+def file_sha256(path, block=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(block)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(content_sha, parser_version=None, deflection=None, lods=None):
+    from modules.assembly.parser.step_parser import PARSER_VERSION, MESH_DEFLECTION, LOD_LEVELS
+
+    parser_version = PARSER_VERSION if parser_version is None else parser_version
+    deflection = MESH_DEFLECTION if deflection is None else deflection
+    lods = LOD_LEVELS if lods is None else lods
+    return hashlib.sha256(f"{content_sha}|{parser_version}|{deflection!r}|{tuple(lods)!r}".encode()).hexdigest()
+
+
+def _entry_dir(key, root=None):
+    return os.path.join(root or cache_root(), key[:2], key)
+
+
+def _dir_size(path):
+    total = 0
+    for name in os.listdir(path):
+        try:
+            total += os.path.getsize(os.path.join(path, name))
+        except OSError:
+            pass
+    return total
+
+
+def _entries(root=None):
+    """[(mtime, size, path)] for every complete cache entry."""
+    root = root or cache_root()
+    out = []
+    if not os.path.isdir(root):
+        return out
+    for shard in os.listdir(root):
+        shard_dir = os.path.join(root, shard)
+        if not os.path.isdir(shard_dir):
+            continue
+        for key in os.listdir(shard_dir):
+            if ".tmp-" in key:
+                continue  # store() in progress
+            entry = os.path.join(shard_dir, key)
+            manifest = os.path.join(entry, MANIFEST_NAME)
+            if not os.path.exists(manifest):
+                continue
+            out.append((os.path.getmtime(manifest), _dir_size(entry), entry))
+    return out
+
+
+# -----------------------------
+# Lookup / store
+# -----------------------------
+
+def lookup(key):
+    """Entry dir for key (and mark it recently used), or None."""
+    entry = _entry_dir(key)
+    manifest = os.path.join(entry, MANIFEST_NAME)
+    if not os.path.exists(manifest):
+        return None
+    try:
+        os.utime(manifest, None)
+    except OSError:
+        pass
+    return entry
+
+
+def store(key, shapes):
+    """Write a parse_step(as_arrays=True) payload into the cache. Returns the entry dir."""
+    from modules.assembly.parser.mesh_binary import write_mesh_bundle
+
+    entry = _entry_dir(key)
+    tmp = f"{entry}.tmp-{os.getpid()}-{int(time.time() * 1000)}"
+    write_mesh_bundle(shapes, tmp, ENTRY_STEM)
+
+    try:
+        os.rename(tmp, entry)
+    except OSError:
+        # Another worker stored the same key first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    evict(max_bytes(), keep=entry)
+    return entry
+
+
+def materialize(entry, out_dir, stem):
+    """Copy a cache entry to out_dir as <stem>.json/.bin/.bin.gz. Returns (manifest_name, manifest)."""
+    os.makedirs(out_dir, exist_ok=True)
+
+    with open(os.path.join(entry, MANIFEST_NAME)) as jf:
+        manifest = json.load(jf)
+
+    def copy_buffer(src_name, dst_name):
+        shutil.copyfile(os.path.join(entry, src_name), os.path.join(out_dir, dst_name))
+        gz_src = os.path.join(entry, src_name + ".gz")
+        if os.path.exists(gz_src):
+            shutil.copyfile(gz_src, os.path.join(out_dir, dst_name + ".gz"))
+        return dst_name
+
+    manifest["buffer"] = copy_buffer(manifest["buffer"], f"{stem}.bin")
+    manifest["lod_buffers"] = {
+        name: copy_buffer(src_name, f"{stem}.{name}.bin")
+        for name, src_name in (manifest.get("lod_buffers") or {}).items()
+    }
+    manifest_name = f"{stem}.json"
+    with open(os.path.join(out_dir, manifest_name), "w") as jf:
+        json.dump(manifest, jf)
+
+    return manifest_name, manifest
+
+
+def get_or_parse(step_path, out_dir, stem, deflection=None, content_sha=None):
+    """Parse (or reuse) a STEP file into out_dir/<stem>.*.
+
+    content_sha skips re-hashing when the caller already knows it (blob store).
+    Returns (manifest_name, manifest, cache_hit).
+    """
+    from modules.assembly.parser.step_parser import parse_step, MESH_DEFLECTION, LOD_LEVELS
+
+    deflection = MESH_DEFLECTION if deflection is None else deflection
+    key = cache_key(content_sha or file_sha256(step_path), deflection=deflection, lods=LOD_LEVELS)
+    entry = lookup(key)
+    hit = entry is not None
+    if not hit:
+        entry = store(key, parse_step(step_path, as_arrays=True, deflection=deflection, workers=parse_workers(), lods=LOD_LEVELS))
+    manifest_name, manifest = materialize(entry, out_dir, stem)
+    return manifest_name, manifest, hit
+
+
+def warm(step_path, deflection=None):
+    """Parse into the cache only. Returns (key, was_cached)."""
+    from modules.assembly.parser.step_parser import parse_step, MESH_DEFLECTION, LOD_LEVELS
+
+    deflection = MESH_DEFLECTION if deflection is None else deflection
+    key = cache_key(file_sha256(step_path), deflection=deflection, lods=LOD_LEVELS)
+    if lookup(key):
+        return key, True
+    store(key, parse_step(step_path, as_arrays=True, deflection=deflection, workers=parse_workers(), lods=LOD_LEVELS))
+    return key, False
+
+
+# -----------------------------
+# Eviction
+# -----------------------------
+
+def evict(budget_bytes, keep=None):
+    """Drop least-recently-used entries until the cache fits budget_bytes. Returns (removed, freed)."""
+    entries = sorted(_entries())
+    total = sum(size for _, size, _ in entries)
+    removed = freed = 0
+    for _, size, path in entries:
+        if total <= budget_bytes:
+            break
+        if path == keep:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        freed += size
+        removed += 1
+    return removed, freed
+
+
+def purge_all():
+    root = cache_root()
+    entries = _entries(root)
+    if os.path.isdir(root):
+        shutil.rmtree(root, ignore_errors=True)
+    return len(entries), sum(size for _, size, _ in entries)
+
+
+def cache_stats():
+    entries = _entries()
+    return {
+        "root": cache_root(),
+        "entries": len(entries),
+        "bytes": sum(size for _, size, _ in entries),
+        "max_bytes": max_bytes(),
+    }
@@ -0,0 +1,119 @@
+# File: modules/assembly/parser/parser_bench.py
+# Purpose: Regression + timing check for step_parser mesh extraction
+# Usage:
+#   python -m modules.assembly.parser.parser_bench part1.step [part2.step ...] [--repeat 3]
+# Notes:
+# - Compares extract_triangles (NumPy) against extract_triangles_reference (old loop)
+#   with face locations disabled, so the geometry must match byte for byte
+# - Reports faces with a non-identity location separately (those now move, by design)
+
+import argparse
+import json
+import sys
+import time
+
+from OCC.Core.TopExp import TopExp_Explorer
+from OCC.Core.TopAbs import TopAbs_SOLID
+
+from modules.assembly.parser.step_parser import (
+    STEPControl_Reader,
+    IFSelect_RetDone,
+    MESH_DEFLECTION,
+    _face_triangulations,
+    extract_mesh_arrays,
+    extract_triangles_reference,
+)
+
+
+def _read_shape(path):
+    reader = STEPControl_Reader()
+    if reader.ReadFile(path) != IFSelect_RetDone:
+        raise ValueError(f"Failed to read STEP file: {path}")
+    reader.TransferRoots()
+    return reader.OneShape()
+
+
+def _solids(shape):
+    out = []
+    ex = TopExp_Explorer(shape, TopAbs_SOLID)
+    while ex.More():
+        out.append(ex.Current())
+        ex.Next()
+    return out or [shape]
+
+
+def _timed(fn, repeat):
+    best = None
+    result = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        result = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, result
+
+
+def bench_file(path, repeat=3, deflection=MESH_DEFLECTION):
+    """Returns a dict of timings / counts; 'identical' is False on any geometry drift."""
+    solids = _solids(_read_shape(path))
+
+    def run_reference():
+        return [extract_triangles_reference(s, deflection) for s in solids]
+
+    def run_numpy():
+        out = []
+        for s in solids:
+            v, t = extract_mesh_arrays(s, deflection=deflection, apply_location=False)
+            out.append((v.ravel().tolist(), t.ravel().tolist()))
+        return out
+
+    t_ref, ref = _timed(run_reference, repeat)
+    t_np, new = _timed(run_numpy, repeat)
+
+    identical = all(
+        json.dumps(a).encode() == json.dumps(b).encode()
+        for a, b in zip(ref, new)
+    ) and len(ref) == len(new)
+
+    located = sum(
+        1
+        for s in solids
+        for _, loc in _face_triangulations(s)
+        if not loc.IsIdentity()
+    )
+
+    return {
+        "file": path,
+        "solids": len(solids),
+        "vertices": sum(len(v) // 3 for v, _ in new),
+        "triangles": sum(len(t) // 3 for _, t in new),
+        "located_faces": located,
+        "reference_s": t_ref,
+        "numpy_s": t_np,
+        "speedup": (t_ref / t_np) if t_np else None,
+        "identical": identical,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compare NumPy vs reference STEP mesh extraction.")
+    ap.add_argument("files", nargs="+")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--deflection", type=float, default=MESH_DEFLECTION)
+    args = ap.parse_args(argv)
+
+    failed = False
+    for path in args.files:
+        r = bench_file(path, repeat=args.repeat, deflection=args.deflection)
+        failed = failed or not r["identical"]
+        print(
+            f"{r['file']}: solids={r['solids']} verts={r['vertices']} tris={r['triangles']} "
+            f"located_faces={r['located_faces']} ref={r['reference_s']:.3f}s "
+            f"numpy={r['numpy_s']:.3f}s x{(r['speedup'] or 0):.1f} "
+            f"{'OK' if r['identical'] else 'GEOMETRY MISMATCH'}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,76 +4,202 @@
 # - Emits one "part" per SOLID with basic metrics (bbox, volume) and a mesh hash for grouping
 # - Keeps the same top-level schema your viewer already expects (version=3, parts=[...])
 # - Designed as a drop-in replacement for your existing step_parser.py
+# - V2: NumPy mesh extraction (preallocated buffers, face locations applied)
+# - V3: optional process-pool meshing of solids (MERP_CAD_PARSE_WORKERS)
+# - V4: instancing — solids with equal pre-mesh signatures are meshed once and emitted
+#       as instances (shared buffers + per-instance "loc"); copies that are not
+#       IsPartner must also have the same vertex positions up to a translation
+# - V5: optional coarser levels of detail per solid ("lods"), meshed coarse → fine
 
 from OCC.Core.STEPControl import STEPControl_Reader
 from OCC.Core.IFSelect import IFSelect_RetDone
 from OCC.Core.TopExp import TopExp_Explorer
-from OCC.Core.TopAbs import TopAbs_SOLID, TopAbs_FACE
+from OCC.Core.TopAbs import TopAbs_SOLID, TopAbs_FACE, TopAbs_EDGE, TopAbs_VERTEX
 from OCC.Core.BRepMesh import BRepMesh_IncrementalMesh
 from OCC.Core.BRep import BRep_Tool
 from OCC.Core.TopLoc import TopLoc_Location
 from OCC.Core.Bnd import Bnd_Box
 from OCC.Core.BRepBndLib import brepbndlib_Add
 from OCC.Core.GProp import GProp_GProps
-from OCC.Core.BRepGProp import brepgprop_VolumeProperties
-from OCC.Core.TopoDS import topods
+from OCC.Core.BRepGProp import brepgprop_VolumeProperties, brepgprop_SurfaceProperties
+from OCC.Core.TopoDS import topods, TopoDS_Shape
+from OCC.Core.BRep import BRep_Builder
+from OCC.Core import BRepTools
 
 import os
 import json
 import hashlib
+import tempfile
 import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+import numpy as np
 
 
 # -----------------------------
 # Mesh extraction (faces → triangles)
 # -----------------------------
-def extract_triangles(shape):
-    """Triangulate a TopoDS_Shape (typically a SOLID) and return (vertices, triangles).
-    Vertices are a flat float list [x0,y0,z0, ...]; triangles are 0-based indices.
-    """
-    # Mesh generation: 0.001 is a decent default for small/med parts; adjust if needed
-    BRepMesh_IncrementalMesh(shape, 0.02)
 
-    vertices = []
-    triangles = []
+# Linear deflection for BRepMesh_IncrementalMesh (model units)
+MESH_DEFLECTION = 0.02
 
-    exp = TopExp_Explorer(shape, TopAbs_FACE)
-    face_idx = 0
-    tri_face_count = 0
+# Bump whenever parse_step output changes (keys the parse cache)
+PARSER_VERSION = "3.7"
 
+# Levels of detail below the main mesh: (name, deflection), coarsest first.
+# BRepMesh keeps an existing triangulation that already meets a looser
+# deflection, so levels must be meshed coarse → fine.
+LOD_LEVELS = (("coarse", 0.5), ("medium", 0.1))
+
+# Parallel meshing: fewer solids than this are not worth the pool start-up
+MIN_PARALLEL_SOLIDS = 4
+# spawn, not fork: OCC keeps global state that does not survive fork reliably
+POOL_START_METHOD = "spawn"
+
+# Instancing: significant digits compared in geometry signatures
+SIGNATURE_DIGITS = 7
+# Instancing: vertex positions compared to this fraction of the bbox diagonal
+VERTEX_TOLERANCE = 1e-6
+
+
+def _face_triangulations(shape):
+    """[(Poly_Triangulation, TopLoc_Location)] for every meshed face, in explorer order."""
+    out = []
+    exp = TopExp_Explorer(shape, TopAbs_FACE)
     while exp.More():
-        face_shape = exp.Current()
         try:
-            face = topods.Face(face_shape)
+            face = topods.Face(exp.Current())
             location = TopLoc_Location()
             triangulation = BRep_Tool.Triangulation(face, location)
+            if triangulation is not None:
+                out.append((triangulation, location))
+        except Exception:
+            # Keep going even if one face fails
+            traceback.print_exc()
+        exp.Next()
+    return out
+
+
+def _tri_counts(triangulation):
+    # OCCT >= 7.6 dropped Nodes()/Triangles() array accessors
+    if hasattr(triangulation, "NbNodes"):
+        return triangulation.NbNodes(), triangulation.NbTriangles()
+    return triangulation.Nodes().Length(), triangulation.Triangles().Length()
+
+
+def _fill_face(triangulation, n_nodes, n_tris, verts_out, tris_out):
+    """Write one face's nodes / 1-based triangles into preallocated slices."""
+    if hasattr(triangulation, "Node"):
+        node = triangulation.Node
+        tri = triangulation.Triangle
+    else:
+        node = triangulation.Nodes().Value
+        tri = triangulation.Triangles().Value
+
+    verts_out[:] = np.fromiter(
+        chain.from_iterable(node(i).Coord() for i in range(1, n_nodes + 1)),
+        dtype=np.float64,
+        count=3 * n_nodes,
+    ).reshape(n_nodes, 3)
+
+    tris_out[:] = np.fromiter(
+        chain.from_iterable(tri(i).Get() for i in range(1, n_tris + 1)),
+        dtype=np.int64,
+        count=3 * n_tris,
+    ).reshape(n_tris, 3)
+
+
+def _location_matrix(location):
+    """3x4 affine matrix for a TopLoc_Location, or None for identity."""
+    if location.IsIdentity():
+        return None
+    trsf = location.Transformation()
+    return np.array(
+        [[trsf.Value(r, c) for c in range(1, 5)] for r in range(1, 4)],
+        dtype=np.float64,
+    )
+
+
+def extract_mesh_arrays(shape, deflection=MESH_DEFLECTION, apply_location=True):
+    """Triangulate a TopoDS_Shape and return (vertices, triangles) as NumPy arrays.
+
+    vertices: (N, 3) float64, triangles: (M, 3) int32, 0-based.
+    One pass sizes the buffers, a second fills per-face slices; a face's
+    TopLoc_Location is applied as a single matrix multiply. A face that fails
+    to fill is left out (its slice is reused, the buffers are trimmed).
+    Vertices stay float64 through the location transform and instancing
+    signatures; mesh_binary narrows them to float32 (indices to uint32) when
+    it writes the .bin.
+    """
+    BRepMesh_IncrementalMesh(shape, deflection)
 
-            if triangulation is None:
-                # No triangulation for this face (can happen on bad geometry)
-                pass
-            else:
-                tri_face_count += 1
-                nodes = triangulation.Nodes()
-                tris = triangulation.Triangles()
-                offset = len(vertices) // 3
-
-                # Add vertices
-                for i in range(1, nodes.Length() + 1):
-                    pnt = nodes.Value(i)
-                    vertices.extend([pnt.X(), pnt.Y(), pnt.Z()])
-
-                # Add triangle indices (convert to 0-based, add offset)
-                for i in range(1, tris.Length() + 1):
-                    tri = tris.Value(i)
-                    t1, t2, t3 = tri.Get()
-                    triangles.extend([t1 - 1 + offset, t2 - 1 + offset, t3 - 1 + offset])
+    faces = _face_triangulations(shape)
+    counts = [_tri_counts(t) for t, _ in faces]
+    total_nodes = sum(n for n, _ in counts)
+    total_tris = sum(m for _, m in counts)
 
+    verts = np.empty((total_nodes, 3), dtype=np.float64)
+    tris = np.empty((total_tris, 3), dtype=np.int32)
+
+    v0 = t0 = 0
+    for (triangulation, location), (n, m) in zip(faces, counts):
+        v_slice = verts[v0:v0 + n]
+        t_slice = tris[t0:t0 + m]
+        try:
+            _fill_face(triangulation, n, m, v_slice, t_slice)
         except Exception:
-            # Keep going even if one face fails
+            # Skip the face; the next one overwrites this slice
             traceback.print_exc()
-        finally:
-            face_idx += 1
-            exp.Next()
+            continue
+
+        if apply_location:
+            mat = _location_matrix(location)
+            if mat is not None:
+                v_slice[:] = v_slice @ mat[:, :3].T + mat[:, 3]
+
+        # 1-based face-local -> 0-based solid-global
+        t_slice += v0 - 1
+
+        v0 += n
+        t0 += m
+
+    if v0 < total_nodes or t0 < total_tris:
+        verts, tris = verts[:v0], tris[:t0]
+    return verts, tris
+
+
+def extract_triangles(shape, deflection=MESH_DEFLECTION):
+    """Triangulate a TopoDS_Shape (typically a SOLID) and return (vertices, triangles).
+    Vertices are a flat float list [x0,y0,z0, ...]; triangles are 0-based indices.
+    """
+    verts, tris = extract_mesh_arrays(shape, deflection=deflection)
+    return verts.ravel().tolist(), tris.ravel().tolist()
+
+
+def extract_triangles_reference(shape, deflection=MESH_DEFLECTION):
+    """Original per-node Python loop (no face locations). Kept for parser_bench regression runs."""
+    BRepMesh_IncrementalMesh(shape, deflection)
+
+    vertices = []
+    triangles = []
+
+    for triangulation, _location in _face_triangulations(shape):
+        n_nodes, n_tris = _tri_counts(triangulation)
+        if hasattr(triangulation, "Node"):
+            node, tri = triangulation.Node, triangulation.Triangle
+        else:
+            node, tri = triangulation.Nodes().Value, triangulation.Triangles().Value
+        offset = len(vertices) // 3
+
+        for i in range(1, n_nodes + 1):
+            pnt = node(i)
+            vertices.extend([pnt.X(), pnt.Y(), pnt.Z()])
+
+        for i in range(1, n_tris + 1):
+            t1, t2, t3 = tri(i).Get()
+            triangles.extend([t1 - 1 + offset, t2 - 1 + offset, t3 - 1 + offset])
 
     return vertices, triangles
 
@@ -131,9 +257,274 @@ def _hash_mesh(verts, tris):
 # STEP → Shapes JSON (multi-solid)
 # -----------------------------
 
-def parse_step(filepath):
+def _part_entry(part_id, name, color, verts, tris, bb, vol, mesh_hash, loc=None):
+    return {
+        "id": part_id,
+        "type": "shapes",
+        "subtype": "solid",
+        "name": name,
+        "shape": {
+            "vertices": verts,
+            "triangles": tris,
+            "normals": [],
+            "edges": [],
+            "obj_vertices": [],
+            "face_types": [],
+            "edge_types": [],
+            "triangles_per_face": [],
+            "segments_per_edge": []
+        },
+        "state": [1, 1],
+        "color": color,
+        "alpha": 1.0,
+        "texture": None,
+        "loc": loc or [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0, 1.0]],
+        "renderback": True,
+        "accuracy": None,
+        "bb": bb,
+        "metrics": {
+            "volume": vol,
+            "mesh_hash": mesh_hash
+        }
+    }
+
+
+def _mesh(shape, as_arrays, deflection):
+    if as_arrays:
+        verts, tris = extract_mesh_arrays(shape, deflection=deflection)
+        return verts.ravel(), tris.ravel()
+    return extract_triangles(shape, deflection=deflection)
+
+
+def _measure(shape, as_arrays, deflection, lods=()):
+    """Mesh + metrics for one solid: (verts, tris, bb, volume, mesh_hash, {lod: (verts, tris)})."""
+    levels = {}
+    for name, lod_deflection in sorted(lods, key=lambda lv: -lv[1]):
+        if lod_deflection > deflection:
+            levels[name] = _mesh(shape, as_arrays, lod_deflection)
+    verts, tris = _mesh(shape, as_arrays, deflection)
+    return verts, tris, _bbox(shape), _volume(shape), _hash_mesh(verts, tris), levels
+
+
+# -----------------------------
+# Parallel meshing (one solid per task)
+# -----------------------------
+
+def shape_to_brep(shape):
+    """Serialize a TopoDS_Shape to BRep text (picklable)."""
+    write = getattr(BRepTools, "breptools_WriteToString", None)
+    if write is not None:
+        return write(shape)
+    fd, path = tempfile.mkstemp(suffix=".brep")
+    os.close(fd)
+    try:
+        BRepTools.breptools_Write(shape, path)
+        with open(path) as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+def shape_from_brep(text):
+    read = getattr(BRepTools, "breptools_ReadFromString", None)
+    if read is not None:
+        return read(text)
+    fd, path = tempfile.mkstemp(suffix=".brep")
+    with os.fdopen(fd, "w") as f:
+        f.write(text)
+    try:
+        shape = TopoDS_Shape()
+        BRepTools.breptools_Read(shape, path, BRep_Builder())
+        return shape
+    finally:
+        os.remove(path)
+
+
+def _measure_brep(args):
+    brep, as_arrays, deflection, lods = args
+    return _measure(shape_from_brep(brep), as_arrays, deflection, lods)
+
+
+def resolve_workers(workers=None):
+    """None → MERP_CAD_PARSE_WORKERS env, else every core. 0/1 means serial."""
+    if workers is None:
+        env = os.getenv("MERP_CAD_PARSE_WORKERS")
+        workers = int(env) if env not in (None, "") else (os.cpu_count() or 1)
+    return max(1, int(workers))
+
+
+def _measure_solids(solids, as_arrays, deflection, workers, lods=()):
+    """Results for each solid, in input order. Falls back to serial if the pool fails."""
+    workers = min(resolve_workers(workers), len(solids))
+    if workers > 1 and len(solids) >= MIN_PARALLEL_SOLIDS:
+        try:
+            tasks = [(shape_to_brep(s), as_arrays, deflection, tuple(lods)) for s in solids]
+            ctx = multiprocessing.get_context(POOL_START_METHOD)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                # map() yields in submission order → deterministic part order
+                return list(pool.map(_measure_brep, tasks))
+        except Exception:
+            traceback.print_exc()
+
+    return [_measure(s, as_arrays, deflection, lods) for s in solids]
+
+
+def _union_bb(bbs):
+    bbs = [bb for bb in bbs if bb]
+    if not bbs:
+        return None
+    return {
+        "xmin": min(bb["xmin"] for bb in bbs), "xmax": max(bb["xmax"] for bb in bbs),
+        "ymin": min(bb["ymin"] for bb in bbs), "ymax": max(bb["ymax"] for bb in bbs),
+        "zmin": min(bb["zmin"] for bb in bbs), "zmax": max(bb["zmax"] for bb in bbs),
+    }
+
+
+# -----------------------------
+# Instancing (pre-mesh geometry signatures)
+# -----------------------------
+
+def _count(shape, kind):
+    n = 0
+    ex = TopExp_Explorer(shape, kind)
+    while ex.More():
+        n += 1
+        ex.Next()
+    return n
+
+
+def _sig(x):
+    return f"{x:.{SIGNATURE_DIGITS}g}"
+
+
+def solid_signature(shape):
+    """Cheap pre-mesh signature: (key, centroid).
+
+    key covers volume, surface area, bbox extents, the inertia tensor about
+    the centroid and face/edge counts. Equal keys make two solids candidates
+    only: a mirrored or 180°-rotated copy can have the same key, so
+    group_instances also compares vertex_cloud() before sharing a mesh.
+    """
+    vprops = GProp_GProps()
+    brepgprop_VolumeProperties(shape, vprops)
+    sprops = GProp_GProps()
+    brepgprop_SurfaceProperties(shape, sprops)
+
+    box = Bnd_Box()
+    brepbndlib_Add(shape, box, False)
+    xmin, ymin, zmin, xmax, ymax, zmax = box.Get()
+
+    mat = vprops.MatrixOfInertia()
+    inertia = [mat.Value(r, c) for r in range(1, 4) for c in range(r, 4)]
+
+    key = tuple(_sig(v) for v in (
+        vprops.Mass(), sprops.Mass(),
+        xmax - xmin, ymax - ymin, zmax - zmin,
+        *inertia,
+    )) + (_count(shape, TopAbs_FACE), _count(shape, TopAbs_EDGE))
+
+    c = vprops.CentreOfMass()
+    return key, (c.X(), c.Y(), c.Z())
+
+
+def vertex_cloud(shape, centroid):
+    """Vertex positions relative to the centroid, snapped to a grid of
+    VERTEX_TOLERANCE × bbox diagonal. Two solids with equal clouds are
+    translated copies; rotated or mirrored ones differ. None without vertices."""
+    pts = []
+    ex = TopExp_Explorer(shape, TopAbs_VERTEX)
+    while ex.More():
+        p = BRep_Tool.Pnt(topods.Vertex(ex.Current()))
+        pts.append((p.X(), p.Y(), p.Z()))
+        ex.Next()
+    if not pts:
+        return None
+
+    pts = np.asarray(pts, dtype=np.float64) - np.asarray(centroid, dtype=np.float64)
+    diag = float(np.linalg.norm(pts.max(axis=0) - pts.min(axis=0)))
+    step = max(diag, 1.0) * VERTEX_TOLERANCE
+    return frozenset(map(tuple, np.rint(pts / step).astype(np.int64).tolist()))
+
+
+def _loc_from_trsf(trsf):
+    t = trsf.TranslationPart()
+    q = trsf.GetRotation()
+    return [[t.X(), t.Y(), t.Z()], [q.X(), q.Y(), q.Z(), q.W()]]
+
+
+def _instance_loc(rep, rep_centroid, solid, centroid):
+    """viewer loc mapping rep's (world-space) mesh onto solid."""
+    if solid.IsPartner(rep):
+        # Same TShape: exact transform, rotation included
+        trsf = solid.Location().Transformation().Multiplied(
+            rep.Location().Transformation().Inverted()
+        )
+        if abs(trsf.ScaleFactor() - 1.0) > 1e-9:
+            return None
+        return _loc_from_trsf(trsf)
+    return [
+        [centroid[0] - rep_centroid[0], centroid[1] - rep_centroid[1], centroid[2] - rep_centroid[2]],
+        [0.0, 0.0, 0.0, 1.0],
+    ]
+
+
+def group_instances(solids):
+    """[(rep_index, loc)] per solid; rep_index == own index for representatives.
+
+    A shared TShape (IsPartner) carries its exact transform. Otherwise equal
+    signatures are only trusted when the vertex clouds match too, since the
+    loc for those is a translation.
+    """
+    reps = []       # [(index, key, centroid)]
+    clouds = {}     # index -> vertex_cloud, computed on first key match
+    out = []
+
+    def cloud(i, centroid):
+        if i not in clouds:
+            clouds[i] = vertex_cloud(solids[i], centroid)
+        return clouds[i]
+
+    for i, solid in enumerate(solids):
+        try:
+            key, centroid = solid_signature(solid)
+        except Exception:
+            traceback.print_exc()
+            out.append((i, None))
+            continue
+
+        match = None
+        # Shared TShape wins (catches rotated copies), then translated copies
+        for j, rkey, rc in reps:
+            if solids[j].IsPartner(solid):
+                loc = _instance_loc(solids[j], rc, solid, centroid)
+            elif rkey == key and cloud(j, rc) is not None and cloud(j, rc) == cloud(i, centroid):
+                loc = _instance_loc(solids[j], rc, solid, centroid)
+            else:
+                continue
+            if loc is not None:
+                match = (j, loc)
+                break
+
+        if match is None:
+            reps.append((i, key, centroid))
+            out.append((i, None))
+        else:
+            out.append(match)
+    return out
+
+
+def parse_step(filepath, as_arrays=False, deflection=MESH_DEFLECTION, workers=1, instancing=True, lods=()):
     """Read a STEP file and return the viewer JSON with one entry per SOLID.
     filepath may be absolute or relative to your static/uploads path.
+    as_arrays=True leaves each shape's vertices/triangles as flat NumPy arrays
+    (float64 / int32) for mesh_binary; the default is JSON-ready lists.
+    workers > 1 meshes solids in a process pool (None = resolve_workers());
+    parts come back in the same order as the serial path.
+    instancing=True meshes repeated solids once: instance parts share the
+    representative's vertex/triangle objects, carry its index in
+    "instance_of" and place it with "loc"; representatives get "quantity".
+    lods=LOD_LEVELS adds part["lods"] = {name: {"vertices", "triangles"}} for
+    each level coarser than deflection; "shape" stays the full-detail mesh.
     """
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"STEP file not found: {filepath}")
@@ -155,102 +546,69 @@ def parse_step(filepath):
     if shape.IsNull():
         raise ValueError("Parsed shape is null")
 
-    # 2) Extract each SOLID under the root shape
-    parts = []
+    # 2) Collect each SOLID under the root shape
+    solids = []
     solid_ex = TopExp_Explorer(shape, TopAbs_SOLID)
+    while solid_ex.More():
+        solids.append(solid_ex.Current())
+        solid_ex.Next()
 
     color_palette = [
         "#e8b024", "#4cc9f0", "#72e06a", "#ff6b6b", "#c77dff",
         "#ffd166", "#06d6a0", "#bdb2ff", "#bde0fe", "#ffc6ff"
     ]
-    count = 0
 
-    while solid_ex.More():
-        solid = solid_ex.Current()
-
-        # Triangulate solid
-        verts, tris = extract_triangles(solid)
-
-        # Metrics
-        bb = _bbox(solid)
-        vol = _volume(solid)
-        mesh_hash = _hash_mesh(verts, tris)
-
-        # Build part entry
-        parts.append({
-            "id": f"/Imported/Solid_{count}",
-            "type": "shapes",
-            "subtype": "solid",
-            "name": f"Solid_{count}",
-            "shape": {
-                "vertices": verts,
-                "triangles": tris,
-                "normals": [],
-                "edges": [],
-                "obj_vertices": [],
-                "face_types": [],
-                "edge_types": [],
-                "triangles_per_face": [],
-                "segments_per_edge": []
-            },
-            "state": [1, 1],
-            "color": color_palette[count % len(color_palette)],
-            "alpha": 1.0,
-            "texture": None,
-            "loc": [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0, 1.0]],
-            "renderback": True,
-            "accuracy": None,
-            "bb": bb,
-            "metrics": {
-                "volume": vol,
-                "mesh_hash": mesh_hash
-            }
-        })
-
-        count += 1
-        solid_ex.Next()
+    # 3) Group repeated solids, then mesh + measure representatives only
+    groups = group_instances(solids) if instancing else [(i, None) for i in range(len(solids))]
+    rep_indexes = [i for i, (rep, _) in enumerate(groups) if rep == i]
+    measured = dict(zip(
+        rep_indexes,
+        _measure_solids([solids[i] for i in rep_indexes], as_arrays, deflection, workers, lods),
+    ))
+
+    parts = []
+    for count, (rep, loc) in enumerate(groups):
+        verts, tris, bb, vol, mesh_hash, levels = measured[rep]
+        if rep != count:
+            bb, vol = _bbox(solids[count]), _volume(solids[count])
+
+        entry = _part_entry(
+            f"/Imported/Solid_{count}",
+            f"Solid_{count}",
+            color_palette[rep % len(color_palette)],
+            verts, tris, bb, vol, mesh_hash, loc=loc,
+        )
+        if rep != count:
+            entry["instance_of"] = rep
+        if levels:
+            entry["lods"] = {name: {"vertices": v, "triangles": t} for name, (v, t) in levels.items()}
+        parts.append(entry)
+
+    if instancing:
+        for rep in rep_indexes:
+            parts[rep]["quantity"] = sum(1 for r, _ in groups if r == rep)
 
     # If no solids were found, fall back to meshing the root (prevents empty result)
     if not parts:
-        verts, tris = extract_triangles(shape)
-        bb = _bbox(shape)
-        vol = _volume(shape)
-        mesh_hash = _hash_mesh(verts, tris)
-        parts.append({
-            "id": "/Imported/Shape",
-            "type": "shapes",
-            "subtype": "solid",
-            "name": os.path.basename(filepath),
-            "shape": {
-                "vertices": verts,
-                "triangles": tris,
-                "normals": [],
-                "edges": [],
-                "obj_vertices": [],
-                "face_types": [],
-                "edge_types": [],
-                "triangles_per_face": [],
-                "segments_per_edge": []
-            },
-            "state": [1, 1],
-            "color": "#e8b024",
-            "alpha": 1.0,
-            "texture": None,
-            "loc": [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0, 1.0]],
-            "renderback": True,
-            "accuracy": None,
-            "bb": bb,
-            "metrics": {
-                "volume": vol,
-                "mesh_hash": mesh_hash
-            }
-        })
-    overall_bb = _bbox(shape)
+        verts, tris, bb, vol, mesh_hash, levels = _measure(shape, as_arrays, deflection, lods)
+        entry = _part_entry(
+            "/Imported/Shape",
+            os.path.basename(filepath),
+            "#e8b024",
+            verts, tris, bb, vol, mesh_hash,
+        )
+        if levels:
+            entry["lods"] = {name: {"vertices": v, "triangles": t} for name, (v, t) in levels.items()}
+        parts.append(entry)
+
+    # Union of part boxes: the root is never meshed in the pool path
+    overall_bb = _union_bb([p["bb"] for p in parts])
     padded_bb = _pad_bb(overall_bb, 0.03)
-    
+
     shapes = {
         "version": 3,
         "parts": parts,
+        "lod_levels": [name for name, d in sorted(lods, key=lambda lv: -lv[1]) if d > deflection],
         "loc": [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0, 1.0]],
         "name": os.path.basename(filepath),
         "id": "/Imported",
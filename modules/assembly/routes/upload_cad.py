@@ -1,20 +1,24 @@
 # File: modules/assembly/routes/upload_cad.py
 # Purpose: Handle STEP upload, parse to multi-part shapes JSON, and persist per-solid rows
+# V2: binary mesh bundles (manifest + float32/uint32 buffer), served with range + gzip
+# V3: uploads enqueue a CadJob; parsing/linking runs in `flask cad-worker`
 
 import os
-import json
-import shutil
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, abort, jsonify, session
 from werkzeug.utils import secure_filename
 
-from database.models import db, Assembly, ParsedComponent
-from modules.assembly.parser.step_parser import parse_step
+from database.models import db, Assembly, CadJob
+from modules.assembly.services.cad_job_service import (
+    PUBLIC_FOLDER,
+    enqueue_cad_job,
+    job_status_payload,
+)
+from modules.shared.services.blob_store import store_upload
+from modules.shared.services.file_serving import send_stored_file
 from modules.user.decorators import login_required  # admin_required not needed here
 
-# Storage paths
-UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), '../uploads/cad')
-PUBLIC_FOLDER = os.path.join('static/uploads/cad')  # served by Flask static
 ALLOWED_EXTENSIONS = {'step', 'stp'}
+MESH_FILE_EXTENSIONS = {'json', 'bin'}
 
 cad_upload_bp = Blueprint("cad_upload_bp", __name__)
 
@@ -34,68 +38,68 @@ def upload_cad():
             flash("❌ Invalid file type. Please upload a .step or .stp file.", "danger")
             return redirect(url_for("cad_upload_bp.upload_cad"))
 
-        # Save original upload and copy to public/static
-        filename = secure_filename(file.filename)
-        save_path = os.path.join(UPLOAD_FOLDER, filename)
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        file.save(save_path)
-
-        public_path = os.path.join(PUBLIC_FOLDER, filename)
-        os.makedirs(os.path.dirname(public_path), exist_ok=True)
-        shutil.copyfile(save_path, public_path)
-
-        # Parse STEP → shapes JSON (multi-solid)
-        try:
-            # Use absolute path for the parser to avoid CWD issues
-            abs_public = os.path.abspath(public_path)
-            parse_result = parse_step(abs_public)
-
-            shapes_json_filename = filename.rsplit('.', 1)[0] + ".json"
-            shapes_json_path = os.path.join(PUBLIC_FOLDER, shapes_json_filename)
-            with open(shapes_json_path, "w") as jf:
-                json.dump(parse_result, jf)
-        except Exception as e:
-            flash(f"❌ STEP parsing failed: {e}", "danger")
+        if assembly_id and not Assembly.query.get(int(assembly_id)):
+            flash("❌ Assembly not found.", "danger")
             return redirect(url_for("cad_upload_bp.upload_cad"))
 
-        # Optionally link to an Assembly and persist parsed components
-        if assembly_id:
-            assembly = Assembly.query.get(int(assembly_id))
-            if not assembly:
-                flash("❌ Assembly not found.", "danger")
-                return redirect(url_for("cad_upload_bp.upload_cad"))
-
-            # Link files to assembly
-            assembly.cad_filename = filename
-            assembly.shapes_filename = shapes_json_filename
-
-            # Rebuild parsed components for this assembly
-            try:
-                # Clear previous rows for a clean rebuild
-                ParsedComponent.query.filter_by(assembly_id=assembly.id).delete()
-
-                parts = parse_result.get("parts", [])
-                for i, p in enumerate(parts):
-                    metrics = p.get("metrics") or {}
-                    db.session.add(ParsedComponent(
-                        assembly_id=assembly.id,
-                        solid_index=i,
-                        name=p.get("name") or f"Solid_{i}",
-                        color=p.get("color"),
-                        mesh_hash=metrics.get("mesh_hash"),
-                        volume=metrics.get("volume"),
-                        bb=p.get("bb")
-                    ))
-
-                db.session.commit()
-                flash(f"✅ Linked CAD to Assembly {assembly.name} and stored {len(parts)} components.", "success")
-            except Exception as e:
-                db.session.rollback()
-                flash(f"⚠️ Linked files but failed to store parsed components: {e}", "danger")
-        else:
-            flash(f"✅ File uploaded: {filename} (not linked)", "success")
-
-        return redirect(url_for("cad_upload_bp.upload_cad"))
+        # One streaming pass into the blob store; parsing happens in `flask cad-worker`
+        filename = secure_filename(file.filename)
+        blob = store_upload(file)
+
+        job = enqueue_cad_job(
+            filename,
+            content_sha256=blob.sha256,
+            size_bytes=blob.size,
+            assembly_id=int(assembly_id) if assembly_id else None,
+            user_id=session.get("user_id"),
+        )
+        db.session.commit()
+
+        flash(f"⏳ {filename} queued for processing (job {job.id}).", "success")
+        return redirect(url_for("cad_upload_bp.upload_cad", job=job.id, assembly_id=assembly_id or None))
 
     # GET
-    return render_template("assembly/upload_cad.html")
+    job = None
+    job_id = request.args.get("job", type=int)
+    if job_id:
+        job = db.session.get(CadJob, job_id)
+    return render_template("assembly/upload_cad.html", job=job)
+
+
+@cad_upload_bp.route("/cad/jobs/<int:job_id>")
+@login_required
+def cad_job_status(job_id):
+    job = db.session.get(CadJob, job_id)
+    if not job:
+        abort(404)
+    return jsonify(job_status_payload(job))
+
+
+@cad_upload_bp.route("/cad/mesh/<path:filename>")
+@login_required
+def cad_mesh_file(filename):
+    """Serve a shapes manifest / mesh buffer.
+
+    Range requests get the raw file (206 / ETag / 304 via send_stored_file);
+    a plain GET from a gzip-capable client gets the precompressed .gz sibling.
+    """
+    filename = secure_filename(filename)
+    if filename.rsplit('.', 1)[-1].lower() not in MESH_FILE_EXTENSIONS:
+        abort(404)
+
+    folder = os.path.abspath(PUBLIC_FOLDER)
+    path = os.path.join(folder, filename)
+    if not os.path.exists(path):
+        abort(404)
+
+    gz_path = path + ".gz"
+    wants_gzip = "gzip" in (request.headers.get("Accept-Encoding") or "").lower()
+
+    # Bundle names are reused on re-upload, so these revalidate (no immutable caching)
+    if wants_gzip and "Range" not in request.headers and os.path.exists(gz_path):
+        resp = send_stored_file(gz_path, mimetype="application/octet-stream", content_encoding="gzip")
+    else:
+        resp = send_stored_file(path)
+
+    resp.headers["Vary"] = "Accept-Encoding"
+    return resp
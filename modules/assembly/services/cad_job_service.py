@@ -0,0 +1,309 @@
+# File path: modules/assembly/services/cad_job_service.py
+# V1 - Background STEP parse queue (cad_jobs)
+"""
+Upload → blob_store.store_upload() → enqueue_cad_job() → commit → 302
+`flask cad-worker` → claim_next_job() → run_cad_job():
+    parse the blob (through parse_cache) → publish bundle → record it on the job
+
+Linking the result to an Assembly and its ParsedComponent rows is
+deferred until the assembly module (and those models) come back;
+assembly_id is kept on the job so finished jobs can be linked then.
+
+Claiming is a conditional UPDATE (status='queued' → 'running'), so several
+workers can share the table. Failures are stored on the job row (error,
+status='failed').
+
+While a job runs, a background thread in its worker refreshes heartbeat_at
+every MERP_CAD_JOB_HEARTBEAT_SECONDS on its own connection. Workers check
+for 'running' jobs whose heartbeat has been silent for
+MERP_CAD_JOB_STALE_SECONDS (dead worker) when they start and between jobs,
+and requeue them. A long parse keeps its heartbeat, so starting another
+worker never takes it over.
+
+enqueue_cad_job: no commit here. Worker functions commit per job.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy import update
+
+from database.models import db, CadJob
+from modules.shared.services.blob_store import blob_path, has_blob, link_blob
+from modules.shared.services import metrics
+
+# Storage paths (shared with routes/upload_cad.py)
+UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), '../uploads/cad')  # pre-blob jobs only
+PUBLIC_FOLDER = os.path.join('static/uploads/cad')
+
+# MERP_CAD_MESH_FORMAT: "binary" (manifest + .bin) or "json" (legacy float lists)
+MESH_FORMAT_BINARY = "binary"
+MESH_FORMAT_JSON = "json"
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_STATUSES = (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED)
+
+MAX_ATTEMPTS = 3
+ERROR_MAX_CHARS = 4000
+
+
+logger = logging.getLogger(__name__)
+
+
+class CadJobError(Exception):
+    pass
+
+
+def enqueue_cad_job(
+    filename: str,
+    *,
+    content_sha256: Optional[str] = None,
+    size_bytes: Optional[int] = None,
+    assembly_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+) -> CadJob:
+    job = CadJob(
+        status=JOB_QUEUED,
+        filename=filename,
+        content_sha256=content_sha256,
+        size_bytes=size_bytes,
+        assembly_id=assembly_id,
+        created_by_user_id=user_id,
+    )
+    db.session.add(job)
+    db.session.flush()
+    return job
+
+
+def job_status_payload(job: CadJob) -> dict:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "filename": job.filename,
+        "assembly_id": job.assembly_id,
+        "shapes_filename": job.shapes_filename,
+        "part_count": job.part_count,
+        "cache_hit": bool(job.cache_hit),
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "heartbeat_at": job.heartbeat_at.isoformat() if job.heartbeat_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+# -----------------------------
+# Worker side
+# -----------------------------
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"[:64]
+
+
+def _stale(cutoff: datetime):
+    # No heartbeat at all: claimed by a worker that predates heartbeats
+    return (
+        (CadJob.status == JOB_RUNNING)
+        & (CadJob.heartbeat_at.is_(None) | (CadJob.heartbeat_at < cutoff))
+    )
+
+
+def requeue_stale_jobs(stale_seconds: int) -> int:
+    """
+    Put 'running' jobs whose heartbeat is older than stale_seconds back in the
+    queue (or fail them past MAX_ATTEMPTS). Each change is a conditional UPDATE,
+    so a heartbeat that lands meanwhile keeps the job. Commits.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_seconds)
+    stale = db.session.query(CadJob.id, CadJob.attempts, CadJob.worker).filter(_stale(cutoff)).all()
+
+    moved = 0
+    for job_id, attempts, worker in stale:
+        if attempts >= MAX_ATTEMPTS:
+            values = dict(
+                status=JOB_FAILED,
+                error=f"Worker {worker} stopped responding ({attempts} attempts).",
+                finished_at=datetime.utcnow(),
+            )
+        else:
+            values = dict(status=JOB_QUEUED, worker=None, heartbeat_at=None)
+        res = db.session.execute(update(CadJob).where(CadJob.id == job_id, _stale(cutoff)).values(**values))
+        moved += res.rowcount
+    db.session.commit()
+    return moved
+
+
+class _Heartbeat:
+    """Refresh one running job's heartbeat_at from a background thread."""
+
+    def __init__(self, engine, job_id: int, worker: str, interval: float):
+        self.engine = engine
+        self.job_id = job_id
+        self.worker = worker
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"cad-heartbeat-{job_id}", daemon=True)
+
+    def _beat(self) -> None:
+        # Own connection: the worker's session is busy in the job and not thread-safe
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(CadJob)
+                .where(CadJob.id == self.job_id, CadJob.status == JOB_RUNNING, CadJob.worker == self.worker)
+                .values(heartbeat_at=datetime.utcnow())
+            )
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self._beat()
+            except Exception:
+                logger.warning("cad job heartbeat failed", exc_info=True, extra={"cad_job_id": self.job_id})
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def claim_next_job(worker: str) -> Optional[CadJob]:
+    """Atomically move the oldest queued job to running. Commits."""
+    while True:
+        job_id = (
+            db.session.query(CadJob.id)
+            .filter(CadJob.status == JOB_QUEUED)
+            .order_by(CadJob.id.asc())
+            .limit(1)
+            .scalar()
+        )
+        if job_id is None:
+            return None
+
+        res = db.session.execute(
+            update(CadJob)
+            .where(CadJob.id == job_id, CadJob.status == JOB_QUEUED)
+            .values(
+                status=JOB_RUNNING,
+                worker=worker,
+                started_at=datetime.utcnow(),
+                heartbeat_at=datetime.utcnow(),
+                attempts=CadJob.attempts + 1,
+            )
+        )
+        db.session.commit()
+        if res.rowcount == 1:
+            return db.session.get(CadJob, job_id)
+        # Another worker won the race; try the next one
+
+
+def _publish(src: str, stem: str, content_sha: str = None):
+    """Parse src into PUBLIC_FOLDER/<stem>.* per MERP_CAD_MESH_FORMAT. Returns (shapes_filename, manifest, cache_hit)."""
+    from modules.assembly.parser.parse_cache import get_or_parse, parse_workers
+
+    if current_app.config.get("MERP_CAD_MESH_FORMAT", MESH_FORMAT_BINARY) == MESH_FORMAT_JSON:
+        from modules.assembly.parser.mesh_binary import shapes_to_lists
+        from modules.assembly.parser.step_parser import parse_step
+
+        shapes = shapes_to_lists(parse_step(src, as_arrays=True, workers=parse_workers()))
+        shapes_filename = stem + ".json"
+        with open(os.path.join(PUBLIC_FOLDER, shapes_filename), "w") as jf:
+            json.dump(shapes, jf)
+        return shapes_filename, shapes, False
+
+    # Same bytes + parser version + tolerance → reuse the cached bundle
+    return get_or_parse(src, PUBLIC_FOLDER, stem, content_sha=content_sha)
+
+
+def run_cad_job(job: CadJob) -> CadJob:
+    """Parse and publish one claimed job. Records failure on the row. Commits."""
+    try:
+        if job.content_sha256 and has_blob(job.content_sha256):
+            src = blob_path(job.content_sha256)
+            # Keep the original STEP downloadable next to the viewer files (hard link, no copy)
+            link_blob(job.content_sha256, os.path.join(PUBLIC_FOLDER, job.filename))
+        else:
+            src = os.path.join(UPLOAD_FOLDER, job.filename)
+            if not os.path.exists(src):
+                raise CadJobError(f"Uploaded file is missing: {job.filename}")
+
+        os.makedirs(PUBLIC_FOLDER, exist_ok=True)
+        stem = job.filename.rsplit('.', 1)[0]
+        t0 = time.perf_counter()
+        shapes_filename, manifest, hit = _publish(os.path.abspath(src), stem, job.content_sha256)
+        metrics.observe("merp_step_parse_seconds", time.perf_counter() - t0, cache=("hit" if hit else "miss"))
+
+        job.shapes_filename = shapes_filename
+        job.part_count = len(manifest.get("parts", []))
+        job.cache_hit = hit
+
+        job.status = JOB_DONE
+        job.error = None
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    except Exception as e:
+        logger.exception("cad job failed", extra={"cad_job_id": job.id})
+        db.session.rollback()
+        job = db.session.get(CadJob, job.id)
+        job.status = JOB_FAILED
+        job.error = (f"{type(e).__name__}: {e}\n\n" + traceback.format_exc())[:ERROR_MAX_CHARS]
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    return job
+
+
+def run_worker(
+    *,
+    once: bool = False,
+    poll_seconds: float = 2.0,
+    max_jobs: Optional[int] = None,
+    log=logger.info,
+) -> int:
+    """Process queued jobs until stopped (or the queue is empty with once=True). Returns jobs run."""
+    worker = worker_name()
+    stale_after = int(current_app.config.get("MERP_CAD_JOB_STALE_SECONDS", 5 * 60))
+    beat_every = float(current_app.config.get("MERP_CAD_JOB_HEARTBEAT_SECONDS", 30))
+    engine = db.engine
+
+    ran = 0
+    next_stale_check = 0.0
+    while max_jobs is None or ran < max_jobs:
+        if time.monotonic() >= next_stale_check:
+            requeued = requeue_stale_jobs(stale_after)
+            if requeued:
+                log(f"Requeued {requeued} stale CAD job(s).")
+            next_stale_check = time.monotonic() + beat_every
+
+        job = claim_next_job(worker)
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_seconds)
+            continue
+
+        t0 = time.perf_counter()
+        with _Heartbeat(engine, job.id, worker, beat_every):
+            job = run_cad_job(job)
+        ran += 1
+        log(
+            f"cad job {job.id} {job.status} in {time.perf_counter() - t0:.1f}s"
+            + (f" ({job.part_count} parts{', cached' if job.cache_hit else ''})" if job.status == JOB_DONE else "")
+        )
+        metrics.flush(force=True)
+    return ran
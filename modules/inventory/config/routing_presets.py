@@ -6,60 +6,70 @@ ROUTING_STEP_PRESETS = {
         "module_key": "raw_materials",
         "sequence": 10,
         "is_outsourced": False,
+        "output_stage_key": "blank",
     },
     "laser_cut": {
         "op_name": " Laser Cut Blanks",
         "module_key": "raw_materials",
         "sequence": 12,
         "is_outsourced": True,
+        "output_stage_key": "blank",
     },
     "edm_cut": {
         "op_name": " EDM Blanks",
         "module_key": "raw_materials",
         "sequence": 14,
         "is_outsourced": True,
+        "output_stage_key": "blank",
     },
     "bandsaw_cut": {
         "op_name": " Bandsaw Cut Blanks",
         "module_key": "raw_materials",
         "sequence": 16,
         "is_outsourced": False,
+        "output_stage_key": "blank",
     },
     "tablesaw_cut": {
         "op_name": " Tablesaw Cut Blanks",
         "module_key": "raw_materials",
         "sequence": 18,
         "is_outsourced": False,
+        "output_stage_key": "blank",
     },
     "surface_grind": {
         "op_name": " Surface Grind Blade Blanks",
         "module_key": "surface_grinding",
         "sequence": 20,
         "is_outsourced": False,
+        "output_stage_key": "mfg_wip",
     },
     "cnc_profile": {
         "op_name": "Profile Blanks",
         "module_key": "manufacturing",
         "sequence": 30,
         "is_outsourced": False,
+        "output_stage_key": "mfg_wip",
     },
     "heat_treat": {
         "op_name": "Send Blades out for Heat Treat",
         "module_key": "heat_treat",
         "sequence": 40,
         "is_outsourced": True,
+        "output_stage_key": "mfg_wip",
     },
     "in_house_ht": {
         "op_name": "Heat Treat",
         "module_key": "heat_treat",
         "sequence": 45,
         "is_outsourced": False,
+        "output_stage_key": "mfg_wip",
     },
     "bevel_grind": {
         "op_name": "Bevel Grind Blades",
         "module_key": "bevel_grinding",
         "sequence": 50,
         "is_outsourced": False,
+        "output_stage_key": "mfg_complete",
     }
     
     
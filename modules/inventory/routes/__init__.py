@@ -11,3 +11,5 @@ from .stock_history import *  # noqa
 
 from .raw_stock import *  # noqa
 from .parts_inventory import *  # noqa
+from .reorder import *  # noqa
+from .stock_import import *  # noqa
@@ -10,6 +10,7 @@ from modules.inventory.services.bulk_convert_service import (
     BulkConvertError,
 )
 from modules.inventory.services.stock_ledger_service import post_stock_move, get_on_hand_map
+from modules.shared.services.search_index import apply_search_filter
 
 from modules.inventory import inventory_bp
 
@@ -26,16 +27,13 @@ def bulk_index():
         q = q.filter(BulkHardware.is_active.is_(True))
 
     # Search (only if your template uses name="q")
-    if qtext:
-        like = f"%{qtext}%"
-        q = q.filter(
-            (BulkHardware.name.ilike(like)) |
-            (BulkHardware.grade.ilike(like)) |
-            (BulkHardware.material_type.ilike(like)) |
-            (BulkHardware.form.ilike(like)) |
-            (BulkHardware.vendor.ilike(like)) |
-            (BulkHardware.location.ilike(like))
-        )
+    q = apply_search_filter(
+        q, "bulk_hardware", BulkHardware.id, qtext,
+        fallback_columns=[
+            BulkHardware.item_code, BulkHardware.name, BulkHardware.description,
+            BulkHardware.vendor, BulkHardware.vendor_sku,
+        ],
+    )
 
     sort = (request.args.get("sort") or "code").strip()
     dir_ = (request.args.get("dir") or "desc").strip().lower()
@@ -2,32 +2,30 @@
 
 import os
 from flask import (
+    abort,
     request,
     redirect,
     url_for,
     flash,
     current_app,
-    send_file,
 )
 from werkzeug.utils import secure_filename
 
 from database.models import db, Part, PartDrawing
 from modules.user.decorators import login_required
 from modules.inventory import inventory_bp
+from modules.shared.services.blob_store import store_upload
+from modules.shared.services.file_serving import send_stored_file
+from modules.shared.services.pdf_thumbnails import (
+    THUMB_WIDTH,
+    backfill_drawing_hash,
+    ensure_thumbnail,
+    queue_thumbnail,
+    thumbnail_path,
+)
 
 
 
-def _part_drawing_storage_dir(part_id: int) -> str:
-    return os.path.join(
-        current_app.root_path,
-        "modules",
-        "inventory",
-        "uploads",
-        "part_drawings",
-        str(part_id),
-    )
-
-
 def _abs_from_stored_path(stored_path: str) -> str:
     return os.path.join(current_app.root_path, stored_path)
 
@@ -51,22 +49,20 @@ def part_drawing_upload(part_id):
     drawing_type = (request.form.get("drawing_type") or "cad_pdf").strip()
     notes = (request.form.get("notes") or "").strip() or None
 
-    abs_dir = _part_drawing_storage_dir(part.id)
-    os.makedirs(abs_dir, exist_ok=True)
+    # Content-addressed: one pass over the bytes, identical files stored once
+    blob = store_upload(f)
 
-    abs_path = os.path.join(abs_dir, filename)
-    if os.path.exists(abs_path):
-        flash("A drawing with that filename already exists for this part.", "error")
+    dup = PartDrawing.query.filter_by(part_id=part.id, content_sha256=blob.sha256).first()
+    if dup:
+        flash(f"This drawing is already on file for this part ({dup.filename}, rev {dup.rev}).", "info")
         return redirect(request.referrer)
 
-    f.save(abs_path)
-
-    rel_path = os.path.relpath(abs_path, current_app.root_path)
-
     drawing = PartDrawing(
         part_id=part.id,
         filename=filename,
-        stored_path=rel_path,
+        stored_path=blob.stored_path,
+        content_sha256=blob.sha256,
+        size_bytes=blob.size,
         drawing_type=drawing_type,
         rev=rev,
         notes=notes,
@@ -75,6 +71,9 @@ def part_drawing_upload(part_id):
     db.session.add(drawing)
     db.session.commit()
 
+    # First-page preview renders off the request thread
+    queue_thumbnail(blob.path, thumbnail_path(blob.sha256))
+
     flash("Part drawing uploaded.", "success")
     return redirect(request.referrer)
 
@@ -89,9 +88,35 @@ def view_part_drawing(drawing_id):
         flash("Drawing file not found on disk.", "error")
         return redirect(request.referrer)
 
-    return send_file(
+    # Strong ETag from the blob hash, 304s, byte ranges for large PDFs
+    return send_stored_file(
         abs_path,
         mimetype="application/pdf",
         as_attachment=False,
         download_name=drawing.filename,
+        content_sha256=drawing.content_sha256,
+    )
+
+
+@inventory_bp.route("/part_drawings/<int:drawing_id>/thumb.png", methods=["GET"])
+@login_required
+def part_drawing_thumbnail(drawing_id):
+    drawing = PartDrawing.query.get_or_404(drawing_id)
+
+    abs_path = _abs_from_stored_path(drawing.stored_path)
+    if not drawing.content_sha256:
+        # Pre-blob drawing: hash once so the thumbnail can be keyed by content
+        if not backfill_drawing_hash(drawing, abs_path):
+            abort(404)
+        db.session.commit()
+
+    # Normally rendered after upload; render here if that has not happened yet
+    thumb = ensure_thumbnail(abs_path, thumbnail_path(drawing.content_sha256))
+    if not thumb:
+        abort(404)
+
+    return send_stored_file(
+        thumb,
+        mimetype="image/png",
+        content_sha256=f"{drawing.content_sha256}.t{THUMB_WIDTH}",
     )
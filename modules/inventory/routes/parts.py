@@ -1,10 +1,10 @@
 # File path: modules/inventory/routes/parts.py
 from flask import render_template, request, redirect, url_for, flash
-from sqlalchemy import or_
 
 from database.models import db, Part, PartType
 from modules.user.decorators import login_required, admin_required
 from modules.inventory import inventory_bp
+from modules.shared.services.search_index import apply_search_filter
 
 from modules.inventory.services.parts_service import part_is_ready, part_readiness_detail, sync_part_status
 
@@ -169,17 +169,10 @@ def part_types_delete(type_id):
 @login_required
 def parts_index():
     q = (request.args.get("q") or "").strip()
-    parts_query = Part.query
-
-    if q:
-        like = f"%{q}%"
-        parts_query = parts_query.filter(
-            or_(
-                Part.part_number.ilike(like),
-                Part.name.ilike(like),
-                Part.description.ilike(like),
-            )
-        )
+    parts_query = apply_search_filter(
+        Part.query, "part", Part.id, q,
+        fallback_columns=[Part.part_number, Part.name, Part.description],
+    )
 
     parts = parts_query.order_by(Part.part_number.asc()).all()
     return render_template("inventory/parts/index.html", parts=parts, q=q)
@@ -4,6 +4,7 @@ from modules.user.decorators import login_required, admin_required
 from modules.inventory import inventory_bp
 from database.models import db, RawStock
 from modules.inventory.services.stock_ledger_service import get_on_hand_map, post_stock_move
+from modules.shared.services.search_index import apply_search_filter
 
 
 @inventory_bp.route("/raw_stock", methods=["GET"])
@@ -17,16 +18,13 @@ def raw_stock_index():
         q = q.filter(RawStock.is_active.is_(True))
 
     # Search (only if your template uses name="q")
-    if qtext:
-        like = f"%{qtext}%"
-        q = q.filter(
-            (RawStock.name.ilike(like)) |
-            (RawStock.grade.ilike(like)) |
-            (RawStock.material_type.ilike(like)) |
-            (RawStock.form.ilike(like)) |
-            (RawStock.vendor.ilike(like)) |
-            (RawStock.location.ilike(like))
-        )
+    q = apply_search_filter(
+        q, "raw_stock", RawStock.id, qtext,
+        fallback_columns=[
+            RawStock.name, RawStock.grade, RawStock.material_type,
+            RawStock.form, RawStock.vendor, RawStock.location,
+        ],
+    )
 
     sort = (request.args.get("sort") or "code").strip()
     dir_ = (request.args.get("dir") or "desc").strip().lower()
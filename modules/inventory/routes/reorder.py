@@ -0,0 +1,35 @@
+# File path: modules/inventory/routes/reorder.py
+
+from flask import render_template, request
+from modules.user.decorators import login_required
+from modules.inventory import inventory_bp
+from modules.inventory.services.reorder_service import (
+    get_reorder_rows,
+    lead_days,
+    REORDER_ENTITY_TYPES,
+)
+
+
+REORDER_DISPLAY_TYPE = {
+    "bulk_hardware": "Bulk Hardware",
+    "waterjet_consumable": "Waterjet Consumable",
+}
+
+
+@inventory_bp.route("/reorder", methods=["GET"])
+@login_required
+def reorder_index():
+    entity_type = (request.args.get("type") or "").strip()
+    show_all = request.args.get("show") == "all"
+
+    types = [entity_type] if entity_type in REORDER_ENTITY_TYPES else None
+    rows = get_reorder_rows(entity_types=types, low_only=not show_all)
+
+    return render_template(
+        "inventory/reorder/index.html",
+        rows=rows,
+        entity_type=entity_type,
+        show_all=show_all,
+        lead_days=lead_days(),
+        display_type=REORDER_DISPLAY_TYPE,
+    )
@@ -4,6 +4,7 @@ from database.models import db, PartType, RoutingTemplate, Part, RoutingHeader,
 from modules.user.decorators import login_required, admin_required
 from modules.inventory.services.parts_service import sync_part_status
 from modules.inventory.config.routing_presets import ROUTING_STEP_PRESETS
+from modules.inventory.services.inventory_posting_service import INVENTORY_STAGE_KEYS
 from modules.inventory import inventory_bp
 
 
@@ -94,6 +95,7 @@ def routing_detail(routing_id):
         bom_id=bom_id,
         line_id=line_id,
         step_presets=ROUTING_STEP_PRESETS,
+        inventory_stage_keys=INVENTORY_STAGE_KEYS,
     )
 
 
@@ -111,6 +113,7 @@ def routing_step_add(routing_id):
     module_key = (request.form.get("module_key") or "").strip()
     sequence = request.form.get("sequence", type=int) or 10
     is_outsourced = True if request.form.get("is_outsourced") == "on" else False
+    output_stage_key = (request.form.get("output_stage_key") or "").strip() or None
     notes = (request.form.get("notes") or "").strip() or None
 
 	# apply preset defaults if user didn't fill fields
@@ -123,6 +126,8 @@ def routing_step_add(routing_id):
             sequence = preset["sequence"]
         if request.form.get("is_outsourced") is None:
             is_outsourced = preset.get("is_outsourced", False)
+        if request.form.get("output_stage_key") is None:
+            output_stage_key = preset.get("output_stage_key")
 
     if not op_key or not op_name or not module_key:
         flash("op_key, op_name, and module are required.", "error")
@@ -132,6 +137,10 @@ def routing_step_add(routing_id):
         flash("Invalid module selected.", "error")
         return redirect(url_for("inventory_bp.routing_detail", routing_id=routing.id))
 
+    if output_stage_key and output_stage_key not in INVENTORY_STAGE_KEYS:
+        flash("Invalid inventory stage selected.", "error")
+        return redirect(url_for("inventory_bp.routing_detail", routing_id=routing.id))
+
     exists = RoutingStep.query.filter_by(routing_id=routing.id, op_key=op_key).first()
     if exists:
         flash("That op_key already exists for this routing.", "error")
@@ -144,6 +153,7 @@ def routing_step_add(routing_id):
         module_key=module_key,
         sequence=sequence,
         is_outsourced=is_outsourced,
+        output_stage_key=output_stage_key,
         notes=notes,
     ))
     db.session.commit()
@@ -11,6 +11,7 @@ DISPLAY_TYPE = {
     "bulk_hardware": "Bulk Hardware",
     "raw_stock": "Raw Stock",
     "part_inventory": "Part Inventory",
+    "waterjet_consumable": "Waterjet Consumable",
 }
 
 
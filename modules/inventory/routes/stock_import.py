@@ -0,0 +1,63 @@
+# File path: modules/inventory/routes/stock_import.py
+
+import io
+
+from flask import render_template, request, redirect, url_for, flash, session
+from modules.user.decorators import login_required, admin_required
+from modules.inventory import inventory_bp
+from modules.inventory.services.stock_import_service import (
+    import_stock_csv,
+    StockImportError,
+    STATUS_CHANGE,
+    STATUS_ERROR,
+)
+from modules.inventory.routes.stock_history import DISPLAY_TYPE
+
+
+@inventory_bp.route("/stock/import", methods=["GET"])
+@login_required
+@admin_required
+def stock_import():
+    return render_template("inventory/stock/import.html", report=None, display_type=DISPLAY_TYPE)
+
+
+@inventory_bp.route("/stock/import", methods=["POST"])
+@login_required
+@admin_required
+def stock_import_post():
+    f = request.files.get("csv_file")
+    if not f or not f.filename:
+        flash("Choose a CSV file.", "error")
+        return redirect(url_for("inventory_bp.stock_import"))
+
+    dry_run = request.form.get("mode") != "apply"
+    show_all = request.form.get("show_all") == "on"
+
+    stream = io.TextIOWrapper(f.stream, encoding="utf-8-sig", newline="")
+    try:
+        report = import_stock_csv(
+            stream,
+            dry_run=dry_run,
+            source_ref=f.filename,
+            user_id=session.get("user_id"),
+        )
+    except (StockImportError, UnicodeDecodeError, ValueError) as e:
+        flash(f"Import failed: {e}", "error")
+        return redirect(url_for("inventory_bp.stock_import"))
+
+    if not dry_run:
+        flash(
+            f"Posted {report.posted} ledger entr{'y' if report.posted == 1 else 'ies'} "
+            f"({report.errors} row(s) skipped).",
+            "success" if report.ok else "warning",
+        )
+
+    rows = report.rows if show_all else [r for r in report.rows if r.status in (STATUS_CHANGE, STATUS_ERROR)]
+
+    return render_template(
+        "inventory/stock/import.html",
+        report=report,
+        rows=rows,
+        show_all=show_all,
+        display_type=DISPLAY_TYPE,
+    )
@@ -2,6 +2,7 @@
 from collections import defaultdict
 
 from modules.inventory.services.stock_ledger_service import get_on_hand_map
+from modules.shared.services.search_index import apply_search_filter
 
 from database.models import (
     db,
@@ -41,12 +42,10 @@ def get_catalog_rows(
         if not include_inactive:
             part_q = part_q.filter(Part.status == "active")
 
-        if search:
-            like = f"%{search}%"
-            part_q = part_q.filter(
-                (Part.part_number.ilike(like)) |
-                (Part.name.ilike(like))
-            )
+        part_q = apply_search_filter(
+            part_q, "part", Part.id, search,
+            fallback_columns=[Part.part_number, Part.name],
+        )
 
         parts = part_q.all()
 
@@ -90,12 +89,10 @@ def get_catalog_rows(
         if not include_inactive:
             raw_q = raw_q.filter(RawStock.is_active == True)
 
-        if search:
-            like = f"%{search}%"
-            raw_q = raw_q.filter(
-                (RawStock.name.ilike(like)) |
-                (RawStock.grade.ilike(like))
-            )
+        raw_q = apply_search_filter(
+            raw_q, "raw_stock", RawStock.id, search,
+            fallback_columns=[RawStock.name, RawStock.grade],
+        )
 
         raws = raw_q.all()
         raw_qty_map = get_on_hand_map("raw_stock", [r.id for r in raws])
@@ -121,12 +118,10 @@ def get_catalog_rows(
         if not include_inactive:
             bulk_q = bulk_q.filter(BulkHardware.is_active == True)
 
-        if search:
-            like = f"%{search}%"
-            bulk_q = bulk_q.filter(
-                (BulkHardware.item_code.ilike(like)) |
-                (BulkHardware.name.ilike(like))
-            )
+        bulk_q = apply_search_filter(
+            bulk_q, "bulk_hardware", BulkHardware.id, search,
+            fallback_columns=[BulkHardware.item_code, BulkHardware.name],
+        )
 
         bulks = bulk_q.all()
         bulk_qty_map = get_on_hand_map("bulk_hardware", [b.id for b in bulks])
@@ -0,0 +1,245 @@
+# File path: modules/inventory/services/inventory_posting_service.py
+# V1 - Ledger-backed PartInventory postings (batched)
+"""
+Every PartInventory movement goes through a PartInventoryPostingBatch:
+
+    batch = get_request_posting_batch(source_type="build_operation", source_ref=f"op-{op.id}")
+    batch.post(part_id, "mfg_wip", -3)
+    batch.post(part_id, "mfg_complete", +3)
+    batch.flush()          # before db.session.commit()
+
+- Inventory rows resolve through a per-request cache (flask.g), so repeated
+  postings against the same (part, stage, rev, config) cost no lookups and
+  preload() fetches many keys in one query.
+- flush() creates missing rows with one session flush, applies balance
+  deltas to the cached rows (one batched UPDATE via the unit of work) and
+  writes all StockLedgerEntry rows with one executemany INSERT.
+
+qty_on_hand and the ledger move together, so reconcile_service sees no drift.
+No commit here.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import g, has_app_context, session, has_request_context
+from sqlalchemy import and_, inspect, or_
+
+from database.models import db, PartInventory, StockLedgerEntry
+
+# Canonical stage flow (see PartInventory.stage_key)
+STAGE_BLANK = "blank"
+STAGE_MFG_WIP = "mfg_wip"
+STAGE_MFG_COMPLETE = "mfg_complete"
+STAGE_FINISH_WIP = "finish_wip"
+STAGE_FINISH_COMPLETE = "finish_complete"
+STAGE_FG_COMPLETE = "fg_complete"
+
+INVENTORY_STAGE_KEYS = (
+    STAGE_BLANK,
+    STAGE_MFG_WIP,
+    STAGE_MFG_COMPLETE,
+    STAGE_FINISH_WIP,
+    STAGE_FINISH_COMPLETE,
+    STAGE_FG_COMPLETE,
+)
+
+PART_INVENTORY_ENTITY = "part_inventory"
+
+InvKey = Tuple[int, str, str, Optional[str]]
+
+
+def _key(part_id, stage_key, rev="A", config_key=None) -> InvKey:
+    return (int(part_id), stage_key, rev or "A", config_key)
+
+
+class PartInventoryPostingBatch:
+    def __init__(
+        self,
+        source_type: Optional[str] = None,
+        source_ref: Optional[str] = None,
+        user_id: Optional[int] = None,
+        rows: Optional[Dict[InvKey, PartInventory]] = None,
+    ):
+        self.source_type = source_type
+        self.source_ref = source_ref
+        self.user_id = user_id
+        # Shared row cache (request-scoped when built via get_request_posting_batch)
+        self._rows: Dict[InvKey, PartInventory] = rows if rows is not None else {}
+        self._pending: List[dict] = []
+        self._deltas: "OrderedDict[InvKey, float]" = OrderedDict()
+
+    # -----------------------------
+    # Row cache
+    # -----------------------------
+
+    def preload(self, keys: Iterable[InvKey]) -> None:
+        """Fetch every uncached inventory row for `keys` in one query."""
+        missing = [k for k in {_key(*k) for k in keys} if k not in self._rows]
+        if not missing:
+            return
+
+        conds = []
+        for pid, stage, rev, cfg in missing:
+            cfg_cond = PartInventory.config_key.is_(None) if cfg is None else PartInventory.config_key == cfg
+            conds.append(and_(
+                PartInventory.part_id == pid,
+                PartInventory.stage_key == stage,
+                PartInventory.rev == rev,
+                cfg_cond,
+            ))
+
+        for inv in PartInventory.query.filter(or_(*conds)).all():
+            self._rows[_key(inv.part_id, inv.stage_key, inv.rev, inv.config_key)] = inv
+
+    def row(self, part_id, stage_key, rev="A", config_key=None, uom="ea") -> PartInventory:
+        """Cached get-or-create (new rows are added to the session, not flushed)."""
+        key = _key(part_id, stage_key, rev, config_key)
+        inv = self._rows.get(key)
+        if inv is not None and inv not in db.session:
+            # Dropped by a rollback earlier in the request
+            del self._rows[key]
+            inv = None
+        if inv is None:
+            self.preload([key])
+            inv = self._rows.get(key)
+        if inv is None:
+            inv = PartInventory(
+                part_id=key[0],
+                stage_key=key[1],
+                rev=key[2],
+                config_key=key[3],
+                qty_on_hand=0.0,
+                uom=uom or "ea",
+            )
+            db.session.add(inv)
+            self._rows[key] = inv
+        if not inv.uom:
+            inv.uom = uom or "ea"
+        return inv
+
+    # -----------------------------
+    # Postings
+    # -----------------------------
+
+    def post(
+        self,
+        part_id: int,
+        stage_key: str,
+        qty_delta: float,
+        uom: str = "ea",
+        rev: str = "A",
+        config_key: Optional[str] = None,
+        reason: str = "adjust",
+        note: Optional[str] = None,
+    ) -> None:
+        """Queue one movement. Nothing is written until flush()."""
+        if not part_id or not stage_key:
+            return
+        if qty_delta is None or float(qty_delta) == 0.0:
+            return
+
+        key = _key(part_id, stage_key, rev, config_key)
+        self.row(*key, uom=uom)
+
+        self._deltas[key] = self._deltas.get(key, 0.0) + float(qty_delta)
+        self._pending.append({
+            "key": key,
+            "qty_delta": float(qty_delta),
+            "uom": (uom or "ea").strip().lower(),
+            "reason": (reason or "adjust").strip().lower(),
+            "note": (note or "").strip() or None,
+        })
+
+    def move(
+        self,
+        part_id: int,
+        from_stage: Optional[str],
+        to_stage: Optional[str],
+        qty: float,
+        uom: str = "ea",
+        rev: str = "A",
+        config_key: Optional[str] = None,
+        reason: str = "move",
+        note: Optional[str] = None,
+    ) -> None:
+        """Stage transition: -qty from from_stage, +qty into to_stage (either side may be None)."""
+        if from_stage:
+            self.post(part_id, from_stage, -qty, uom=uom, rev=rev, config_key=config_key, reason=reason, note=note)
+        if to_stage:
+            self.post(part_id, to_stage, qty, uom=uom, rev=rev, config_key=config_key, reason=reason, note=note)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write queued postings: balances on the cached rows, ledger via one
+        executemany. Returns ledger rows written. No commit here.
+        """
+        if not self._pending:
+            return 0
+
+        # New inventory rows need ids before the ledger can reference them
+        # (identity key check avoids refreshing expired rows)
+        if any(inspect(self._rows[k]).key is None for k in self._deltas):
+            db.session.flush()
+
+        for key, delta in self._deltas.items():
+            inv = self._rows[key]
+            inv.qty_on_hand = float(inv.qty_on_hand or 0.0) + delta
+
+        now = datetime.utcnow()
+        payload = [
+            {
+                "entity_type": PART_INVENTORY_ENTITY,
+                "entity_id": self._rows[p["key"]].id,
+                "qty_delta": p["qty_delta"],
+                "uom": p["uom"],
+                "reason": p["reason"],
+                "note": p["note"],
+                "source_type": self.source_type,
+                "source_ref": self.source_ref,
+                "created_by_user_id": self.user_id,
+                "created_at": now,
+            }
+            for p in self._pending
+        ]
+        db.session.execute(StockLedgerEntry.__table__.insert(), payload)
+
+        n = len(payload)
+        self._pending = []
+        self._deltas = OrderedDict()
+        return n
+
+
+def _request_row_cache() -> Dict[InvKey, PartInventory]:
+    if not has_app_context():
+        return {}
+    cache = getattr(g, "_part_inventory_rows", None)
+    if cache is None:
+        cache = g._part_inventory_rows = {}
+    return cache
+
+
+def get_request_posting_batch(
+    source_type: Optional[str] = None,
+    source_ref: Optional[str] = None,
+    user_id: Optional[int] = None,
+) -> PartInventoryPostingBatch:
+    """
+    New batch sharing the current request's inventory row cache.
+    user_id defaults to the logged-in user.
+    """
+    if user_id is None and has_request_context():
+        user_id = session.get("user_id")
+    return PartInventoryPostingBatch(
+        source_type=source_type,
+        source_ref=source_ref,
+        user_id=user_id,
+        rows=_request_row_cache(),
+    )
@@ -1,8 +1,10 @@
 # File path: modules/inventory/services/parts_inventory.py
 # V2 - Inventory state backbone (rev + config_key aware)
+# V3 - Deltas post through the ledger (inventory_posting_service)
 from typing import Optional
 
 from database.models import db, PartInventory
+from modules.inventory.services.inventory_posting_service import get_request_posting_batch
 
 
 def get_or_create_inventory_row(
@@ -51,22 +53,22 @@ def apply_part_inventory_delta(
     uom: str = "ea",
     rev: str = "A",
     config_key: Optional[str] = None,
+    reason: str = "adjust",
+    note: Optional[str] = None,
 ) -> None:
     """
-    Applies a delta to PartInventory, creating the row if needed.
+    Applies a delta to PartInventory (creating the row if needed) and writes
+    the matching ledger entry. For many postings, use a posting batch directly.
     """
-    if not part_id or not stage_key:
-        return
-
-    if qty_delta is None or float(qty_delta) == 0.0:
-        return
-
-    inv = get_or_create_inventory_row(
-        part_id=part_id,
-        stage_key=stage_key,
+    batch = get_request_posting_batch()
+    batch.post(
+        part_id,
+        stage_key,
+        qty_delta,
+        uom=uom,
         rev=rev,
         config_key=config_key,
-        uom=uom,
+        reason=reason,
+        note=note,
     )
-
-    inv.qty_on_hand = float(inv.qty_on_hand or 0.0) + float(qty_delta)
+    batch.flush()
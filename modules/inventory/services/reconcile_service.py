@@ -0,0 +1,277 @@
+# File path: modules/inventory/services/reconcile_service.py
+# V1 - Ledger vs qty_on_hand reconciliation
+"""
+Two sources describe stock for the same row:
+  - stock_ledger: sum(qty_delta) per (entity_type, entity_id)
+  - the cached qty_on_hand column on the row itself
+
+Writers historically touch one side only (bulk convert posts ledger and
+leaves PartInventory.qty_on_hand=0; apply_part_inventory_delta mutates
+qty_on_hand and posts nothing), so the two drift.
+
+reconcile_inventory() compares them with one set query per entity type
+(row LEFT JOIN grouped ledger sums), reports mismatches and ledger groups
+with no row (orphans), and optionally repairs:
+
+    trust="ledger"  qty_on_hand := ledger balance (bulk UPDATE)
+    trust="cache"   post a "reconcile" ledger entry for the difference
+
+Incremental runs only look at entities touched since the previous run that
+covered the same entity type: ledger ids above its watermark, or rows whose
+updated_at moved past its start time. Every run is recorded in
+inventory_reconcile_runs with the entity types it covered, so a
+`--type raw_stock` run does not move the other types' watermark.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, func, literal, or_
+
+from database.models import (
+    db,
+    BulkHardware,
+    InventoryReconcileRun,
+    PartInventory,
+    RawStock,
+    StockLedgerEntry,
+)
+
+# entity_type -> model with qty_on_hand / updated_at
+RECONCILE_MODELS = {
+    "part_inventory": PartInventory,
+    "raw_stock": RawStock,
+    "bulk_hardware": BulkHardware,
+}
+
+TRUST_LEDGER = "ledger"
+TRUST_CACHE = "cache"
+TRUST_CHOICES = (TRUST_LEDGER, TRUST_CACHE)
+
+RECONCILE_REASON = "reconcile"
+
+# Float noise tolerance
+QTY_EPSILON = 1e-6
+
+
+class ReconcileError(Exception):
+    pass
+
+
+@dataclass
+class Mismatch:
+    entity_type: str
+    entity_id: int
+    cached_qty: float
+    ledger_qty: float
+    uom: Optional[str] = None
+    orphan: bool = False  # ledger rows point at an entity that no longer exists
+
+    @property
+    def diff(self) -> float:
+        return self.cached_qty - self.ledger_qty
+
+
+@dataclass
+class ReconcileReport:
+    run_id: Optional[int]
+    mode: str
+    trust: Optional[str]
+    checked: Dict[str, int] = field(default_factory=dict)
+    mismatches: List[Mismatch] = field(default_factory=list)
+    repaired: int = 0
+
+    @property
+    def orphans(self) -> List[Mismatch]:
+        return [m for m in self.mismatches if m.orphan]
+
+
+def _ledger_sums(entity_type: str):
+    return (
+        db.session.query(
+            StockLedgerEntry.entity_id.label("entity_id"),
+            func.sum(StockLedgerEntry.qty_delta).label("balance"),
+        )
+        .filter(StockLedgerEntry.entity_type == entity_type)
+        .group_by(StockLedgerEntry.entity_id)
+        .subquery()
+    )
+
+
+def _touched_ids(entity_type: str, since_ledger_id: int):
+    return (
+        db.session.query(StockLedgerEntry.entity_id)
+        .filter(StockLedgerEntry.entity_type == entity_type)
+        .filter(StockLedgerEntry.id > since_ledger_id)
+    )
+
+
+def _scan_type(
+    entity_type: str,
+    since: Optional[InventoryReconcileRun],
+) -> tuple:
+    """Returns (checked_count, [Mismatch]) for one entity type."""
+    model = RECONCILE_MODELS[entity_type]
+    sums = _ledger_sums(entity_type)
+    balance = func.coalesce(sums.c.balance, 0.0)
+
+    scope = []
+    if since is not None:
+        scope.append(or_(
+            model.id.in_(_touched_ids(entity_type, since.ledger_watermark)),
+            model.updated_at >= since.started_at,
+        ))
+
+    checked = (
+        db.session.query(func.count(model.id))
+        .filter(*scope)
+        .scalar()
+    ) or 0
+
+    rows = (
+        db.session.query(model.id, model.qty_on_hand, balance, model.uom)
+        .outerjoin(sums, sums.c.entity_id == model.id)
+        .filter(*scope)
+        .filter(func.abs(func.coalesce(model.qty_on_hand, 0.0) - balance) > QTY_EPSILON)
+        .order_by(model.id.asc())
+        .all()
+    )
+    out = [
+        Mismatch(entity_type, int(eid), float(cached or 0.0), float(bal or 0.0), uom)
+        for eid, cached, bal, uom in rows
+    ]
+
+    # Ledger groups with no row behind them
+    orphan_q = (
+        db.session.query(sums.c.entity_id, sums.c.balance)
+        .outerjoin(model, model.id == sums.c.entity_id)
+        .filter(model.id.is_(None))
+    )
+    if since is not None:
+        orphan_q = orphan_q.filter(sums.c.entity_id.in_(_touched_ids(entity_type, since.ledger_watermark)))
+    for eid, bal in orphan_q.all():
+        out.append(Mismatch(entity_type, int(eid), 0.0, float(bal or 0.0), orphan=True))
+
+    return int(checked), out
+
+
+def _repair(mismatches: List[Mismatch], trust: str, run_id: int, user_id: Optional[int]) -> int:
+    fixable = [m for m in mismatches if not m.orphan]
+    if not fixable:
+        return 0
+
+    if trust == TRUST_LEDGER:
+        by_type: Dict[str, list] = {}
+        for m in fixable:
+            by_type.setdefault(m.entity_type, []).append({"b_id": m.entity_id, "b_qty": m.ledger_qty})
+
+        now = datetime.utcnow()
+        for entity_type, params in by_type.items():
+            table = RECONCILE_MODELS[entity_type].__table__
+            stmt = (
+                table.update()
+                .where(table.c.id == bindparam("b_id"))
+                .values(qty_on_hand=bindparam("b_qty"), updated_at=now)
+            )
+            db.session.execute(stmt, params)
+        return len(fixable)
+
+    now = datetime.utcnow()
+    db.session.execute(
+        StockLedgerEntry.__table__.insert(),
+        [
+            {
+                "entity_type": m.entity_type,
+                "entity_id": m.entity_id,
+                "qty_delta": m.diff,
+                "uom": (m.uom or "ea").lower(),
+                "reason": RECONCILE_REASON,
+                "note": f"Reconcile to cached qty {m.cached_qty:g} (ledger was {m.ledger_qty:g})",
+                "source_type": "reconcile",
+                "source_ref": f"run-{run_id}",
+                "created_by_user_id": user_id,
+                "created_at": now,
+            }
+            for m in fixable
+        ],
+    )
+    return len(fixable)
+
+
+def last_reconcile_run(entity_type: Optional[str] = None) -> Optional[InventoryReconcileRun]:
+    """Latest finished run; with entity_type, the latest one that covered it."""
+    q = InventoryReconcileRun.query.filter(InventoryReconcileRun.finished_at.isnot(None))
+    if entity_type is not None:
+        covered = literal(",") + InventoryReconcileRun.entity_types + literal(",")
+        q = q.filter(or_(
+            InventoryReconcileRun.entity_types.is_(None),
+            covered.like(f"%,{entity_type},%"),
+        ))
+    return q.order_by(InventoryReconcileRun.id.desc()).first()
+
+
+def reconcile_inventory(
+    *,
+    incremental: bool = True,
+    trust: Optional[str] = None,
+    entity_types: Optional[List[str]] = None,
+    user_id: Optional[int] = None,
+) -> ReconcileReport:
+    """
+    Compare ledger balances to qty_on_hand and optionally repair.
+
+    incremental=True scopes each entity type to entities touched since the
+    last finished run that covered that type (a full scan of the type when
+    there is none). trust=None is report only.
+    Commits the run record (and any repair) as one transaction.
+    """
+    if trust is not None and trust not in TRUST_CHOICES:
+        raise ReconcileError(f"trust must be one of {TRUST_CHOICES}")
+
+    types = entity_types or list(RECONCILE_MODELS)
+    unknown = [t for t in types if t not in RECONCILE_MODELS]
+    if unknown:
+        raise ReconcileError(f"Unknown entity type(s): {', '.join(unknown)}")
+
+    since = {t: last_reconcile_run(t) if incremental else None for t in types}
+    incremental_types = [t for t in types if since[t] is not None]
+
+    # Pin the watermark before scanning so entries posted mid-run are picked up next time
+    watermark = db.session.query(func.coalesce(func.max(StockLedgerEntry.id), 0)).scalar() or 0
+
+    run = InventoryReconcileRun(
+        mode="incremental" if incremental_types else "full",
+        trust=trust,
+        entity_types=",".join(types),
+        ledger_watermark=int(watermark),
+        started_at=datetime.utcnow(),
+    )
+    db.session.add(run)
+    db.session.flush()
+
+    report = ReconcileReport(run_id=run.id, mode=run.mode, trust=trust)
+
+    try:
+        for entity_type in types:
+            checked, mismatches = _scan_type(entity_type, since[entity_type])
+            report.checked[entity_type] = checked
+            report.mismatches.extend(mismatches)
+
+        if trust is not None:
+            report.repaired = _repair(report.mismatches, trust, run.id, user_id)
+
+        run.checked = sum(report.checked.values())
+        run.mismatches = len(report.mismatches) - len(report.orphans)
+        run.orphans = len(report.orphans)
+        run.repaired = report.repaired
+        run.finished_at = datetime.utcnow()
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return report
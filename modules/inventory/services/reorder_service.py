@@ -0,0 +1,373 @@
+# File path: modules/inventory/services/reorder_service.py
+# V1 - Consumption-rate forecasting + ranked reorder list
+"""
+Reorder engine for stock that gets *consumed* rather than built:
+  - bulk_hardware        (on hand = ledger sum)
+  - waterjet_consumable  (on hand = WaterjetConsumable.qty_on_hand, ledger = history)
+
+Burn rate (per day) blends rolling windows of ledger consumption:
+    rate = 0.5 * avg(7d) + 0.3 * avg(30d) + 0.2 * avg(90d)
+
+Waterjet consumables that wear with cutting time (RUNTIME_DRIVEN_CATEGORIES)
+also get a runtime-driven rate:
+    usage per runtime minute (90d) * recent runtime minutes per day (7d)
+and the larger of the two rates wins, so a busy week raises the forecast
+before the ledger catches up.
+
+Results are cached per process. Refresh is incremental:
+  - ledger rows with id > watermark mark their entities dirty
+  - consumables with updated_at > last refresh are dirty
+  - a full refresh happens every REORDER_FULL_REFRESH_SECONDS (rates decay
+    with time even when nothing moves)
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from flask import current_app
+from sqlalchemy import and_, case, func
+
+from database.models import (
+    db,
+    BulkHardware,
+    StockLedgerEntry,
+    WaterjetConsumable,
+    WaterjetOperationDetail,
+)
+
+
+REORDER_ENTITY_TYPES = ("bulk_hardware", "waterjet_consumable")
+
+# Negative moves with these reasons are corrections, not usage
+NON_CONSUMPTION_REASONS = ("count", "correction", "reconcile")
+
+RATE_WINDOWS = ((7, 0.5), (30, 0.3), (90, 0.2))
+
+RUNTIME_DRIVEN_CATEGORIES = {"garnet", "nozzle", "orifice", "mixing_tube", "seal"}
+
+Key = Tuple[str, int]
+
+
+@dataclass
+class ReorderRow:
+    entity_type: str
+    entity_id: int
+    code: Optional[str]
+    name: str
+    category: Optional[str]
+    uom: str
+    on_hand: float
+    burn_per_day: float
+    days_of_cover: Optional[float]     # None = no measurable usage
+    reorder_point: Optional[float]
+    reorder_qty: Optional[float]
+    suggested_qty: float
+    is_low: bool
+    source: str                         # "ledger" | "runtime"
+
+
+def lead_days() -> float:
+    return float(current_app.config.get("MERP_REORDER_LEAD_DAYS", 14))
+
+
+def cover_target_days() -> float:
+    return float(current_app.config.get("MERP_REORDER_COVER_DAYS", 30))
+
+
+def full_refresh_seconds() -> int:
+    return int(current_app.config.get("MERP_REORDER_FULL_REFRESH_SECONDS", 15 * 60))
+
+
+# -----------------------------
+# Set-based inputs
+# -----------------------------
+
+def _ledger_stats(entity_type: str, ids: Optional[Iterable[int]], now: datetime) -> Dict[int, Dict[str, float]]:
+    """
+    One grouped query: on-hand sum + consumption per rolling window.
+    """
+    consumed = and_(
+        StockLedgerEntry.qty_delta < 0,
+        StockLedgerEntry.reason.notin_(NON_CONSUMPTION_REASONS),
+    )
+
+    cols = [
+        StockLedgerEntry.entity_id,
+        func.coalesce(func.sum(StockLedgerEntry.qty_delta), 0.0),
+    ]
+    for days, _w in RATE_WINDOWS:
+        since = now - timedelta(days=days)
+        cols.append(func.coalesce(func.sum(case(
+            (and_(consumed, StockLedgerEntry.created_at >= since), -StockLedgerEntry.qty_delta),
+            else_=0.0,
+        )), 0.0))
+
+    q = (
+        db.session.query(*cols)
+        .filter(StockLedgerEntry.entity_type == entity_type)
+        .group_by(StockLedgerEntry.entity_id)
+    )
+    if ids is not None:
+        ids = list(ids)
+        if not ids:
+            return {}
+        q = q.filter(StockLedgerEntry.entity_id.in_(ids))
+
+    out = {}
+    for row in q.all():
+        eid, on_hand, *windows = row
+        stats = {"on_hand": float(on_hand or 0.0)}
+        for (days, _w), qty in zip(RATE_WINDOWS, windows):
+            stats[f"c{days}"] = float(qty or 0.0)
+        out[int(eid)] = stats
+    return out
+
+
+def _blended_rate(stats: Optional[Dict[str, float]]) -> float:
+    if not stats:
+        return 0.0
+    return sum(w * stats.get(f"c{days}", 0.0) / days for days, w in RATE_WINDOWS)
+
+
+def _runtime_minutes(now: datetime) -> Tuple[float, float]:
+    """
+    Waterjet cutting minutes in the last 7 and 90 days (one query).
+    """
+    t7 = now - timedelta(days=7)
+    t90 = now - timedelta(days=90)
+    runtime = func.coalesce(WaterjetOperationDetail.runtime_actual_min, 0)
+
+    r7, r90 = (
+        db.session.query(
+            func.coalesce(func.sum(case((WaterjetOperationDetail.updated_at >= t7, runtime), else_=0)), 0),
+            func.coalesce(func.sum(runtime), 0),
+        )
+        .filter(WaterjetOperationDetail.updated_at >= t90)
+        .one()
+    )
+    return float(r7 or 0.0), float(r90 or 0.0)
+
+
+# -----------------------------
+# Row building
+# -----------------------------
+
+def _finish_row(row: ReorderRow) -> ReorderRow:
+    rate = row.burn_per_day
+    row.days_of_cover = (max(row.on_hand, 0.0) / rate) if rate > 0 else None
+
+    below_point = row.reorder_point is not None and row.on_hand <= row.reorder_point
+    below_lead = row.days_of_cover is not None and row.days_of_cover <= lead_days()
+    row.is_low = bool(below_point or below_lead)
+
+    suggested = 0.0
+    if row.is_low:
+        need = rate * (lead_days() + cover_target_days()) - row.on_hand
+        suggested = max(need, float(row.reorder_qty or 0.0), 0.0)
+    row.suggested_qty = round(suggested, 2)
+    return row
+
+
+def _build_bulk_rows(ids: Optional[Set[int]], now: datetime) -> Dict[Key, ReorderRow]:
+    q = BulkHardware.query.filter(BulkHardware.is_active.is_(True))
+    if ids is not None:
+        q = q.filter(BulkHardware.id.in_(list(ids)))
+    items = q.all()
+
+    stats = _ledger_stats("bulk_hardware", [b.id for b in items], now)
+
+    rows = {}
+    for b in items:
+        s = stats.get(b.id)
+        rows[("bulk_hardware", b.id)] = _finish_row(ReorderRow(
+            entity_type="bulk_hardware",
+            entity_id=b.id,
+            code=b.item_code,
+            name=b.name,
+            category="bulk",
+            uom=b.uom or "ea",
+            on_hand=(s or {}).get("on_hand", 0.0),
+            burn_per_day=_blended_rate(s),
+            days_of_cover=None,
+            reorder_point=None,
+            reorder_qty=None,
+            suggested_qty=0.0,
+            is_low=False,
+            source="ledger",
+        ))
+    return rows
+
+
+def _build_consumable_rows(ids: Optional[Set[int]], now: datetime) -> Dict[Key, ReorderRow]:
+    q = WaterjetConsumable.query.filter(WaterjetConsumable.is_active.is_(True))
+    if ids is not None:
+        q = q.filter(WaterjetConsumable.id.in_(list(ids)))
+    items = q.all()
+
+    stats = _ledger_stats("waterjet_consumable", [c.id for c in items], now)
+
+    runtime = None
+    if any((c.category or "").lower() in RUNTIME_DRIVEN_CATEGORIES for c in items):
+        runtime = _runtime_minutes(now)
+
+    rows = {}
+    for c in items:
+        s = stats.get(c.id)
+        rate = _blended_rate(s)
+        source = "ledger"
+
+        if runtime and (c.category or "").lower() in RUNTIME_DRIVEN_CATEGORIES:
+            r7, r90 = runtime
+            if s and r90 > 0:
+                per_minute = s.get("c90", 0.0) / r90
+                runtime_rate = per_minute * (r7 / 7.0)
+                if runtime_rate > rate:
+                    rate, source = runtime_rate, "runtime"
+
+        rows[("waterjet_consumable", c.id)] = _finish_row(ReorderRow(
+            entity_type="waterjet_consumable",
+            entity_id=c.id,
+            code=c.part_number,
+            name=c.name,
+            category=c.category,
+            uom=c.uom or "ea",
+            on_hand=float(c.qty_on_hand or 0.0),
+            burn_per_day=rate,
+            days_of_cover=None,
+            reorder_point=c.reorder_point,
+            reorder_qty=c.reorder_qty,
+            suggested_qty=0.0,
+            is_low=False,
+            source=source,
+        ))
+    return rows
+
+
+# -----------------------------
+# Cache
+# -----------------------------
+
+class _ReorderCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rows: Dict[Key, ReorderRow] = {}
+        self.ledger_watermark = 0
+        self.refreshed_at: Optional[datetime] = None
+        self.full_at: Optional[datetime] = None
+
+
+_cache = _ReorderCache()
+
+
+def _dirty_keys(since: datetime, watermark: int) -> Tuple[Set[Key], int]:
+    dirty: Set[Key] = set()
+
+    # Pin the upper bound first so rows posted mid-refresh are picked up next time
+    new_watermark = db.session.query(func.max(StockLedgerEntry.id)).scalar() or watermark
+
+    rows = (
+        db.session.query(StockLedgerEntry.entity_type, StockLedgerEntry.entity_id)
+        .filter(StockLedgerEntry.id > watermark, StockLedgerEntry.id <= new_watermark)
+        .filter(StockLedgerEntry.entity_type.in_(REORDER_ENTITY_TYPES))
+        .distinct()
+        .all()
+    )
+    dirty.update((et, int(eid)) for et, eid in rows)
+
+    for (cid,) in (
+        db.session.query(WaterjetConsumable.id)
+        .filter(WaterjetConsumable.updated_at > since)
+        .all()
+    ):
+        dirty.add(("waterjet_consumable", int(cid)))
+
+    for (bid,) in (
+        db.session.query(BulkHardware.id)
+        .filter(BulkHardware.updated_at > since)
+        .all()
+    ):
+        dirty.add(("bulk_hardware", int(bid)))
+
+    return dirty, int(new_watermark)
+
+
+def refresh_reorder_cache(force_full: bool = False) -> Dict[str, int]:
+    """
+    Bring the cache up to date. Returns {"mode": ..., "rows": n}.
+    """
+    now = datetime.utcnow()
+
+    with _cache.lock:
+        full_due = (
+            force_full
+            or _cache.full_at is None
+            or (now - _cache.full_at).total_seconds() >= full_refresh_seconds()
+        )
+
+        if full_due:
+            watermark = db.session.query(func.max(StockLedgerEntry.id)).scalar() or 0
+            rows = {}
+            rows.update(_build_bulk_rows(None, now))
+            rows.update(_build_consumable_rows(None, now))
+            _cache.rows = rows
+            _cache.ledger_watermark = int(watermark)
+            _cache.refreshed_at = _cache.full_at = now
+            return {"mode": "full", "rows": len(rows)}
+
+        dirty, watermark = _dirty_keys(_cache.refreshed_at, _cache.ledger_watermark)
+        if dirty:
+            bulk_ids = {eid for et, eid in dirty if et == "bulk_hardware"}
+            cons_ids = {eid for et, eid in dirty if et == "waterjet_consumable"}
+
+            # Copy-and-swap: readers may still be iterating the old dict
+            rows = dict(_cache.rows)
+            for key in dirty:
+                rows.pop(key, None)  # deactivated rows drop out
+            if bulk_ids:
+                rows.update(_build_bulk_rows(bulk_ids, now))
+            if cons_ids:
+                rows.update(_build_consumable_rows(cons_ids, now))
+            _cache.rows = rows
+
+        _cache.ledger_watermark = watermark
+        _cache.refreshed_at = now
+        return {"mode": "incremental", "rows": len(dirty)}
+
+
+def invalidate_reorder_cache() -> None:
+    with _cache.lock:
+        _cache.full_at = None
+
+
+def get_reorder_rows(
+    entity_types: Optional[Iterable[str]] = None,
+    low_only: bool = False,
+) -> List[ReorderRow]:
+    """
+    Ranked reorder list: least days-of-cover first; items with no measured
+    usage sort after everything with a forecast.
+    """
+    refresh_reorder_cache()
+
+    with _cache.lock:
+        cached = list(_cache.rows.values())
+
+    wanted = set(entity_types) if entity_types else None
+    rows = [
+        r for r in cached
+        if (wanted is None or r.entity_type in wanted) and (r.is_low or not low_only)
+    ]
+
+    def rank(r: ReorderRow):
+        cover = r.days_of_cover if r.days_of_cover is not None else float("inf")
+        return (not r.is_low, cover, -(r.burn_per_day or 0.0), r.name or "")
+
+    return sorted(rows, key=rank)
+
+
+def get_reorder_map(entity_type: str) -> Dict[int, ReorderRow]:
+    return {r.entity_id: r for r in get_reorder_rows(entity_types=[entity_type])}
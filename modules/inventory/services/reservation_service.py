@@ -0,0 +1,377 @@
+# File path: modules/inventory/services/reservation_service.py
+# V1 - Part reservations / available-to-promise (ATP)
+"""
+Reservations hold PartInventory qty for the BOM items of an open build.
+
+    ATP(bucket) = PartInventory.qty_on_hand - sum(active reservations)
+
+A bucket is the PartInventory key (part_id, stage_key, rev, config_key).
+
+Lifecycle:
+  - reserve_for_build(): on WO apply (apply_work_order_to_new_build),
+    stock-first per BOM item; a plain BOM explode into a build holds nothing
+  - release_for_build(): build completed (consumed) or job archived (released)
+  - release_for_bom_item(): BOM item removed from a build
+
+No commits here; callers own the transaction.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+
+from database.models import db, BOMItem, Part, PartInventory, PartReservation
+from modules.inventory.services.planning import (
+    FG_AVAILABLE,
+    SUB_ASSY_AVAILABLE,
+    COMP_AVAILABLE,
+)
+
+RESERVATION_ACTIVE = "active"
+RESERVATION_RELEASED = "released"
+RESERVATION_CONSUMED = "consumed"
+
+# Part category -> stage buckets a BOM item may draw from (in preference order)
+RESERVE_STAGES_BY_CATEGORY = {
+    "assembly": FG_AVAILABLE,
+    "sub_assembly": SUB_ASSY_AVAILABLE,
+}
+DEFAULT_RESERVE_STAGES = COMP_AVAILABLE
+
+Bucket = Tuple[int, str, str, Optional[str]]
+
+
+class ReservationError(Exception):
+    pass
+
+
+def _reserve_stages(part: Optional[Part]) -> Tuple[str, ...]:
+    cat = None
+    if part is not None and part.part_type is not None:
+        cat = part.part_type.category_key
+    return RESERVE_STAGES_BY_CATEGORY.get(cat, DEFAULT_RESERVE_STAGES)
+
+
+# -----------------------------
+# Read side
+# -----------------------------
+
+def get_reserved_map(
+    part_ids: Iterable[int],
+    work_order_ids: Optional[Iterable[int]] = None,
+) -> Dict[Bucket, float]:
+    """
+    {(part_id, stage_key, rev, config_key): active reserved qty}
+    One grouped query (served by ix_part_reservations_bucket).
+    work_order_ids narrows to holds made for those WOs.
+    """
+    ids = {int(p) for p in part_ids if p}
+    if not ids:
+        return {}
+
+    q = (
+        db.session.query(
+            PartReservation.part_id,
+            PartReservation.stage_key,
+            PartReservation.rev,
+            PartReservation.config_key,
+            func.coalesce(func.sum(PartReservation.qty_reserved), 0.0),
+        )
+        .filter(PartReservation.part_id.in_(ids))
+        .filter(PartReservation.status == RESERVATION_ACTIVE)
+    )
+    if work_order_ids is not None:
+        wo_ids = [int(w) for w in work_order_ids]
+        if not wo_ids:
+            return {}
+        q = q.filter(PartReservation.work_order_id.in_(wo_ids))
+
+    rows = (
+        q.group_by(
+            PartReservation.part_id,
+            PartReservation.stage_key,
+            PartReservation.rev,
+            PartReservation.config_key,
+        )
+        .all()
+    )
+    return {(pid, sk, rev, cfg): float(qty or 0.0) for pid, sk, rev, cfg, qty in rows}
+
+
+def get_work_order_holds(
+    part_ids: Iterable[int],
+    work_order_ids: Iterable[int],
+) -> Dict[int, Dict[Bucket, float]]:
+    """
+    {work_order_id: {bucket: active reserved qty}} for holds made by those
+    WOs' builds. One grouped query.
+    """
+    ids = {int(p) for p in part_ids if p}
+    wo_ids = {int(w) for w in work_order_ids if w}
+    if not ids or not wo_ids:
+        return {}
+
+    rows = (
+        db.session.query(
+            PartReservation.work_order_id,
+            PartReservation.part_id,
+            PartReservation.stage_key,
+            PartReservation.rev,
+            PartReservation.config_key,
+            func.coalesce(func.sum(PartReservation.qty_reserved), 0.0),
+        )
+        .filter(PartReservation.part_id.in_(ids))
+        .filter(PartReservation.status == RESERVATION_ACTIVE)
+        .filter(PartReservation.work_order_id.in_(wo_ids))
+        .group_by(
+            PartReservation.work_order_id,
+            PartReservation.part_id,
+            PartReservation.stage_key,
+            PartReservation.rev,
+            PartReservation.config_key,
+        )
+        .all()
+    )
+    out: Dict[int, Dict[Bucket, float]] = defaultdict(dict)
+    for wo_id, pid, sk, rev, cfg, qty in rows:
+        out[wo_id][(pid, sk, rev, cfg)] = float(qty or 0.0)
+    return dict(out)
+
+
+def get_atp_map(part_ids: Iterable[int]) -> Dict[Bucket, Dict[str, float]]:
+    """
+    {bucket: {"on_hand", "reserved", "atp"}} for every inventory bucket of the
+    given parts. Two queries total regardless of part count.
+    """
+    ids = {int(p) for p in part_ids if p}
+    if not ids:
+        return {}
+
+    reserved = get_reserved_map(ids)
+
+    out: Dict[Bucket, Dict[str, float]] = {}
+    rows = (
+        db.session.query(
+            PartInventory.part_id,
+            PartInventory.stage_key,
+            PartInventory.rev,
+            PartInventory.config_key,
+            PartInventory.qty_on_hand,
+        )
+        .filter(PartInventory.part_id.in_(ids))
+        .all()
+    )
+    for pid, sk, rev, cfg, on_hand in rows:
+        key = (pid, sk, rev, cfg)
+        res = reserved.get(key, 0.0)
+        on_hand = float(on_hand or 0.0)
+        out[key] = {"on_hand": on_hand, "reserved": res, "atp": on_hand - res}
+
+    # Reservations against a bucket whose inventory row is gone still count
+    for key, res in reserved.items():
+        if key not in out:
+            out[key] = {"on_hand": 0.0, "reserved": res, "atp": -res}
+
+    return out
+
+
+def sum_reserved(
+    part_id: int,
+    stage_keys: Sequence[str],
+    rev: Optional[str] = None,
+    config_key: Optional[str] = None,
+    work_order_ids: Optional[Iterable[int]] = None,
+) -> float:
+    """
+    Active reserved qty for one part across stage buckets (rev=None: any rev).
+    work_order_ids narrows to holds made for those WOs.
+    """
+    q = (
+        db.session.query(func.coalesce(func.sum(PartReservation.qty_reserved), 0.0))
+        .filter(PartReservation.part_id == part_id)
+        .filter(PartReservation.stage_key.in_(stage_keys))
+        .filter(PartReservation.status == RESERVATION_ACTIVE)
+    )
+    if rev is not None:
+        q = q.filter(PartReservation.rev == rev)
+
+    if config_key is None:
+        q = q.filter(PartReservation.config_key.is_(None))
+    else:
+        q = q.filter(PartReservation.config_key == config_key)
+
+    if work_order_ids is not None:
+        ids = [int(w) for w in work_order_ids]
+        if not ids:
+            return 0.0
+        q = q.filter(PartReservation.work_order_id.in_(ids))
+
+    return float(q.scalar() or 0.0)
+
+
+def get_build_reservations(build_id: int, active_only: bool = True) -> List[PartReservation]:
+    q = PartReservation.query.filter(PartReservation.build_id == build_id)
+    if active_only:
+        q = q.filter(PartReservation.status == RESERVATION_ACTIVE)
+    return q.order_by(PartReservation.id.asc()).all()
+
+
+# -----------------------------
+# Write side
+# -----------------------------
+
+def reserve_for_build(
+    build_id: int,
+    work_order_id: Optional[int] = None,
+    config_key: Optional[str] = None,
+) -> List[PartReservation]:
+    """
+    Reserve available stock for every BOM item on a build that is not yet
+    covered by an active reservation.
+
+    Allocation is stock-first, per BOM item in line order:
+      - buckets come from the part category (FG / sub-assy / component stages)
+      - within a part: stage preference order, then latest rev first
+      - partial cover is fine; the remainder stays as make/buy demand
+
+    Inventory and existing reservations are loaded once for the whole build;
+    allocation runs against that in-memory ATP so two lines drawing on the
+    same part never double-book. No commit here.
+    """
+    items = (
+        BOMItem.query
+        .filter(BOMItem.build_id == build_id)
+        .filter(BOMItem.part_id.isnot(None))
+        .order_by(BOMItem.line_no.asc(), BOMItem.id.asc())
+        .all()
+    )
+    if not items:
+        return []
+
+    # Already-covered qty per BOM item (re-apply / regen safety)
+    covered = dict(
+        db.session.query(
+            PartReservation.bom_item_id,
+            func.coalesce(func.sum(PartReservation.qty_reserved), 0.0),
+        )
+        .filter(PartReservation.build_id == build_id)
+        .filter(PartReservation.status == RESERVATION_ACTIVE)
+        .group_by(PartReservation.bom_item_id)
+        .all()
+    )
+
+    part_ids = {bi.part_id for bi in items}
+    parts = {p.id: p for p in Part.query.filter(Part.id.in_(part_ids)).all()}
+    atp = {k: v["atp"] for k, v in get_atp_map(part_ids).items()}
+
+    # part_id -> [bucket, ...] restricted to the requested config
+    buckets_by_part: Dict[int, List[Bucket]] = defaultdict(list)
+    for key in atp:
+        if key[3] == config_key:
+            buckets_by_part[key[0]].append(key)
+
+    now = datetime.utcnow()
+    created: List[PartReservation] = []
+
+    for bi in items:
+        need = float(bi.qty_planned or 0.0) - float(covered.get(bi.id, 0.0) or 0.0)
+        if need <= 0:
+            continue
+
+        stages = _reserve_stages(parts.get(bi.part_id))
+        stage_rank = {s: i for i, s in enumerate(stages)}
+
+        candidates = [k for k in buckets_by_part.get(bi.part_id, ()) if k[1] in stage_rank]
+        # stage preference asc, then rev desc
+        candidates.sort(key=lambda k: k[2] or "", reverse=True)
+        candidates.sort(key=lambda k: stage_rank[k[1]])
+
+        for key in candidates:
+            if need <= 0:
+                break
+            avail = atp.get(key, 0.0)
+            if avail <= 0:
+                continue
+
+            take = min(avail, need)
+            res = PartReservation(
+                part_id=key[0],
+                stage_key=key[1],
+                rev=key[2],
+                config_key=key[3],
+                build_id=build_id,
+                bom_item_id=bi.id,
+                work_order_id=work_order_id,
+                qty_reserved=take,
+                status=RESERVATION_ACTIVE,
+                created_at=now,
+            )
+            db.session.add(res)
+            created.append(res)
+
+            atp[key] = avail - take
+            need -= take
+
+    if created:
+        db.session.flush()
+    return created
+
+
+def _release(q, status: str, note: Optional[str]) -> int:
+    if status not in (RESERVATION_RELEASED, RESERVATION_CONSUMED):
+        raise ReservationError(f"Invalid release status: {status}")
+
+    values = {"status": status, "released_at": datetime.utcnow()}
+    if note:
+        values["note"] = note[:255]
+
+    n = (
+        q.filter(PartReservation.status == RESERVATION_ACTIVE)
+        .update(values, synchronize_session=False)
+    )
+    return int(n or 0)
+
+
+def release_for_build(
+    build_id: int,
+    status: str = RESERVATION_RELEASED,
+    note: Optional[str] = None,
+) -> int:
+    """Close every active reservation on a build. Returns rows closed. No commit here."""
+    return _release(PartReservation.query.filter(PartReservation.build_id == build_id), status, note)
+
+
+def release_for_builds(
+    build_ids: Iterable[int],
+    status: str = RESERVATION_RELEASED,
+    note: Optional[str] = None,
+) -> int:
+    ids = [int(b) for b in build_ids]
+    if not ids:
+        return 0
+    return _release(PartReservation.query.filter(PartReservation.build_id.in_(ids)), status, note)
+
+
+def release_for_bom_item(
+    bom_item_id: int,
+    status: str = RESERVATION_RELEASED,
+    note: Optional[str] = None,
+) -> int:
+    return _release(PartReservation.query.filter(PartReservation.bom_item_id == bom_item_id), status, note)
+
+
+def delete_for_builds(build_ids: Iterable[int]) -> int:
+    """Hard delete (job delete path). No commit here."""
+    ids = [int(b) for b in build_ids]
+    if not ids:
+        return 0
+    n = (
+        PartReservation.query
+        .filter(PartReservation.build_id.in_(ids))
+        .delete(synchronize_session=False)
+    )
+    return int(n or 0)
@@ -0,0 +1,375 @@
+# File path: modules/inventory/services/stock_import_service.py
+# V1 - Streaming CSV import of cycle counts / stock movements
+"""
+CSV columns (header row required, case-insensitive):
+    item_code    BH-000123 (bulk hardware), RS-000045 (raw stock),
+                 or a waterjet consumable part number
+    qty_counted  physical count  -> ledger delta = counted - balance ("count")
+    qty_delta    signed movement -> posted as-is (reason column or "adjust")
+    uom          optional; must match the item's uom when given
+    location     optional; updates RawStock / WaterjetConsumable location
+    reason, note optional
+
+Rows stream through in chunks of IMPORT_CHUNK_SIZE:
+  - item codes resolve with one query per entity type per chunk
+  - balances come from one grouped ledger query per entity type per chunk
+  - a running balance carries across chunks, so repeated codes in a file
+    (delta after delta, delta then count) net correctly
+
+dry_run=True validates and diffs without writing. In apply mode each chunk
+is its own transaction: ledger rows go in with a single executemany INSERT
+and the chunk commits before the next one is read.
+"""
+
+from __future__ import annotations
+
+import csv
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from database.models import db, BulkHardware, RawStock, StockLedgerEntry, WaterjetConsumable
+from modules.inventory.services.stock_ledger_service import get_on_hand_map
+
+IMPORT_CHUNK_SIZE = 500
+
+# Ledger-backed balances; consumables still read qty_on_hand (see reorder_service)
+LEDGER_BALANCE_TYPES = ("bulk_hardware", "raw_stock")
+
+RAW_STOCK_PREFIX = "RS-"
+
+STATUS_CHANGE = "change"
+STATUS_NO_CHANGE = "no_change"
+STATUS_ERROR = "error"
+
+Key = Tuple[str, int]
+
+
+class StockImportError(Exception):
+    pass
+
+
+@dataclass
+class ImportRow:
+    line_no: int
+    item_code: str
+    entity_type: Optional[str] = None
+    entity_id: Optional[int] = None
+    name: Optional[str] = None
+    uom: Optional[str] = None
+    on_hand: Optional[float] = None
+    counted: Optional[float] = None
+    delta: float = 0.0
+    location: Optional[str] = None
+    reason: str = "adjust"
+    note: Optional[str] = None
+    status: str = STATUS_NO_CHANGE
+    message: Optional[str] = None
+
+    @property
+    def new_on_hand(self) -> Optional[float]:
+        if self.on_hand is None:
+            return None
+        return self.on_hand + self.delta
+
+
+@dataclass
+class ImportReport:
+    dry_run: bool
+    rows: List[ImportRow] = field(default_factory=list)
+    total: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    errors: int = 0
+    posted: int = 0
+    chunks: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.errors == 0
+
+
+# -----------------------------
+# CSV streaming
+# -----------------------------
+
+def _norm(v) -> str:
+    return (v or "").strip()
+
+
+def iter_csv_rows(stream) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Yield (line_no, row) with lower-cased header names. `stream` is a text stream."""
+    reader = csv.DictReader(stream)
+    if not reader.fieldnames:
+        raise StockImportError("CSV has no header row.")
+
+    headers = [_norm(h).lower() for h in reader.fieldnames]
+    if "item_code" not in headers:
+        raise StockImportError("CSV must have an item_code column.")
+    if "qty_counted" not in headers and "qty_delta" not in headers:
+        raise StockImportError("CSV must have a qty_counted or qty_delta column.")
+    reader.fieldnames = headers
+
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _chunks(it: Iterable, size: int) -> Iterator[list]:
+    it = iter(it)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _parse_qty(raw: str) -> Optional[float]:
+    raw = _norm(raw)
+    if not raw:
+        return None
+    qty = float(raw)
+    # float() also takes "nan" / "inf"; those must never reach stock_ledger
+    if not math.isfinite(qty):
+        raise ValueError(f"not a finite qty: {raw!r}")
+    return qty
+
+
+# -----------------------------
+# Per-chunk lookups
+# -----------------------------
+
+def _resolve_codes(codes: Iterable[str]) -> Dict[str, Tuple[str, object]]:
+    """{CODE (upper): (entity_type, item)} with at most one query per entity type."""
+    codes = {c.upper() for c in codes if c}
+    out: Dict[str, Tuple[str, object]] = {}
+    if not codes:
+        return out
+
+    raw_ids = {}
+    for c in codes:
+        if c.startswith(RAW_STOCK_PREFIX) and c[len(RAW_STOCK_PREFIX):].isdigit():
+            raw_ids[int(c[len(RAW_STOCK_PREFIX):])] = c
+    if raw_ids:
+        for r in RawStock.query.filter(RawStock.id.in_(raw_ids)).all():
+            out[raw_ids[r.id]] = ("raw_stock", r)
+
+    # Item codes and part numbers are typed in by hand, so match them case-insensitively.
+    # SQL upper() only folds ASCII; keep a hit only if Python's upper() agrees.
+    lookups = (
+        ("bulk_hardware", BulkHardware, BulkHardware.item_code),
+        ("waterjet_consumable", WaterjetConsumable, WaterjetConsumable.part_number),
+    )
+    for entity_type, model, col in lookups:
+        rest = codes - set(out)
+        if not rest:
+            break
+        for item in model.query.filter(func.upper(col).in_(rest)).order_by(model.id).all():
+            key = (getattr(item, col.key) or "").upper()
+            if key in rest:
+                out.setdefault(key, (entity_type, item))
+
+    return out
+
+
+def _balances(resolved: Dict[str, Tuple[str, object]]) -> Dict[Key, float]:
+    ids_by_type: Dict[str, List[int]] = {}
+    out: Dict[Key, float] = {}
+    for entity_type, item in resolved.values():
+        if entity_type in LEDGER_BALANCE_TYPES:
+            ids_by_type.setdefault(entity_type, []).append(item.id)
+        else:
+            out[(entity_type, item.id)] = float(item.qty_on_hand or 0.0)
+
+    for entity_type, ids in ids_by_type.items():
+        for eid, qty in get_on_hand_map(entity_type, ids).items():
+            out[(entity_type, eid)] = qty
+    return out
+
+
+# -----------------------------
+# Validation / diff
+# -----------------------------
+
+def _build_rows(
+    chunk: List[Tuple[int, Dict[str, str]]],
+    running: Dict[Key, float],
+    counted_keys: set,
+) -> Tuple[List[ImportRow], Dict[Key, object]]:
+    resolved = _resolve_codes(_norm(r.get("item_code")) for _, r in chunk)
+    balances = _balances(resolved)
+    items: Dict[Key, object] = {}
+
+    rows: List[ImportRow] = []
+    for line_no, raw in chunk:
+        code = _norm(raw.get("item_code"))
+        row = ImportRow(
+            line_no=line_no,
+            item_code=code,
+            location=_norm(raw.get("location")) or None,
+            note=_norm(raw.get("note")) or None,
+        )
+        rows.append(row)
+
+        def fail(msg):
+            row.status = STATUS_ERROR
+            row.message = msg
+
+        if not code:
+            fail("Missing item_code.")
+            continue
+
+        hit = resolved.get(code.upper())
+        if not hit:
+            fail("Unknown item code.")
+            continue
+
+        entity_type, item = hit
+        key = (entity_type, item.id)
+        items[key] = item
+
+        row.entity_type = entity_type
+        row.entity_id = item.id
+        row.name = item.name
+        row.uom = (item.uom or "ea").lower()
+        row.on_hand = running.get(key, balances.get(key, 0.0))
+
+        uom = _norm(raw.get("uom")).lower()
+        if uom and uom != row.uom:
+            fail(f"UoM mismatch (item is {row.uom}).")
+            continue
+
+        if row.location and not hasattr(item, "location"):
+            fail("This item type has no location.")
+            continue
+
+        try:
+            counted = _parse_qty(raw.get("qty_counted"))
+            delta = _parse_qty(raw.get("qty_delta"))
+        except ValueError:
+            fail("Qty is not a number.")
+            continue
+
+        if counted is not None and delta is not None:
+            fail("Give qty_counted or qty_delta, not both.")
+            continue
+        if counted is None and delta is None:
+            fail("Missing qty_counted / qty_delta.")
+            continue
+
+        if counted is not None:
+            if counted < 0:
+                fail("Counted qty cannot be negative.")
+                continue
+            if key in counted_keys:
+                fail("Item counted more than once in this file.")
+                continue
+            counted_keys.add(key)
+            row.counted = counted
+            row.delta = counted - row.on_hand
+            row.reason = "count"
+        else:
+            row.delta = delta
+            row.reason = _norm(raw.get("reason")).lower() or "adjust"
+
+        running[key] = row.on_hand + row.delta
+
+        loc_changed = row.location is not None and row.location != (item.location or None)
+        if row.delta != 0 or loc_changed:
+            row.status = STATUS_CHANGE
+
+    return rows, items
+
+
+# -----------------------------
+# Apply
+# -----------------------------
+
+def _apply_rows(
+    rows: List[ImportRow],
+    items: Dict[Key, object],
+    source_ref: Optional[str],
+    user_id: Optional[int],
+) -> int:
+    now = datetime.utcnow()
+    payload = []
+
+    for r in rows:
+        if r.status != STATUS_CHANGE:
+            continue
+
+        item = items[(r.entity_type, r.entity_id)]
+        if r.location is not None:
+            item.location = r.location
+
+        if r.delta == 0:
+            continue
+
+        payload.append({
+            "entity_type": r.entity_type,
+            "entity_id": r.entity_id,
+            "qty_delta": r.delta,
+            "uom": r.uom,
+            "reason": r.reason,
+            "note": r.note or (f"Counted {r.counted:g}" if r.counted is not None else None),
+            "source_type": "import",
+            "source_ref": (source_ref or "")[:64] or None,
+            "created_by_user_id": user_id,
+            "created_at": now,
+        })
+
+        if r.entity_type not in LEDGER_BALANCE_TYPES:
+            item.qty_on_hand = r.new_on_hand
+
+    if payload:
+        # One executemany for the whole chunk
+        db.session.execute(StockLedgerEntry.__table__.insert(), payload)
+    return len(payload)
+
+
+def import_stock_csv(
+    stream,
+    *,
+    dry_run: bool = True,
+    source_ref: Optional[str] = None,
+    user_id: Optional[int] = None,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> ImportReport:
+    """
+    Validate (and unless dry_run, post) a count / movement CSV.
+
+    Apply mode commits per chunk; rows with errors are skipped and reported,
+    the rest of the chunk still posts. Run a dry run first to see the diff.
+    """
+    report = ImportReport(dry_run=dry_run)
+    running: Dict[Key, float] = {}
+    counted_keys: set = set()
+
+    for chunk in _chunks(iter_csv_rows(stream), max(1, int(chunk_size))):
+        rows, items = _build_rows(chunk, running, counted_keys)
+        report.chunks += 1
+
+        for r in rows:
+            report.total += 1
+            if r.status == STATUS_ERROR:
+                report.errors += 1
+            elif r.status == STATUS_CHANGE:
+                report.changed += 1
+            else:
+                report.unchanged += 1
+        report.rows.extend(rows)
+
+        if dry_run:
+            continue
+
+        try:
+            report.posted += _apply_rows(rows, items, source_ref, user_id)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    return report
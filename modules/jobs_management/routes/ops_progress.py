@@ -7,9 +7,12 @@ from modules.shared.services.build_op_queries import query_my_active_ops
 from modules.user.decorators import login_required
 from modules.jobs_management import jobs_bp
 
-from modules.inventory.services.parts_inventory import apply_part_inventory_delta
 from modules.jobs_management.services.ops_flow import complete_operation
-from modules.manufacturing.machining.services.progress_service import add_op_progress, OpProgressError
+from modules.manufacturing.machining.services.progress_service import (
+    add_op_progress,
+    OpProgressError,
+    UNLINKED_PART_WARNING,
+)
 
 
 
@@ -31,7 +34,8 @@ def op_progress_add(op_id):
 
     try:
         # NOTE: this will require BuildOperationProgress.user_id to exist
-        add_op_progress(
+        # Also posts the op's inventory stage transition (ledger-backed)
+        _op, totals = add_op_progress(
             op_id=op.id,
             qty_done_delta=qty_done_delta,
             qty_scrap_delta=qty_scrap_delta,
@@ -40,37 +44,8 @@ def op_progress_add(op_id):
             is_admin=bool(session.get("is_admin")),
             force=False,
         )
-
-        # keep your inventory posting logic EXACTLY as-is (it uses qty_done_delta/qty_scrap_delta)
-        # ... RAW_MATS_BLANK_OP_KEYS block remains unchanged ...
-
-        # ---- Inventory posting (ops-driven) ----
-        # Only for raw materials ops that produce "blank" inventory
-        RAW_MATS_BLANK_OP_KEYS = {
-            "waterjet_cut",
-            "laser_cut",
-            "bandsaw_cut",
-            "tablesaw_cut",
-            "edm_cut",
-        }
-
-        if op.module_key == "raw_materials" and op.op_key in RAW_MATS_BLANK_OP_KEYS:
-            if op.bom_item and op.bom_item.part_id:
-                part_id = op.bom_item.part_id
-                uom = op.bom_item.unit or "ea"
-
-                # Done adds blanks
-                if qty_done_delta:
-                    apply_part_inventory_delta(part_id, "blank", qty_done_delta, uom=uom)
-
-                # Scrap reduces blanks (delta)
-                if qty_scrap_delta:
-                    apply_part_inventory_delta(part_id, "blank", -qty_scrap_delta, uom=uom)
-            else:
-                flash(
-                    "Progress saved, but Parts Inventory was not updated (BOM item is not linked to a catalog Part).",
-                    "warning",
-                )
+        if not totals.inventory_posted:
+            flash(UNLINKED_PART_WARNING, "warning")
 
         db.session.commit()
         flash("Progress saved.", "success")
@@ -1,7 +1,8 @@
 # File path: modules/jobs_management/services/build_bom_service.py
 
 from sqlalchemy import func
-from database.models import BOMItem, Build, BuildOperation, Part, db
+from database.models import BOMItem, Build, BuildOperation, Part, PartReservation, db
+from modules.inventory.services.reservation_service import release_for_bom_item
 from modules.jobs_management.services.routing import ensure_operations_for_bom_item
 
 
@@ -120,6 +121,11 @@ def delete_bom_item_from_build(*, bom_item_id: int) -> dict:
         .delete(synchronize_session=False)
     )
 
+    release_for_bom_item(bom.id, note="BOM item removed")
+    db.session.query(PartReservation).filter(
+        PartReservation.bom_item_id == bom.id
+    ).update({"bom_item_id": None}, synchronize_session=False)
+
     db.session.delete(bom)
 
     return {
@@ -4,6 +4,10 @@ from __future__ import annotations
 from typing import Dict, Set
 
 from database.models import Build
+from modules.inventory.services.reservation_service import (
+    RESERVATION_CONSUMED,
+    release_for_build,
+)
 
 from modules.shared.status import (
     STATUS_QUEUE,
@@ -63,6 +67,10 @@ def update_build_status(build_id: int, new_status: str) -> Dict[str, object]:
     # Mutations
     build.status = status
 
+    # Completed builds consumed what they held
+    if status in BUILD_TERMINAL_STATUSES:
+        release_for_build(build.id, status=RESERVATION_CONSUMED, note="Build completed")
+
     # Derive job status from builds
     job = build.job
     statuses = {b.status for b in job.builds}
@@ -5,6 +5,7 @@ from modules.shared.status import (
     STATUS_CANCELLED,
     TERMINAL_STATUSES,
 )
+from modules.inventory.services.reservation_service import release_for_builds
 
 
 def archive_job(job_id, force_cancel_in_progress=False):
@@ -40,6 +41,11 @@ def archive_job(job_id, force_cancel_in_progress=False):
                 if hasattr(op, "cancelled_reason"):
                     op.cancelled_reason = "Job archived by admin; active op cancelled."
 
+        release_for_builds(
+            [b.id for b in job.builds],
+            note="Job archived",
+        )
+
         job.is_archived = True
         job.archived_at = datetime.utcnow()
 
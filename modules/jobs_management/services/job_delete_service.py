@@ -2,6 +2,7 @@
 # TODO: include BuildOperationProgress and other child tables when added
 
 from database.models import db, Job, Build, BOMItem, BuildOperation
+from modules.inventory.services.reservation_service import delete_for_builds
 
 
 def delete_job_with_children(job_id):
@@ -11,6 +12,7 @@ def delete_job_with_children(job_id):
 
     build_ids = [b.id for b in Build.query.filter_by(job_id=job_id).all()]
     if build_ids:
+        delete_for_builds(build_ids)
         BuildOperation.query.filter(BuildOperation.build_id.in_(build_ids)).delete(
             synchronize_session=False
         )
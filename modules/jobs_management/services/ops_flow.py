@@ -5,6 +5,7 @@ from database.models import db, BuildOperation
 
 from modules.shared.claims import release_claim
 from modules.shared.services.build_op_progress_service import add_op_event
+from modules.shared.services import metrics
 
 from modules.shared.status import (
     STATUS_QUEUE,
@@ -91,6 +92,7 @@ def complete_operation(op: BuildOperation, *, user_id: int = None, is_admin: boo
         note=(note or None),
         is_override=bool(is_admin),
     )
+    metrics.inc("merp_op_events_total", module_key=op.module_key, event="complete")
 
     if op.bom_item_id is not None:
         release_next_for_bom_item(op)
@@ -87,6 +87,7 @@ def ensure_operations_for_bom_item(bom_item):
             op.module_key = s.module_key
             op.sequence = s.sequence
             op.is_outsourced = bool(getattr(s, "is_outsourced", False))
+            op.output_stage_key = getattr(s, "output_stage_key", None)
             continue
 
         db.session.add(BuildOperation(
@@ -98,6 +99,7 @@ def ensure_operations_for_bom_item(bom_item):
             module_key=s.module_key,
             sequence=s.sequence,
             is_outsourced=bool(getattr(s, "is_outsourced", False)),
+            output_stage_key=getattr(s, "output_stage_key", None),
             qty_planned=planned_qty,
             qty_required=required_qty,
             status="queue",
@@ -1,9 +1,13 @@
 # File path: modules/manufacturing/bevel_grinding/routes/index.py
 
+import logging
+
 from flask import render_template
 from .. import bevel_bp
 
+log = logging.getLogger(__name__)
+
 @bevel_bp.route("/")
 def bevel_index():
-    print("🔪 Bevel Grinding route HIT")
+    log.debug("bevel grinding index")
     return render_template("bevel_grinding/index.html")
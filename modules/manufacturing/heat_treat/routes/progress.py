@@ -6,7 +6,11 @@ from database.models import db
 from .. import heat_treat_bp
 from modules.user.decorators import login_required
 
-from modules.manufacturing.machining.services.progress_service import add_op_progress, OpProgressError
+from modules.manufacturing.machining.services.progress_service import (
+    add_op_progress,
+    OpProgressError,
+    UNLINKED_PART_WARNING,
+)
 
 @heat_treat_bp.route("/op/<int:op_id>/progress", methods=["POST"])
 @login_required
@@ -18,7 +22,7 @@ def heat_treat_progress_add(op_id):
     user_id = session.get("user_id") # ✅ canonical for v0
 
     try:
-        add_op_progress(
+        _op, totals = add_op_progress(
             op_id=op_id,
             qty_done_delta=qty_done_delta,
             qty_scrap_delta=qty_scrap_delta,
@@ -29,6 +33,8 @@ def heat_treat_progress_add(op_id):
         )
         db.session.commit()
         flash("Progress update added.", "success")
+        if not totals.inventory_posted:
+            flash(UNLINKED_PART_WARNING, "warning")
     except OpProgressError as e:
         db.session.rollback()
         flash(str(e), "error")
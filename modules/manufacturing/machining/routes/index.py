@@ -1,12 +1,16 @@
 # File path: modules/manufacturing/machining/routes/index.py
 # V1 Refactor Index
 
+import logging
+
 from flask import render_template
 from modules.user.decorators import login_required
 from .. import mfg_bp
 
+log = logging.getLogger(__name__)
+
 @mfg_bp.route("/")
 @login_required
 def mfg_index():
-    print("🏭Machining route HIT")
+    log.debug("machining index")
     return render_template("machining/index.html")
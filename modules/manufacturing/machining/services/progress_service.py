@@ -7,5 +7,5 @@ from modules.shared.services.build_op_progress_service import (
     get_op_totals,
     OpProgressError,
     OpProgressTotals,
-    
+    UNLINKED_PART_WARNING,
 )
@@ -3,11 +3,12 @@
 # V2 refactor | move inside of modules/raw_materials/waterjet/ | blueprint changed to raw_mats_waterjet_bp
 
 from flask import render_template, request, redirect, url_for, flash
-from sqlalchemy import or_
-
 from modules.user.decorators import login_required
 from .. import raw_mats_waterjet_bp
 from database.models import db, WaterjetConsumable
+from modules.shared.services.search_index import apply_search_filter
+from modules.inventory.services.stock_ledger_service import post_stock_move
+from modules.inventory.services.reorder_service import get_reorder_map
 
 
 def _to_float(v):
@@ -30,29 +31,29 @@ def waterjet_manager_index():
     if not show_inactive:
         q = q.filter(WaterjetConsumable.is_active == True)
 
-    if q_txt:
-        like = f"%{q_txt}%"
-        q = q.filter(
-            or_(
-                WaterjetConsumable.name.ilike(like),
-                WaterjetConsumable.category.ilike(like),
-                WaterjetConsumable.part_number.ilike(like),
-                WaterjetConsumable.vendor.ilike(like),
-                WaterjetConsumable.location.ilike(like),
-            )
-        )
-
-    items = q.order_by(WaterjetConsumable.category.asc(), WaterjetConsumable.name.asc()).all()
+    q = apply_search_filter(
+        q, "waterjet_consumable", WaterjetConsumable.id, q_txt,
+        fallback_columns=[
+            WaterjetConsumable.name,
+            WaterjetConsumable.category,
+            WaterjetConsumable.part_number,
+            WaterjetConsumable.vendor,
+            WaterjetConsumable.location,
+        ],
+    )
 
+    # Low = static reorder point OR forecast days-of-cover inside lead time
+    reorder_map = get_reorder_map("waterjet_consumable")
     if low_only:
-        items = [
-            i for i in items
-            if i.reorder_point is not None and i.qty_on_hand <= i.reorder_point
-        ]
+        low_ids = [cid for cid, r in reorder_map.items() if r.is_low]
+        q = q.filter(WaterjetConsumable.id.in_(low_ids))
+
+    items = q.order_by(WaterjetConsumable.category.asc(), WaterjetConsumable.name.asc()).all()
 
     return render_template(
         "raw_materials/waterjet/manager/index.html",
         items=items,
+        reorder_map=reorder_map,
         show_inactive=show_inactive,
         low_only=low_only,
         q=q_txt,
@@ -94,6 +95,18 @@ def waterjet_manager_new():
             is_active=True,
         )
         db.session.add(item)
+        db.session.flush()
+
+        if qty_on_hand:
+            post_stock_move(
+                entity_type="waterjet_consumable",
+                entity_id=item.id,
+                qty_delta=qty_on_hand,
+                uom=uom,
+                reason="receive",
+                note="Initial qty on create",
+            )
+
         db.session.commit()
         flash("Consumable created.", "success")
         return redirect(url_for("raw_mats_waterjet_bp.waterjet_manager_index"))
@@ -115,6 +128,17 @@ def waterjet_manager_edit(item_id):
 
         qoh = _to_float(request.form.get("qty_on_hand"))
         if qoh is not None:
+            delta = qoh - float(item.qty_on_hand or 0.0)
+            if delta:
+                # Editing the count is a correction, not usage (see reorder_service)
+                post_stock_move(
+                    entity_type="waterjet_consumable",
+                    entity_id=item.id,
+                    qty_delta=delta,
+                    uom=item.uom,
+                    reason="correction",
+                    note="Qty on hand edited",
+                )
             item.qty_on_hand = qoh
 
         item.reorder_point = _to_float(request.form.get("reorder_point"))
@@ -134,3 +158,41 @@ def waterjet_manager_edit(item_id):
         return redirect(url_for("raw_mats_waterjet_bp.waterjet_manager_index"))
 
     return render_template("raw_materials/waterjet/manager/edit.html", item=item)
+
+
+# Count corrections go through the edit form (reason="correction")
+CONSUMABLE_MOVE_REASONS = ("consume", "receive", "scrap")
+
+
+@raw_mats_waterjet_bp.route("/manager/<int:item_id>/adjust", methods=["POST"])
+@login_required
+def waterjet_manager_adjust(item_id):
+    item = WaterjetConsumable.query.get_or_404(item_id)
+
+    qty = _to_float(request.form.get("qty"))
+    reason = (request.form.get("reason") or "consume").strip().lower()
+    note = (request.form.get("note") or "").strip() or None
+
+    if reason not in CONSUMABLE_MOVE_REASONS:
+        flash("Invalid reason.", "error")
+        return redirect(url_for("raw_mats_waterjet_bp.waterjet_manager_index"))
+
+    if not qty or qty <= 0:
+        flash("Qty must be greater than 0.", "error")
+        return redirect(url_for("raw_mats_waterjet_bp.waterjet_manager_index"))
+
+    delta = qty if reason == "receive" else -qty
+
+    post_stock_move(
+        entity_type="waterjet_consumable",
+        entity_id=item.id,
+        qty_delta=delta,
+        uom=item.uom,
+        reason=reason,
+        note=note,
+    )
+    item.qty_on_hand = float(item.qty_on_hand or 0.0) + delta
+
+    db.session.commit()
+    flash(f"{item.name}: {reason} {qty:g} {item.uom}.", "success")
+    return redirect(url_for("raw_mats_waterjet_bp.waterjet_manager_index"))
@@ -8,7 +8,11 @@ from database.models import db
 from .. import raw_mats_waterjet_bp
 from modules.user.decorators import login_required
 
-from modules.manufacturing.machining.services.progress_service import add_op_progress, OpProgressError
+from modules.manufacturing.machining.services.progress_service import (
+    add_op_progress,
+    OpProgressError,
+    UNLINKED_PART_WARNING,
+)
 
 @raw_mats_waterjet_bp.route("/op/<int:op_id>/progress", methods=["POST"])
 @login_required
@@ -20,7 +24,7 @@ def waterjet_progress_add(op_id):
     user_id = session.get("user_id") # ✅ canonical for v0
 
     try:
-        add_op_progress(
+        _op, totals = add_op_progress(
             op_id=op_id,
             qty_done_delta=qty_done_delta,
             qty_scrap_delta=qty_scrap_delta,
@@ -31,8 +35,10 @@ def waterjet_progress_add(op_id):
         )
         db.session.commit()
         flash("Progress update added.", "success")
+        if not totals.inventory_posted:
+            flash(UNLINKED_PART_WARNING, "warning")
     except OpProgressError as e:
         db.session.rollback()
         flash(str(e), "error")
 
-    return redirect(url_for("raw_mats_waterjet_bp.raw_mats_waterjet_detail", op_id=op_id))
+    return redirect(url_for("raw_mats_waterjet_bp.waterjet_detail", op_id=op_id))
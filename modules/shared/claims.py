@@ -11,6 +11,7 @@ from typing import Optional, Dict, Any
 from flask import current_app
 
 from modules.shared.status import TERMINAL_STATUSES
+from modules.shared.services import metrics
 
 
 ROLE_EDITOR = "editor"
@@ -91,10 +92,17 @@ def claim(obj, *, user_id: int, is_admin: bool = False, force: bool = False, as_
         touch_claim(obj)
         return {"ok": True, "role": ROLE_CONTRIBUTOR, "changed": False}
 
+    module_key = getattr(obj, "module_key", None)
     if is_claim_stale(obj):
         obj.claimed_by_user_id = user_id
         obj.claimed_at = _now()
         obj.claim_touched_at = obj.claimed_at
+        metrics.inc("merp_claim_stale_takeovers_total", module_key=module_key)
         return {"ok": True, "role": ROLE_EDITOR, "changed": True, "stole_stale": True}
 
+    metrics.inc(
+        "merp_claim_conflicts_total",
+        module_key=module_key,
+        action=("progress" if as_contributor else "start"),
+    )
     return {"ok": False, "reason": "claimed_by_other"}
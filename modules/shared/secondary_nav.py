@@ -21,6 +21,8 @@ SECONDARY_NAV_RULES = [
                     "inventory_bp.raw_stock", 
                     "inventory_bp.bulk",
                     "inventory_bp.parts_inventory",
+                    "inventory_bp.reorder",
+                    "inventory_bp.stock_import",
                 ]
              
         },
@@ -28,6 +30,8 @@ SECONDARY_NAV_RULES = [
             {"label": "Raw Stock", "endpoint": "inventory_bp.raw_stock_index"},
             {"label": "Bulk Hardware", "endpoint": "inventory_bp.bulk_index"},
             {"label": "Parts Inventory", "endpoint": "inventory_bp.parts_inventory_index"},
+            {"label": "Reorder", "endpoint": "inventory_bp.reorder_index"},
+            {"label": "Count Import", "endpoint": "inventory_bp.stock_import"},
         ),
     },
 
@@ -0,0 +1,195 @@
+# File path: modules/shared/services/app_logging.py
+# V1 - Structured (JSON lines) logging through a background queue
+"""
+init_logging(app) puts one QueueHandler on the root logger. Calling code only
+pays for building the record and putting it on a queue. A QueueListener
+thread formats it and writes:
+
+    <MERP_LOG_DIR>/merp.log     JSON lines, rotated at MERP_LOG_MAX_BYTES
+                                (MERP_LOG_BACKUPS files kept); default dir instance/logs
+    stderr                      short text lines, level MERP_LOG_CONSOLE_LEVEL
+
+Every record carries request context when there is one: request_id (taken
+from the X-Request-ID header, or generated and echoed back in it), method,
+path, endpoint, user_id. Extra fields passed with `extra={...}` become
+top-level JSON keys.
+
+When a request finishes, one "request" record from the merp.request logger
+carries status, duration_ms, sql_ms and sql_queries. Set that logger to
+WARNING to silence it.
+
+Levels: MERP_LOG_LEVEL (root, default INFO), plus per-logger overrides in
+MERP_LOG_LEVELS, e.g. "routes.auth=DEBUG,merp.request=WARNING,werkzeug=WARNING".
+Modules log through logging.getLogger(__name__).
+"""
+
+from __future__ import annotations
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+
+from flask import g, has_request_context, request, session
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# LogRecord attributes that are not user "extra" fields
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+# Added to every record inside a request (console shows only request_id)
+_CONTEXT_FIELDS = ("request_id", "method", "path", "endpoint", "user_id")
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+request_log = logging.getLogger("merp.request")
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                out[key] = value
+        if record.exc_text:
+            out["exc"] = record.exc_text
+        return json.dumps(out, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = " ".join(
+            f"{k}={v}" for k, v in record.__dict__.items()
+            if k not in _RESERVED and k not in _CONTEXT_FIELDS and not k.startswith("_")
+        )
+        if extras:
+            line = f"{line} {extras}"
+        rid = getattr(record, "request_id", None)
+        return f"{line} [{rid}]" if rid else line
+
+
+class _ContextQueueHandler(QueueHandler):
+    """Adds request context in the calling thread; the listener thread has none."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if has_request_context():
+            for key, value in request_context_fields().items():
+                if not hasattr(record, key):
+                    setattr(record, key, value)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def request_context_fields() -> Dict[str, object]:
+    return {
+        "request_id": g.get("request_id"),
+        "method": request.method,
+        "path": request.path,
+        "endpoint": request.endpoint,
+        "user_id": session.get("user_id"),
+    }
+
+
+def _parse_levels(spec) -> Dict[str, str]:
+    if isinstance(spec, dict):
+        return {k: str(v).upper() for k, v in spec.items()}
+    levels = {}
+    for part in (spec or "").split(","):
+        name, _, level = part.strip().partition("=")
+        if name and level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def stop_logging() -> None:
+    """Drain the queue (registered atexit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
+def init_logging(app) -> None:
+    global _listener, _queue_handler
+
+    root = logging.getLogger()
+    if _queue_handler is not None:
+        # create_app called again in this process (tests, CLI): rebuild cleanly
+        root.removeHandler(_queue_handler)
+        stop_logging()
+
+    log_dir = app.config.get("MERP_LOG_DIR") or os.path.join(app.instance_path, "logs")
+    os.makedirs(log_dir, exist_ok=True)
+
+    file_handler = RotatingFileHandler(
+        os.path.join(log_dir, "merp.log"),
+        maxBytes=int(app.config.get("MERP_LOG_MAX_BYTES", 20 * 1024 * 1024)),
+        backupCount=int(app.config.get("MERP_LOG_BACKUPS", 5)),
+        encoding="utf-8",
+        delay=True,
+    )
+    file_handler.setFormatter(JsonFormatter())
+
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(ConsoleFormatter())
+    console.setLevel(app.config.get("MERP_LOG_CONSOLE_LEVEL", "INFO"))
+
+    q: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    _queue_handler = _ContextQueueHandler(q)
+    _listener = QueueListener(q, file_handler, console, respect_handler_level=True)
+    _listener.start()
+
+    root.addHandler(_queue_handler)
+    root.setLevel(app.config.get("MERP_LOG_LEVEL", "INFO"))
+    for name, level in _parse_levels(app.config.get("MERP_LOG_LEVELS")).items():
+        logging.getLogger(name).setLevel(level)
+
+    @app.before_request
+    def _assign_request_id():
+        incoming = request.headers.get(REQUEST_ID_HEADER, "")
+        g.request_id = incoming[:64] if incoming else uuid.uuid4().hex[:16]
+        g.merp_log_t0 = time.perf_counter()
+
+    @app.after_request
+    def _log_request(response):
+        rid = g.get("request_id")
+        if rid:
+            response.headers[REQUEST_ID_HEADER] = rid
+        t0 = g.get("merp_log_t0")
+        if t0 is not None and request.endpoint != "static" and request_log.isEnabledFor(logging.INFO):
+            acc = g.get("merp_sql")  # sql_profiler.py totals, when it is on
+            request_log.info(
+                "request",
+                extra={
+                    "status": response.status_code,
+                    "duration_ms": round((time.perf_counter() - t0) * 1000.0, 2),
+                    "sql_ms": round(acc.ms, 2) if acc is not None else None,
+                    "sql_queries": acc.count if acc is not None else None,
+                },
+            )
+        return response
@@ -0,0 +1,434 @@
+# File path: modules/shared/services/benchmarks.py
+# V1 - Offline benchmark suite for core services + JSON results and comparison
+"""
+`flask bench run` times each case in default_cases(). Run it against a
+database filled by `flask synth-data` (database/synthetic.py), so that runs
+from different commits see the same data.
+
+Each case gets `warmup` untimed rounds, then `rounds` timed ones. Setup
+(e.g. creating the build a BOM is exploded into) is not timed. The session is
+rolled back and removed after every round, so cases that write (progress,
+complete, apply WO) never commit and each round starts cold, like a request
+does. Besides min / max / mean / median / stddev, every case records its SQL
+statement count per round; an N+1 fix shows up there even when timings are
+noisy.
+
+Results are one JSON document per run in MERP_BENCH_DIR (default
+instance/benchmarks), laid out like pytest-benchmark's. It also stores the
+git commit and the dataset row counts. `flask bench compare` diffs two
+runs. By default it compares the two newest. It flags every case whose
+statistic moved more than --threshold percent, and exits 1 on any
+regression.
+
+parse_step cases need the files passed with --step and OCC installed;
+otherwise they are reported as skipped.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import importlib.util
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from flask import current_app, url_for
+from sqlalchemy import event, func, select
+
+from database.models import (
+    db,
+    BOMHeader,
+    Build,
+    BuildOperation,
+    BuildOperationProgress,
+    Job,
+    StockLedgerEntry,
+    User,
+    WorkOrder,
+    WorkOrderLine,
+)
+from modules.shared.status import STATUS_IN_PROGRESS
+
+RESULTS_VERSION = 1
+STATS = ("min", "max", "mean", "median", "stddev")
+
+# Module queue pages (endpoint, query string)
+QUEUE_ROUTES = [
+    ("raw_mats_waterjet_bp.waterjet_queue", ""),
+    ("surface_grinding_bp.surface_queue", ""),
+    ("heat_treat_bp.heat_treat_queue", ""),
+    ("mfg_bp.mfg_queue", ""),
+    ("bevel_bp.bevel_index", ""),
+    ("mfg_bp.mfg_dispatch_v2", ""),
+    ("admin_bp.ops_audit", ""),
+    ("admin_bp.ops_audit", "?module_key=heat_treat"),
+]
+
+
+class BenchError(Exception):
+    pass
+
+
+@dataclass
+class BenchCase:
+    name: str
+    group: str
+    fn: Callable[[Any], Any]
+    setup: Optional[Callable[[], Any]] = None
+    max_rounds: Optional[int] = None
+    skip_reason: Optional[str] = None
+
+
+# -----------------------------
+# Running
+# -----------------------------
+
+class _QueryCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def _reset_session() -> None:
+    db.session.rollback()
+    db.session.remove()
+
+
+def run_case(case: BenchCase, rounds: int, warmup: int) -> dict:
+    out = {"name": case.name, "group": case.group}
+    if case.skip_reason:
+        out["skipped"] = case.skip_reason
+        return out
+
+    rounds = min(rounds, case.max_rounds or rounds)
+    times: List[float] = []
+    queries: List[int] = []
+    try:
+        with _QueryCounter(db.engine) as counter:
+            for i in range(warmup + rounds):
+                arg = case.setup() if case.setup else None
+                counter.count = 0
+                t0 = time.perf_counter()
+                case.fn(arg)
+                dt = time.perf_counter() - t0
+                n_queries = counter.count
+                _reset_session()
+                if i >= warmup:
+                    times.append(dt)
+                    queries.append(n_queries)
+    except Exception as e:
+        _reset_session()
+        out["error"] = f"{type(e).__name__}: {e}"
+        return out
+
+    out["stats"] = {
+        "min": min(times),
+        "max": max(times),
+        "mean": statistics.fmean(times),
+        "median": statistics.median(times),
+        "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "rounds": len(times),
+    }
+    out["queries"] = statistics.fmean(queries)
+    return out
+
+
+def _git_commit(root: str) -> Optional[str]:
+    try:
+        res = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                             capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return res.stdout.strip() or None
+
+
+def dataset_counts() -> Dict[str, int]:
+    models = (WorkOrder, Job, Build, BuildOperation, BuildOperationProgress, StockLedgerEntry)
+    return {
+        m.__tablename__: db.session.execute(select(func.count()).select_from(m.__table__)).scalar()
+        for m in models
+    }
+
+
+def run_suite(
+    cases: List[BenchCase],
+    *,
+    rounds: int = 10,
+    warmup: int = 1,
+    log: Callable[[str], None] = print,
+) -> dict:
+    app = current_app._get_current_object()
+    doc = {
+        "version": RESULTS_VERSION,
+        "datetime": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(app.root_path),
+        "machine_info": {
+            "node": platform.node(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sqlite": sqlite3.sqlite_version,
+            "dialect": db.engine.dialect.name,
+        },
+        "dataset": dataset_counts(),
+        "config": {"rounds": rounds, "warmup": warmup},
+        "benchmarks": [],
+    }
+    _reset_session()
+    for case in cases:
+        res = run_case(case, rounds, warmup)
+        doc["benchmarks"].append(res)
+        log(format_result(res))
+    return doc
+
+
+def format_result(res: dict) -> str:
+    label = f"{res['name']:<46}"
+    if "skipped" in res:
+        return f"{label} skipped: {res['skipped']}"
+    if "error" in res:
+        return f"{label} ERROR {res['error']}"
+    st = res["stats"]
+    return (
+        f"{label} median {st['median'] * 1000:9.2f} ms  min {st['min'] * 1000:9.2f} ms  "
+        f"± {st['stddev'] * 1000:7.2f}  {res['queries']:7.1f} q  ({st['rounds']} rounds)"
+    )
+
+
+# -----------------------------
+# Storage + comparison
+# -----------------------------
+
+def results_dir() -> str:
+    return current_app.config.get("MERP_BENCH_DIR") or os.path.join(current_app.instance_path, "benchmarks")
+
+
+def save_results(doc: dict, name: Optional[str] = None) -> str:
+    d = results_dir()
+    os.makedirs(d, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    label = name or doc.get("commit") or "run"
+    path = os.path.join(d, f"{stamp}_{label}.json")
+    with open(path, "w") as f:
+        json.dump(doc, f, indent=2)
+    return path
+
+
+def load_results(path: str) -> dict:
+    with open(path) as f:
+        doc = json.load(f)
+    if doc.get("version") != RESULTS_VERSION:
+        raise BenchError(f"{path}: unsupported results version {doc.get('version')!r}")
+    return doc
+
+
+def latest_results(n: int = 2) -> List[str]:
+    d = results_dir()
+    files = sorted(f for f in os.listdir(d) if f.endswith(".json")) if os.path.isdir(d) else []
+    return [os.path.join(d, f) for f in files[-n:]]
+
+
+@dataclass
+class Comparison:
+    name: str
+    base: Optional[float]
+    new: Optional[float]
+    base_queries: Optional[float]
+    new_queries: Optional[float]
+    status: str        # regressed | improved | same | added | removed | unavailable
+
+    @property
+    def change_pct(self) -> Optional[float]:
+        if not self.base or self.new is None:
+            return None
+        return (self.new - self.base) / self.base * 100.0
+
+
+def compare_results(base: dict, new: dict, *, threshold_pct: float = 10.0, stat: str = "median") -> List[Comparison]:
+    if stat not in STATS:
+        raise BenchError(f"Unknown statistic {stat!r}; use one of {', '.join(STATS)}.")
+
+    def index(doc):
+        return {b["name"]: b for b in doc.get("benchmarks", [])}
+
+    a, b = index(base), index(new)
+    out = []
+    for name in list(a) + [n for n in b if n not in a]:
+        ra, rb = a.get(name), b.get(name)
+        va = ra["stats"][stat] if ra and "stats" in ra else None
+        vb = rb["stats"][stat] if rb and "stats" in rb else None
+        qa = ra.get("queries") if ra else None
+        qb = rb.get("queries") if rb else None
+        if ra is None:
+            status = "added"
+        elif rb is None:
+            status = "removed"
+        elif va is None or vb is None:
+            status = "unavailable"
+        else:
+            change = (vb - va) / va * 100.0 if va else 0.0
+            status = "regressed" if change > threshold_pct else "improved" if change < -threshold_pct else "same"
+            # More SQL per call is a regression whatever the clock says
+            if qa is not None and qb is not None and qb > qa:
+                status = "regressed"
+        out.append(Comparison(name, va, vb, qa, qb, status))
+    return out
+
+
+# -----------------------------
+# The suite
+# -----------------------------
+
+def _first_id(stmt) -> Optional[int]:
+    return db.session.execute(stmt.limit(1)).scalar()
+
+
+def _flushed(fn: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Writers do not commit; flush inside the timed call so their INSERT/UPDATEs count."""
+    def run(arg):
+        fn(arg)
+        db.session.flush()
+    return run
+
+
+def _client_get(app, path: str, user_id: int, username: str):
+    def run(_arg):
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["user"] = username
+            sess["user_id"] = user_id
+            sess["is_admin"] = True
+        resp = client.get(path)
+        if resp.status_code != 200:
+            raise BenchError(f"GET {path} returned {resp.status_code}")
+    return run
+
+
+def default_cases(step_files: Optional[List[str]] = None) -> List[BenchCase]:
+    """Cases against whatever data is loaded (synth-data ids are looked up, not assumed)."""
+    from modules.inventory.services.bom_explode import explode_bom_header_to_build
+    from modules.inventory.services.catalog_service import get_catalog_rows
+    from modules.inventory.services.stock_ledger_service import get_on_hand_map
+    from modules.jobs_management.services.ops_flow import complete_operation
+    from modules.shared.services.build_op_progress_service import add_op_progress
+    from modules.work_orders.services.apply import apply_work_order_to_new_build
+    from modules.work_orders.services.planning import plan_global_netting
+
+    app = current_app._get_current_object()
+    no_data = "no suitable rows (run `flask synth-data` first)"
+    cases: List[BenchCase] = []
+
+    cases.append(BenchCase("plan_global_netting", "planning", lambda _: plan_global_netting()))
+
+    # Single-line WO: several assembly lines on one WO give colliding bom_items.line_no
+    wo_id = _first_id(
+        select(WorkOrder.id).join(WorkOrderLine, WorkOrderLine.work_order_id == WorkOrder.id)
+        .where(WorkOrder.status == "open").group_by(WorkOrder.id)
+        .having(func.count(WorkOrderLine.id) == 1).order_by(WorkOrder.id)
+    )
+    cases.append(BenchCase(
+        "apply_work_order_to_new_build", "planning",
+        _flushed(lambda _: apply_work_order_to_new_build(wo_id)),
+        skip_reason=None if wo_id else no_data,
+    ))
+
+    bom_id = _first_id(select(BOMHeader.id).where(BOMHeader.is_active.is_(True)).order_by(BOMHeader.id.desc()))
+    job_id = _first_id(select(Job.id).order_by(Job.id.desc()))
+
+    def explode_setup():
+        header = db.session.get(BOMHeader, bom_id)
+        build = Build(job_id=job_id, name="bench", assembly_part_id=header.assembly_part_id, qty_ordered=10)
+        db.session.add(build)
+        db.session.flush()
+        return build, header
+
+    cases.append(BenchCase(
+        "explode_bom_header_to_build", "planning",
+        _flushed(lambda arg: explode_bom_header_to_build(arg[0], arg[1], 10)),
+        setup=explode_setup,
+        skip_reason=None if bom_id and job_id else no_data,
+    ))
+
+    cases.append(BenchCase("get_catalog_rows", "inventory", lambda _: get_catalog_rows()))
+    cases.append(BenchCase("get_catalog_rows[search]", "inventory", lambda _: get_catalog_rows(search="blade")))
+
+    for etype, n in (("bulk_hardware", 200), ("part_inventory", 500)):
+        ids = list(range(1, n + 1))
+        cases.append(BenchCase(
+            f"get_on_hand_map[{etype}]", "inventory",
+            lambda _, etype=etype, ids=ids: get_on_hand_map(etype, ids),
+        ))
+
+    claimed = db.session.execute(
+        select(BuildOperation.id, BuildOperation.claimed_by_user_id)
+        .where(BuildOperation.status == STATUS_IN_PROGRESS, BuildOperation.claimed_by_user_id.isnot(None))
+        .order_by(BuildOperation.id)
+        .limit(1)
+    ).first()
+    cases.append(BenchCase(
+        "add_op_progress", "ops",
+        _flushed(lambda _: add_op_progress(claimed[0], 1.0, 0.0, note="bench", user_id=claimed[1])),
+        skip_reason=None if claimed else no_data,
+    ))
+    cases.append(BenchCase(
+        "complete_operation", "ops",
+        _flushed(lambda op: complete_operation(op, user_id=claimed[1], is_admin=True, note="bench")),
+        setup=lambda: db.session.get(BuildOperation, claimed[0]),
+        skip_reason=None if claimed else no_data,
+    ))
+
+    admin = db.session.execute(
+        select(User.id, User.username).where(User.role == "admin").order_by(User.id).limit(1)
+    ).first()
+    for endpoint, query in QUEUE_ROUTES:
+        reason = None
+        path = ""
+        if admin is None:
+            reason = "no admin user"
+        elif endpoint not in app.view_functions:
+            reason = "route not registered"
+        else:
+            with app.test_request_context():
+                path = url_for(endpoint) + query
+        cases.append(BenchCase(
+            f"route:{endpoint}{query}", "routes",
+            _client_get(app, path, admin.id, admin.username) if not reason else (lambda _: None),
+            skip_reason=reason,
+        ))
+
+    occ_missing = importlib.util.find_spec("OCC") is None
+    for path in step_files or []:
+        reason = "OCC (pythonocc-core) not installed" if occ_missing else None
+
+        def parse(_arg, path=path):
+            from modules.assembly.parser.step_parser import parse_step
+            parse_step(path)
+
+        cases.append(BenchCase(
+            f"parse_step[{os.path.basename(path)}]", "cad", parse, max_rounds=3, skip_reason=reason,
+        ))
+    if not step_files:
+        cases.append(BenchCase("parse_step", "cad", lambda _: None, skip_reason="no --step files given"))
+    return cases
+
+
+def select_cases(cases: List[BenchCase], patterns: List[str]) -> List[BenchCase]:
+    if not patterns:
+        return cases
+    return [c for c in cases if any(fnmatch.fnmatch(c.name, p) or p in c.name for p in patterns)]
@@ -0,0 +1,160 @@
+# File path: modules/shared/services/blob_store.py
+# V1 - Content-addressed file storage (sha256)
+"""
+Uploaded files (drawings, CAD) are stored once by content:
+
+    <MERP_BLOB_DIR>/ab/cd/abcdef...   (full sha256 hex, no extension)
+
+store_stream() makes a single pass over the upload: bytes go to a temp file
+in the blob root while being hashed, then the temp file is renamed onto its
+content path (or dropped when that blob already exists). Identical files
+therefore cost no extra space, whatever their filename.
+
+Records keep the hash (content_sha256) plus a stored_path pointing at the
+blob. Places that need the file under another name (e.g. static/uploads/cad)
+get a hard link via link_blob(), falling back to a copy across filesystems.
+
+Blobs are never rewritten; deleting is left to a future GC that checks
+references. No DB access here.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from flask import current_app, has_app_context
+
+STREAM_CHUNK = 1 << 20
+
+
+class BlobStoreError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    sha256: str
+    size: int
+    path: str            # absolute
+    created: bool        # False when the content was already stored
+
+    @property
+    def stored_path(self) -> str:
+        return stored_path_for(self.path)
+
+
+def blob_root() -> str:
+    root = current_app.config.get("MERP_BLOB_DIR") if has_app_context() else None
+    if not root:
+        base = current_app.instance_path if has_app_context() else "instance"
+        root = os.path.join(base, "blobs")
+    return os.path.abspath(root)
+
+
+def _check_sha(sha256: str) -> str:
+    sha256 = (sha256 or "").lower()
+    if len(sha256) != 64 or any(c not in "0123456789abcdef" for c in sha256):
+        raise BlobStoreError(f"Not a sha256 hex digest: {sha256!r}")
+    return sha256
+
+
+def blob_path(sha256: str) -> str:
+    sha256 = _check_sha(sha256)
+    return os.path.join(blob_root(), sha256[:2], sha256[2:4], sha256)
+
+
+def has_blob(sha256: str) -> bool:
+    return os.path.exists(blob_path(sha256))
+
+
+def stored_path_for(abs_path: str) -> str:
+    """Relative to the app root when the blob lives under it (matches existing stored_path values)."""
+    if has_app_context():
+        root = os.path.abspath(current_app.root_path)
+        if os.path.commonpath([root, abs_path]) == root:
+            return os.path.relpath(abs_path, root)
+    return abs_path
+
+
+def store_stream(stream, chunk_size: int = STREAM_CHUNK) -> BlobRef:
+    """Hash + write a binary stream in one pass. Returns the BlobRef (deduplicated)."""
+    root = blob_root()
+    tmp_dir = os.path.join(root, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    tmp = os.path.join(tmp_dir, uuid.uuid4().hex)
+
+    h = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp, "wb") as out:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                h.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+
+        sha = h.hexdigest()
+        final = blob_path(sha)
+        if os.path.exists(final):
+            os.remove(tmp)
+            return BlobRef(sha, size, final, created=False)
+
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        os.replace(tmp, final)
+        return BlobRef(sha, size, final, created=True)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def store_upload(file_storage) -> BlobRef:
+    """werkzeug FileStorage → BlobRef."""
+    return store_stream(file_storage.stream)
+
+
+def store_file(path: str) -> BlobRef:
+    with open(path, "rb") as f:
+        return store_stream(f)
+
+
+def link_blob(sha256: str, dest_path: str) -> str:
+    """Expose a blob at dest_path (hard link; copy if linking is not possible). Returns dest_path."""
+    src = blob_path(sha256)
+    if not os.path.exists(src):
+        raise BlobStoreError(f"Blob {sha256} is missing.")
+
+    os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+    if os.path.exists(dest_path):
+        try:
+            if os.path.samefile(src, dest_path):
+                return dest_path
+        except OSError:
+            pass
+        os.remove(dest_path)
+
+    try:
+        os.link(src, dest_path)
+    except OSError:
+        shutil.copyfile(src, dest_path)
+    return dest_path
+
+
+def find_sha_for_path(abs_path: str) -> Optional[str]:
+    """sha256 when abs_path is a blob path, else None (legacy per-record files)."""
+    root = blob_root()
+    abs_path = os.path.abspath(abs_path)
+    if os.path.dirname(os.path.dirname(os.path.dirname(abs_path))) != root:
+        return None
+    name = os.path.basename(abs_path)
+    try:
+        return _check_sha(name)
+    except BlobStoreError:
+        return None
@@ -9,6 +9,7 @@ from database.models import db, BuildOperation
 from modules.shared.status import TERMINAL_STATUSES, STATUS_IN_PROGRESS
 from modules.shared.claims import claim, ROLE_ADMIN_OVERRIDE
 from modules.shared.services.build_op_progress_service import add_op_event, OpProgressError
+from modules.shared.services import metrics
 
 
 def start_build_operation(
@@ -66,5 +67,6 @@ def start_build_operation(
         note=(note or None),
         is_override=(role == ROLE_ADMIN_OVERRIDE),
     )
+    metrics.inc("merp_op_events_total", module_key=op.module_key, event="start")
 
     return op
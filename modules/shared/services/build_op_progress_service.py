@@ -10,6 +10,7 @@ from flask import abort
 from database.models import db, BuildOperation, BuildOperationProgress
 from modules.shared.status import TERMINAL_STATUSES
 from modules.shared.claims import claim, ROLE_ADMIN_OVERRIDE, ROLE_EDITOR
+from modules.shared.services import metrics
 
 
 class OpProgressError(Exception):
@@ -20,6 +21,13 @@ class OpProgressError(Exception):
 class OpProgressTotals:
     qty_done: float
     qty_scrap: float
+    # False when the op posts inventory but its BOM item has no catalog Part
+    inventory_posted: bool = True
+
+
+UNLINKED_PART_WARNING = (
+    "Progress saved, but Parts Inventory was not updated (BOM item is not linked to a catalog Part)."
+)
 
 
 def add_op_event(
@@ -63,6 +71,8 @@ def add_op_progress(
     - Enforces claim gating (global)
     - Writes both progress + claim audit rows into BuildOperationProgress
     - Updates cached totals on BuildOperation
+    - Posts the op's PartInventory stage transition through the ledger
+      (op_inventory_service), whichever route reported the progress
     - Does NOT commit
     """
     op = BuildOperation.query.get(op_id)
@@ -135,14 +145,26 @@ def add_op_progress(
     entry.note = note
 
     db.session.add(entry)
+    metrics.inc("merp_op_events_total", module_key=op.module_key, event="progress")
 
     # 5) Maintain cached totals on op (so UI can read op.qty_done/op.qty_scrap consistently)
     op.qty_done = float(op.qty_done or 0.0) + qty_done_delta
     op.qty_scrap = float(op.qty_scrap or 0.0) + qty_scrap_delta
 
+    # 6) Inventory: move qty through the BOM item's stage chain (ledger-backed)
+    from modules.inventory.services.inventory_posting_service import get_request_posting_batch
+    from modules.shared.services.op_inventory_service import post_op_progress_inventory
+
+    batch = get_request_posting_batch(
+        source_type="build_operation", source_ref=f"op-{op.id}", user_id=int(user_id),
+    )
+    posted = post_op_progress_inventory(op, qty_done_delta, qty_scrap_delta, batch)
+    batch.flush()
+
     totals = OpProgressTotals(
         qty_done=float(op.qty_done or 0.0),
         qty_scrap=float(op.qty_scrap or 0.0),
+        inventory_posted=posted,
     )
     return op, totals
 
@@ -0,0 +1,59 @@
+# File path: modules/shared/services/file_serving.py
+# V1 - Conditional / range file responses
+"""
+send_stored_file() wraps flask.send_file(conditional=True), which already
+answers Range (206 / 416), If-None-Match, If-Modified-Since and If-Range.
+What it adds:
+
+  - a strong ETag from the content hash when we have one (blob store),
+    instead of werkzeug's mtime/size/filename tag
+  - Cache-Control by kind of content:
+        content_sha256 known → private, max-age=1y, immutable
+                               (a record's blob never changes in place)
+        otherwise            → private, no-cache (always revalidate; 304s are cheap)
+
+"private" because every file route sits behind login_required.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from flask import send_file
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def send_stored_file(
+    abs_path: str,
+    *,
+    mimetype: Optional[str] = None,
+    download_name: Optional[str] = None,
+    as_attachment: bool = False,
+    content_sha256: Optional[str] = None,
+    content_encoding: Optional[str] = None,
+):
+    resp = send_file(
+        abs_path,
+        mimetype=mimetype,
+        as_attachment=as_attachment,
+        download_name=download_name,
+        conditional=True,
+        etag=content_sha256 or True,
+        max_age=None,
+    )
+
+    if content_encoding:
+        resp.headers["Content-Encoding"] = content_encoding
+
+    cc = resp.cache_control
+    cc.private = True
+    if content_sha256:
+        cc.max_age = IMMUTABLE_MAX_AGE
+        cc.immutable = True
+        cc.no_cache = None
+    else:
+        cc.no_cache = True
+        cc.max_age = None
+
+    return resp
@@ -0,0 +1,336 @@
+# File path: modules/shared/services/metrics.py
+# V1 - Process-local counters/histograms + Prometheus text endpoint
+"""
+Recording is lock-free: every thread writes into its own shard (a plain
+dict reached through threading.local), so inc()/observe() never contend.
+A scrape merges the shards. When a thread exits (the threaded dev server
+starts one per connection) its shard is folded into a retired total and
+dropped, so the shard list only holds live threads.
+
+Several worker processes (gunicorn -w N) each hold their own shards. With
+MERP_METRICS_DIR set, each process also writes a snapshot to
+<dir>/<pid>.json at most every MERP_METRICS_FLUSH_SECONDS, and /metrics
+adds up every snapshot in the directory. Files from exited workers are
+kept, so counters stay monotonic across restarts of single workers.
+Empty the directory when the whole app restarts.
+
+/metrics is open to loopback clients, or to anyone sending
+`Authorization: Bearer <MERP_METRICS_TOKEN>` when a token is set.
+
+Names (all prefixed merp_):
+    http_request_duration_seconds{blueprint,endpoint,method,status}  histogram
+    request_sql_seconds{endpoint}                                     histogram
+    request_sql_queries{endpoint}                                     histogram
+    op_events_total{module_key,event}             start / progress / complete
+    claim_conflicts_total{module_key,action}      blocked by another user's claim
+    claim_stale_takeovers_total{module_key}
+    planning_run_seconds                                              histogram
+    step_parse_seconds{cache}                                         histogram
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from functools import wraps
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import Response, abort, current_app, g, request
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+LONG_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# name → (type, help, buckets)
+METRICS: Dict[str, Tuple[str, str, Optional[tuple]]] = {
+    "merp_http_request_duration_seconds": ("histogram", "Request latency.", LATENCY_BUCKETS),
+    "merp_request_sql_seconds": ("histogram", "SQL time per request.", LATENCY_BUCKETS),
+    "merp_request_sql_queries": ("histogram", "SQL statements per request.", QUERY_BUCKETS),
+    "merp_op_events_total": ("counter", "Build operation starts, progress posts and completions.", None),
+    "merp_claim_conflicts_total": ("counter", "Claim attempts blocked by another user's claim.", None),
+    "merp_claim_stale_takeovers_total": ("counter", "Stale claims taken over by another user.", None),
+    "merp_planning_run_seconds": ("histogram", "Global netting (planning) run time.", LONG_BUCKETS),
+    "merp_step_parse_seconds": ("histogram", "STEP parse + publish time per CAD job.", LONG_BUCKETS),
+}
+
+SKIP_ENDPOINTS = {"metrics", "static"}
+
+
+# -----------------------------
+# Recording (per-thread shards)
+# -----------------------------
+
+class _Shard:
+    __slots__ = ("counters", "hists")
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, LabelKey], float] = {}
+        # (name, labels) → [bucket counts..., +Inf count, sum]
+        self.hists: Dict[Tuple[str, LabelKey], List[float]] = {}
+
+
+class _Holder:
+    # Lives only in the thread-local, so it is freed when its thread exits
+    __slots__ = ("shard", "__weakref__")
+
+    def __init__(self, shard: _Shard):
+        self.shard = shard
+
+
+_local = threading.local()
+_lock = threading.RLock()
+_shards: List[_Shard] = []
+_retired = _Shard()     # totals of shards whose thread has exited
+
+
+def _fold(into: _Shard, shard: _Shard) -> None:
+    for key, v in _copy(shard.counters):
+        into.counters[key] = into.counters.get(key, 0.0) + v
+    for key, h in _copy(shard.hists):
+        acc = into.hists.get(key)
+        if acc is None:
+            into.hists[key] = list(h)
+        else:
+            for i, x in enumerate(h):
+                acc[i] += x
+
+
+def _retire(shard: _Shard) -> None:
+    with _lock:
+        _fold(_retired, shard)
+        try:
+            _shards.remove(shard)
+        except ValueError:
+            pass
+
+
+def _shard() -> _Shard:
+    holder = getattr(_local, "holder", None)
+    if holder is None:
+        holder = _local.holder = _Holder(_Shard())
+        weakref.finalize(holder, _retire, holder.shard)
+        with _lock:
+            _shards.append(holder.shard)
+    return holder.shard
+
+
+def _labels(labels: dict) -> LabelKey:
+    return tuple(sorted((k, "" if v is None else str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, value: float = 1.0, **labels) -> None:
+    counters = _shard().counters
+    key = (name, _labels(labels))
+    counters[key] = counters.get(key, 0.0) + value
+
+
+def observe(name: str, value: float, **labels) -> None:
+    buckets = METRICS[name][2]
+    hists = _shard().hists
+    key = (name, _labels(labels))
+    h = hists.get(key)
+    if h is None:
+        h = hists[key] = [0.0] * (len(buckets) + 2)
+    h[bisect_left(buckets, value)] += 1   # index len(buckets) is the +Inf bucket
+    h[-1] += value
+
+
+def timed(name: str, **labels):
+    """Decorator: observe the wrapped call's duration in seconds (also when it raises)."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - t0, **labels)
+        return wrapper
+    return deco
+
+
+# -----------------------------
+# Aggregation
+# -----------------------------
+
+def _copy(d: dict) -> list:
+    # Another thread may insert while we copy; retry (rare, and only on new label sets)
+    while True:
+        try:
+            return list(d.items())
+        except RuntimeError:
+            continue
+
+
+def snapshot() -> dict:
+    """This process: {"counters": {...}, "hists": {...}} keyed by json-able strings."""
+    total = _Shard()
+    # Under the lock so a shard retiring mid-scrape is counted exactly once
+    with _lock:
+        _fold(total, _retired)
+        for shard in _shards:
+            _fold(total, shard)
+    return {
+        "counters": {json.dumps([name, labels]): v for (name, labels), v in total.counters.items()},
+        "hists": {json.dumps([name, labels]): h for (name, labels), h in total.hists.items()},
+    }
+
+
+def _merge(into: dict, snap: dict) -> None:
+    for k, v in snap.get("counters", {}).items():
+        into["counters"][k] = into["counters"].get(k, 0.0) + v
+    for k, h in snap.get("hists", {}).items():
+        acc = into["hists"].get(k)
+        if acc is None or len(acc) != len(h):
+            into["hists"][k] = list(h)
+        else:
+            for i, x in enumerate(h):
+                acc[i] += x
+
+
+def metrics_dir() -> Optional[str]:
+    return current_app.config.get("MERP_METRICS_DIR")
+
+
+_last_flush = 0.0
+
+
+def flush(force: bool = False) -> None:
+    """Write this process's snapshot to MERP_METRICS_DIR/<pid>.json (atomic)."""
+    global _last_flush
+    d = metrics_dir()
+    if not d:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < float(current_app.config.get("MERP_METRICS_FLUSH_SECONDS", 5)):
+        return
+    _last_flush = now
+    os.makedirs(d, exist_ok=True)
+    path = os.path.join(d, f"{os.getpid()}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(snapshot(), f)
+    os.replace(tmp, path)
+
+
+def collect() -> dict:
+    """All processes: this one live, the others from their last flushed snapshot."""
+    total = {"counters": {}, "hists": {}}
+    _merge(total, snapshot())
+    d = metrics_dir()
+    if d and os.path.isdir(d):
+        own = f"{os.getpid()}.json"
+        for name in os.listdir(d):
+            if not name.endswith(".json") or name == own:
+                continue
+            try:
+                with open(os.path.join(d, name)) as f:
+                    _merge(total, json.load(f))
+            except (OSError, ValueError):
+                continue
+    return total
+
+
+def _fmt_labels(labels: Iterable, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = [tuple(x) for x in labels] + ([extra] if extra else [])
+    if not items:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+
+def _fmt_num(x: float) -> str:
+    return str(int(x)) if float(x).is_integer() else repr(float(x))
+
+
+def render_text(data: dict) -> str:
+    """Prometheus text exposition format (0.0.4)."""
+    by_name: Dict[str, list] = {}
+    for k, v in data["counters"].items():
+        name, labels = json.loads(k)
+        by_name.setdefault(name, []).append((labels, v))
+    for k, h in data["hists"].items():
+        name, labels = json.loads(k)
+        by_name.setdefault(name, []).append((labels, h))
+
+    lines = []
+    for name in sorted(by_name):
+        kind, help_text, buckets = METRICS.get(name, ("untyped", "", None))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, v in sorted(by_name[name], key=lambda x: x[0]):
+            if kind != "histogram":
+                lines.append(f"{name}{_fmt_labels(labels)} {_fmt_num(v)}")
+                continue
+            running = 0.0
+            for le, n in zip(list(buckets) + ["+Inf"], v[:-1]):
+                running += n
+                lines.append(f"{name}_bucket{_fmt_labels(labels, ('le', str(le)))} {_fmt_num(running)}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {_fmt_num(v[-1])}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {_fmt_num(running)}")
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------
+# Wiring
+# -----------------------------
+
+def _metrics_allowed() -> bool:
+    token = current_app.config.get("MERP_METRICS_TOKEN")
+    if token:
+        return request.headers.get("Authorization", "") == f"Bearer {token}"
+    return request.remote_addr in ("127.0.0.1", "::1")
+
+
+def metrics_view():
+    if not _metrics_allowed():
+        abort(403)
+    flush(force=True)
+    return Response(render_text(collect()), mimetype="text/plain; version=0.0.4")
+
+
+def init_metrics(app) -> None:
+    if not app.config.get("MERP_METRICS", True):
+        return
+
+    app.add_url_rule("/metrics", "metrics", metrics_view)
+
+    @app.before_request
+    def _metrics_start():
+        g.merp_metrics_t0 = time.perf_counter()
+
+    def _record(status: int):
+        t0 = g.pop("merp_metrics_t0", None)
+        if t0 is None or request.endpoint in SKIP_ENDPOINTS:
+            return
+        endpoint = request.endpoint or "(unmatched)"
+        observe(
+            "merp_http_request_duration_seconds",
+            time.perf_counter() - t0,
+            blueprint=request.blueprint or "",
+            endpoint=endpoint,
+            method=request.method,
+            status=status,
+        )
+        # Totals from the SQL profiler (sql_profiler.py), when it is on
+        acc = g.get("merp_sql")
+        if acc is not None:
+            observe("merp_request_sql_seconds", acc.ms / 1000.0, endpoint=endpoint)
+            observe("merp_request_sql_queries", acc.count, endpoint=endpoint)
+        flush()
+
+    @app.after_request
+    def _metrics_record(response):
+        _record(response.status_code)
+        return response
+
+    @app.teardown_request
+    def _metrics_record_failed(exc):
+        # after_request does not run for unhandled exceptions
+        _record(500)
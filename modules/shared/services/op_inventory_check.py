@@ -0,0 +1,211 @@
+# File path: modules/shared/services/op_inventory_check.py
+# V1 - End-to-end check of op-progress inventory postings (flask ops-inventory-check)
+"""
+Builds a scratch SQLite database, seeds one build per reporting mode with the
+preset chain
+
+    waterjet_cut (blank) -> surface_grind (mfg_wip) -> cnc_profile (mfg_wip)
+    -> heat_treat (mfg_wip) -> bevel_grind (mfg_complete) -> final op (fg_complete)
+
+and posts progress over HTTP through the test client:
+
+    module pages : each op through its module's progress route (jobs route
+                   for ops whose module has no progress page)
+    jobs page    : every op through jobs_bp.op_progress_add
+
+Either way the part must end with all qty in fg_complete, every
+PartInventory balance must equal its ledger sum, and the mfg_wip -> mfg_wip
+ops must write no ledger rows. Never touches the app database.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from typing import Callable, Dict, List, Optional, Tuple
+
+from flask import Flask, url_for
+from sqlalchemy import func
+from werkzeug.security import generate_password_hash
+
+from database.models import (
+    BOMItem,
+    Build,
+    BuildOperation,
+    Customer,
+    Job,
+    Part,
+    PartInventory,
+    StockLedgerEntry,
+    User,
+    db,
+)
+from modules.inventory.config.routing_presets import ROUTING_STEP_PRESETS
+
+FINAL_STEP = ("final_assembly", "Final Assembly", "assembly", 90, "fg_complete")
+
+# (op_key, qty_done, qty_scrap); the waterjet overrun covers the surface grind scrap
+PROGRESS = [
+    ("waterjet_cut", 11.0, 0.0),
+    ("surface_grind", 10.0, 1.0),
+    ("cnc_profile", 10.0, 0.0),
+    ("heat_treat", 10.0, 0.0),
+    ("bevel_grind", 10.0, 0.0),
+    ("final_assembly", 10.0, 0.0),
+]
+EXPECTED = {"blank": 0.0, "mfg_wip": 0.0, "mfg_complete": 0.0, "fg_complete": 10.0}
+
+# module_key -> progress endpoint on that module's own page
+MODULE_ENDPOINTS = {
+    "raw_materials": "raw_mats_waterjet_bp.waterjet_progress_add",
+    "surface_grinding": "surface_grinding_bp.surface_progress_add",
+    "manufacturing": "mfg_bp.mfg_progress_add",
+    "heat_treat": "heat_treat_bp.heat_treat_progress_add",
+}
+JOBS_ENDPOINT = "jobs_bp.op_progress_add"
+
+MODES = ("module pages", "jobs page")
+
+
+def _steps() -> List[Tuple[str, str, str, int, str]]:
+    steps = []
+    for op_key, _done, _scrap in PROGRESS[:-1]:
+        p = ROUTING_STEP_PRESETS[op_key]
+        steps.append((op_key, p["op_name"].strip(), p["module_key"], p["sequence"], p["output_stage_key"]))
+    steps.append(FINAL_STEP)
+    return steps
+
+
+def _endpoint(mode: str, op_key: str) -> str:
+    if mode == "module pages":
+        module_key = {k: m for k, _n, m, _s, _st in _steps()}[op_key]
+        return MODULE_ENDPOINTS.get(module_key, JOBS_ENDPOINT)
+    return JOBS_ENDPOINT
+
+
+def _seed(user_id: int, customer_id: int, mode: str) -> Dict[str, int]:
+    """One part, job, build and BOM item per mode; returns {op_key: op_id}."""
+    part = Part(part_number=f"CHK-{mode.split()[0].upper()}", name=f"Op inventory check ({mode})")
+    db.session.add(part)
+    db.session.flush()
+
+    job = Job(customer_id=customer_id, job_number=f"CHK-{part.id}", title=f"Op inventory check ({mode})")
+    db.session.add(job)
+    db.session.flush()
+
+    build = Build(job_id=job.id, name="Check build")
+    db.session.add(build)
+    db.session.flush()
+
+    item = BOMItem(build_id=build.id, name=part.name, part_id=part.id, unit="ea")
+    db.session.add(item)
+    db.session.flush()
+
+    ops = {}
+    for op_key, op_name, module_key, sequence, stage in _steps():
+        op = BuildOperation(
+            build_id=build.id,
+            bom_item_id=item.id,
+            op_key=op_key,
+            op_name=op_name,
+            module_key=module_key,
+            sequence=sequence,
+            output_stage_key=stage,
+            qty_required=10.0,
+            status="queue",
+        )
+        db.session.add(op)
+        db.session.flush()
+        ops[op_key] = op.id
+    return {"part_id": part.id, **ops}
+
+
+def _post(app: Flask, user: Tuple[int, str], endpoint: str, op_id: int, done: float, scrap: float) -> None:
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user"] = user[1]
+        sess["user_id"] = user[0]
+        sess["is_admin"] = True
+    with app.test_request_context():
+        path = url_for(endpoint, op_id=op_id)
+    client.post(path, data={"qty_done_delta": done, "qty_scrap_delta": scrap, "note": "ops-inventory-check"})
+
+
+def _check_mode(app: Flask, user: Tuple[int, str], mode: str, seeded: Dict[str, int]) -> List[str]:
+    problems = []
+    for op_key, done, scrap in PROGRESS:
+        _post(app, user, _endpoint(mode, op_key), seeded[op_key], done, scrap)
+
+    with app.app_context():
+        for op_key, done, scrap in PROGRESS:
+            op = db.session.get(BuildOperation, seeded[op_key])
+            if (op.qty_done, op.qty_scrap) != (done, scrap):
+                problems.append(f"{mode}: {op_key} progress not saved (done={op.qty_done}, scrap={op.qty_scrap})")
+
+        rows = PartInventory.query.filter_by(part_id=seeded["part_id"]).all()
+        balances = {r.stage_key: float(r.qty_on_hand or 0.0) for r in rows}
+        for stage, want in EXPECTED.items():
+            got = balances.get(stage, 0.0)
+            if abs(got - want) > 1e-9:
+                problems.append(f"{mode}: {stage} = {got:g}, expected {want:g}")
+
+        for r in rows:
+            ledger = (
+                db.session.query(func.coalesce(func.sum(StockLedgerEntry.qty_delta), 0.0))
+                .filter(StockLedgerEntry.entity_type == "part_inventory", StockLedgerEntry.entity_id == r.id)
+                .scalar()
+            )
+            if abs(float(ledger) - float(r.qty_on_hand or 0.0)) > 1e-9:
+                problems.append(f"{mode}: {r.stage_key} on hand {r.qty_on_hand:g} != ledger {ledger:g}")
+
+        for op_key in ("cnc_profile", "heat_treat"):
+            n = StockLedgerEntry.query.filter_by(source_ref=f"op-{seeded[op_key]}").count()
+            if n:
+                problems.append(f"{mode}: {op_key} (mfg_wip -> mfg_wip) wrote {n} ledger rows")
+    return problems
+
+
+def check_stage_chain(make_app: Callable[..., Flask]) -> Tuple[List[str], Dict[str, List[str]]]:
+    """
+    Run the chain through every mode on a scratch database.
+    Returns (problems, {mode: [endpoint per op]}); no problems = pass.
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="merp-opinv-")
+    saved: Dict[str, Optional[str]] = {
+        k: os.environ.get(k) for k in ("MERP_DB_PATH", "MERP_DATABASE_URL", "DATABASE_URL")
+    }
+    try:
+        os.environ["MERP_DB_PATH"] = os.path.join(tmp_dir, "check.db")
+        os.environ.pop("MERP_DATABASE_URL", None)
+        os.environ.pop("DATABASE_URL", None)
+        app = make_app(load_blueprints=True)
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+    try:
+        with app.app_context():
+            db.create_all()
+            user = User(username="ops-inventory-check", password_hash=generate_password_hash(os.urandom(16).hex()))
+            customer = Customer(name="Op inventory check")
+            db.session.add_all([user, customer])
+            db.session.flush()
+            seeded = {mode: _seed(user.id, customer.id, mode) for mode in MODES}
+            db.session.commit()
+            login = (user.id, user.username)
+
+        problems = []
+        routes = {}
+        for mode in MODES:
+            routes[mode] = [_endpoint(mode, op_key) for op_key, _d, _s in PROGRESS]
+            problems.extend(_check_mode(app, login, mode, seeded[mode]))
+
+        with app.app_context():
+            db.engine.dispose()
+        return problems, routes
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,100 @@
+# File path: modules/shared/services/op_inventory_service.py
+# V2 - Op progress -> PartInventory stage transitions (posted by add_op_progress)
+"""
+Each BuildOperation carries output_stage_key (snapshotted from its
+RoutingStep). Progress on an op moves qty through the stage chain of its
+BOM item, e.g.
+
+    waterjet_cut (blank) -> surface_grind (mfg_wip) -> bevel_grind (mfg_complete)
+    -> final assembly step (fg_complete)
+
+    qty_done  : input stage -qty, output stage +qty
+    qty_scrap : input stage -qty (first producing op: output stage -qty,
+                matching the old blank-op behaviour)
+
+The input stage is the output stage of the nearest earlier op (by sequence)
+on the same BOM item that posts inventory. Ops with no output stage post
+nothing and are skipped in the chain. An op whose input and output stage are
+the same (heat treat: mfg_wip -> mfg_wip) moves nothing; only its scrap posts.
+
+add_op_progress (build_op_progress_service.py) calls this for every progress
+post, so the jobs page and every module progress page post the same way.
+
+No commit here.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from flask import g, has_app_context
+
+from database.models import BuildOperation
+from modules.inventory.services.inventory_posting_service import PartInventoryPostingBatch
+from modules.shared.status import STATUS_CANCELLED
+
+
+def _stage_chain(build_id: int, bom_item_id: int):
+    """[(sequence, op_id, output_stage_key)] for a BOM item, cached per request."""
+    cache = getattr(g, "_op_stage_chains", None) if has_app_context() else None
+    if cache is None:
+        cache = {}
+        if has_app_context():
+            g._op_stage_chains = cache
+
+    key = (build_id, bom_item_id)
+    if key not in cache:
+        rows = (
+            BuildOperation.query
+            .with_entities(BuildOperation.sequence, BuildOperation.id, BuildOperation.output_stage_key)
+            .filter(
+                BuildOperation.build_id == build_id,
+                BuildOperation.bom_item_id == bom_item_id,
+                BuildOperation.output_stage_key.isnot(None),
+                BuildOperation.status != STATUS_CANCELLED,
+            )
+            .order_by(BuildOperation.sequence.asc(), BuildOperation.id.asc())
+            .all()
+        )
+        cache[key] = [(seq, oid, stage) for seq, oid, stage in rows]
+    return cache[key]
+
+
+def input_stage_for_op(op: BuildOperation) -> Optional[str]:
+    prev = None
+    for seq, oid, stage in _stage_chain(op.build_id, op.bom_item_id):
+        if (seq, oid) >= (op.sequence, op.id):
+            break
+        prev = stage
+    return prev
+
+
+def post_op_progress_inventory(
+    op: BuildOperation,
+    qty_done_delta: float,
+    qty_scrap_delta: float,
+    batch: PartInventoryPostingBatch,
+) -> bool:
+    """
+    Queue the inventory movements for one progress event on `batch`.
+    Returns False when the op should post but its BOM item has no catalog part.
+    """
+    out_stage = op.output_stage_key
+    if not out_stage:
+        return True
+
+    if not (op.bom_item and op.bom_item.part_id):
+        return False
+
+    part_id = op.bom_item.part_id
+    uom = op.bom_item.unit or "ea"
+    in_stage = input_stage_for_op(op)
+    note = f"{op.op_name} (op {op.id})"
+
+    if qty_done_delta and in_stage != out_stage:
+        batch.move(part_id, in_stage, out_stage, float(qty_done_delta), uom=uom, reason="op_progress", note=note)
+
+    if qty_scrap_delta:
+        batch.post(part_id, in_stage or out_stage, -float(qty_scrap_delta), uom=uom, reason="scrap", note=note)
+
+    return True
@@ -0,0 +1,161 @@
+# File path: modules/shared/services/pdf_thumbnails.py
+# V1 - First-page PNG thumbnails for PDF drawings
+"""
+Thumbnails live next to the drawing's blob and are named by its hash:
+
+    <MERP_BLOB_DIR>/ab/cd/<sha256>.thumb<width>.png
+
+so they never go stale: new content means a new hash and a new file. Drawings
+stored before the blob store get a hash on first use (backfill_drawing_hash).
+
+Renderers, first one available wins (all optional):
+    PyMuPDF (fitz) → pypdfium2 → poppler `pdftoppm` on PATH
+With none installed, pages simply show no thumbnail.
+
+After upload, queue_thumbnail() renders on a small background thread pool so
+the request returns immediately; the thumbnail route renders on demand if the
+background job has not run (or the process restarted).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from modules.shared.services.blob_store import blob_path
+
+THUMB_WIDTH = 240
+RENDER_TIMEOUT_SECONDS = 30
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+log = logging.getLogger(__name__)
+
+
+class ThumbnailUnavailable(Exception):
+    pass
+
+
+def thumbnail_path(content_sha256: str, width: int = THUMB_WIDTH) -> str:
+    return f"{blob_path(content_sha256)}.thumb{int(width)}.png"
+
+
+# -----------------------------
+# Renderers
+# -----------------------------
+
+def _render_pymupdf(pdf_path: str, out_png: str, width: int) -> bool:
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        return False
+    with fitz.open(pdf_path) as doc:
+        if doc.page_count == 0:
+            raise ThumbnailUnavailable("PDF has no pages.")
+        page = doc.load_page(0)
+        zoom = width / max(page.rect.width, 1)
+        page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False).save(out_png)
+    return True
+
+
+def _render_pdfium(pdf_path: str, out_png: str, width: int) -> bool:
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        return False
+    doc = pdfium.PdfDocument(pdf_path)
+    try:
+        if len(doc) == 0:
+            raise ThumbnailUnavailable("PDF has no pages.")
+        page = doc[0]
+        scale = width / max(page.get_width(), 1)
+        page.render(scale=scale).to_pil().save(out_png, "PNG")
+    finally:
+        doc.close()
+    return True
+
+
+def _render_pdftoppm(pdf_path: str, out_png: str, width: int) -> bool:
+    exe = shutil.which("pdftoppm")
+    if not exe:
+        return False
+    stem = out_png[:-4] if out_png.endswith(".png") else out_png
+    subprocess.run(
+        [exe, "-png", "-f", "1", "-l", "1", "-singlefile",
+         "-scale-to-x", str(int(width)), "-scale-to-y", "-1", pdf_path, stem],
+        check=True,
+        timeout=RENDER_TIMEOUT_SECONDS,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return True
+
+
+RENDERERS = (_render_pymupdf, _render_pdfium, _render_pdftoppm)
+
+
+def render_first_page(pdf_path: str, out_png: str, width: int = THUMB_WIDTH) -> None:
+    """Render page 1 of pdf_path to out_png (atomic). Raises ThumbnailUnavailable."""
+    os.makedirs(os.path.dirname(out_png), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(suffix=".png", dir=os.path.dirname(out_png))
+    os.close(fd)
+    try:
+        for render in RENDERERS:
+            if render(pdf_path, tmp, width):
+                os.replace(tmp, out_png)
+                return
+        raise ThumbnailUnavailable("No PDF renderer installed (PyMuPDF, pypdfium2 or pdftoppm).")
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def ensure_thumbnail(pdf_path: str, out_png: str, width: int = THUMB_WIDTH) -> Optional[str]:
+    """out_png if it exists or could be rendered, else None."""
+    if os.path.exists(out_png):
+        return out_png
+    try:
+        render_first_page(pdf_path, out_png, width)
+        return out_png
+    except ThumbnailUnavailable:
+        return None
+    except Exception:
+        log.exception("thumbnail render failed", extra={"pdf_path": pdf_path})
+        return None
+
+
+def queue_thumbnail(pdf_path: str, out_png: str, width: int = THUMB_WIDTH) -> None:
+    """Render in the background (paths are absolute, so no app context is needed)."""
+    global _executor
+    if os.path.exists(out_png):
+        return
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-thumb")
+    _executor.submit(ensure_thumbnail, pdf_path, out_png, width)
+
+
+# -----------------------------
+# Drawing helpers
+# -----------------------------
+
+def backfill_drawing_hash(drawing, abs_path: str) -> Optional[str]:
+    """Hash a pre-blob drawing file in place and record it. No commit here."""
+    if drawing.content_sha256:
+        return drawing.content_sha256
+    if not os.path.exists(abs_path):
+        return None
+
+    import hashlib
+
+    h = hashlib.sha256()
+    with open(abs_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    drawing.content_sha256 = h.hexdigest()
+    drawing.size_bytes = os.path.getsize(abs_path)
+    return drawing.content_sha256
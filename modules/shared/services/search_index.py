@@ -0,0 +1,423 @@
+# File path: modules/shared/services/search_index.py
+# V2 - Global substring search (SQLite FTS5, trigram tokenizer)
+"""
+One FTS5 virtual table (`search_index`) covers every searchable entity.
+
+The trigram tokenizer makes a MATCH a case-insensitive substring match, the
+same rows the list pages' old `ILIKE '%term%'` returned ('001' finds
+BL-0012 and KN-1001). Trigrams need at least MIN_MATCH_CHARS characters;
+shorter terms fall back to LIKE (global search) or the ILIKE scan over the
+page's own columns (apply_search_filter). Trigram needs SQLite 3.34+; on
+older builds the index is not created and everything uses ILIKE.
+
+Row identity is packed into the FTS rowid:
+    rowid = (entity slot << 32) | entity_id
+so updates/deletes hit the rowid b-tree directly and a per-type filter is a
+rowid range scan instead of a full table scan.
+
+List pages filter with a subquery on the index (no id list, no cap), so they
+keep their own ordering and return every matching row.
+
+Columns (bm25 weights in SEARCH_WEIGHTS):
+    code  - part number / item code / job number
+    title - display name
+    body  - secondary text (vendor, grade, notes...)
+
+The index is kept in sync from the ORM via a Session `after_flush` hook.
+Callers never write to it directly.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, literal_column, or_, select, table, text
+from sqlalchemy.orm import Session
+
+from database.models import (
+    db,
+    Part,
+    RawStock,
+    BulkHardware,
+    WaterjetConsumable,
+    Customer,
+    Job,
+    WorkOrder,
+)
+
+
+SEARCH_TABLE = "search_index"
+
+# bm25 weights: code, title, body
+SEARCH_WEIGHTS = (10.0, 5.0, 1.0)
+
+# Trigram tokenizer: shorter terms cannot use the index
+MIN_MATCH_CHARS = 3
+TRIGRAM_MIN_SQLITE = (3, 34, 0)
+
+# entity_type -> rowid slot (never renumber; stored in the index)
+ENTITY_SLOTS = {
+    "part": 1,
+    "raw_stock": 2,
+    "bulk_hardware": 3,
+    "waterjet_consumable": 4,
+    "customer": 5,
+    "job": 6,
+    "work_order": 7,
+}
+SLOT_TYPES = {v: k for k, v in ENTITY_SLOTS.items()}
+
+DISPLAY_TYPE = {
+    "part": "Part",
+    "raw_stock": "Raw Stock",
+    "bulk_hardware": "Bulk Hardware",
+    "waterjet_consumable": "Waterjet Consumable",
+    "customer": "Customer",
+    "job": "Job",
+    "work_order": "Work Order",
+}
+
+_ID_BITS = 32
+_ID_MASK = (1 << _ID_BITS) - 1
+
+
+def _join(*vals) -> str:
+    return " ".join(str(v) for v in vals if v not in (None, ""))
+
+
+def _part_doc(p: Part):
+    return p.part_number, p.name, p.description
+
+
+def _raw_stock_doc(r: RawStock):
+    return (
+        f"RS-{r.id:06d}",
+        r.name,
+        _join(r.material_type, r.grade, r.form, r.vendor, r.location),
+    )
+
+
+def _bulk_doc(b: BulkHardware):
+    return b.item_code, b.name, _join(b.description, b.vendor, b.vendor_sku)
+
+
+def _consumable_doc(c: WaterjetConsumable):
+    return c.part_number, c.name, _join(c.category, c.vendor, c.location)
+
+
+def _customer_doc(c: Customer):
+    return None, c.name, _join(c.email, c.phone, c.notes)
+
+
+def _job_doc(j: Job):
+    return j.job_number, j.title, j.notes
+
+
+def _work_order_doc(w: WorkOrder):
+    return w.wo_number, w.title, w.notes
+
+
+# model class -> (entity_type, doc builder)
+INDEXED_MODELS = {
+    Part: ("part", _part_doc),
+    RawStock: ("raw_stock", _raw_stock_doc),
+    BulkHardware: ("bulk_hardware", _bulk_doc),
+    WaterjetConsumable: ("waterjet_consumable", _consumable_doc),
+    Customer: ("customer", _customer_doc),
+    Job: ("job", _job_doc),
+    WorkOrder: ("work_order", _work_order_doc),
+}
+
+
+def _sp(*cols) -> str:
+    # SQL twin of _join(): space-joined, NULL-safe
+    return "trim(" + " || ' ' || ".join(f"coalesce({c}, '')" for c in cols) + ")"
+
+
+# Bulk rebuild SQL (mirrors the doc builders above); columns: id, code, title, body
+REBUILD_SELECTS = {
+    "part": "SELECT id, part_number AS code, name AS title, description AS body FROM parts",
+    "raw_stock": (
+        "SELECT id, printf('RS-%06d', id) AS code, name AS title, "
+        f"{_sp('material_type', 'grade', 'form', 'vendor', 'location')} AS body FROM raw_stock"
+    ),
+    "bulk_hardware": (
+        "SELECT id, item_code AS code, name AS title, "
+        f"{_sp('description', 'vendor', 'vendor_sku')} AS body FROM bulk_hardware"
+    ),
+    "waterjet_consumable": (
+        "SELECT id, part_number AS code, name AS title, "
+        f"{_sp('category', 'vendor', 'location')} AS body FROM waterjet_consumables"
+    ),
+    "customer": (
+        "SELECT id, NULL AS code, name AS title, "
+        f"{_sp('email', 'phone', 'notes')} AS body FROM customers"
+    ),
+    "job": "SELECT id, job_number AS code, title, notes AS body FROM jobs",
+    "work_order": "SELECT id, wo_number AS code, title, notes AS body FROM work_orders",
+}
+
+
+def make_rowid(entity_type: str, entity_id: int) -> int:
+    return (ENTITY_SLOTS[entity_type] << _ID_BITS) | int(entity_id)
+
+
+def split_rowid(rowid: int):
+    return SLOT_TYPES.get(rowid >> _ID_BITS), rowid & _ID_MASK
+
+
+# -----------------------------
+# Availability / DDL
+# -----------------------------
+
+_available_by_engine: Dict[int, bool] = {}
+
+
+def _table_exists(conn) -> bool:
+    row = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:n"),
+        {"n": SEARCH_TABLE},
+    ).first()
+    return row is not None
+
+
+def _trigram_supported(conn) -> bool:
+    version = conn.execute(text("SELECT sqlite_version()")).scalar() or "0"
+    return tuple(int(x) for x in version.split(".")[:3]) >= TRIGRAM_MIN_SQLITE
+
+
+def search_available(conn=None) -> bool:
+    """
+    True when the FTS index exists on the current engine.
+    Cached per engine; ensure_search_index() refreshes the cache.
+    """
+    conn = conn if conn is not None else db.session.connection()
+    key = id(conn.engine)
+    if key not in _available_by_engine:
+        _available_by_engine[key] = conn.dialect.name == "sqlite" and _table_exists(conn)
+    return _available_by_engine[key]
+
+
+def ensure_search_index(conn=None) -> bool:
+    """
+    Create the FTS5 table if missing. Returns False on non-SQLite backends
+    and SQLite builds without the trigram tokenizer. No commit here.
+    """
+    conn = conn if conn is not None else db.session.connection()
+    if conn.dialect.name != "sqlite" or not _trigram_supported(conn):
+        return False
+
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        "code, title, body, "
+        "tokenize = 'trigram'"
+        ")"
+    ))
+    _available_by_engine[id(conn.engine)] = True
+    return True
+
+
+def rebuild_search_index(conn=None) -> Dict[str, int]:
+    """
+    Recreate the index and fill it from the source tables with one
+    INSERT ... SELECT per entity type. Returns {entity_type: rows_indexed}.
+    No commit here.
+    """
+    conn = conn if conn is not None else db.session.connection()
+    if conn.dialect.name != "sqlite" or not _trigram_supported(conn):
+        return {}
+
+    # Recreated rather than emptied, so an index built with an older
+    # tokenizer definition is replaced too
+    conn.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+    ensure_search_index(conn)
+
+    counts = {}
+    for entity_type, select_sql in REBUILD_SELECTS.items():
+        base = ENTITY_SLOTS[entity_type] << _ID_BITS
+        res = conn.execute(text(
+            f"INSERT INTO {SEARCH_TABLE}(rowid, code, title, body) "
+            f"SELECT {base} + s.id, s.code, s.title, s.body FROM ({select_sql}) AS s"
+        ))
+        counts[entity_type] = int(res.rowcount or 0)
+
+    conn.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"))
+    return counts
+
+
+# -----------------------------
+# ORM sync (after_flush)
+# -----------------------------
+
+@event.listens_for(Session, "after_flush")
+def _sync_search_index(session, flush_context):
+    upserts = {}
+    deletes = set()
+
+    for obj in session.new:
+        spec = INDEXED_MODELS.get(type(obj))
+        if spec:
+            upserts[make_rowid(spec[0], obj.id)] = spec[1](obj)
+
+    for obj in session.dirty:
+        spec = INDEXED_MODELS.get(type(obj))
+        if spec and session.is_modified(obj, include_collections=False):
+            upserts[make_rowid(spec[0], obj.id)] = spec[1](obj)
+
+    for obj in session.deleted:
+        spec = INDEXED_MODELS.get(type(obj))
+        if spec and obj.id is not None:
+            deletes.add(make_rowid(spec[0], obj.id))
+
+    if not upserts and not deletes:
+        return
+
+    conn = session.connection()
+    if not search_available(conn):
+        return
+
+    stale = [{"rid": rid} for rid in set(upserts) | deletes]
+    conn.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :rid"), stale)
+
+    if upserts:
+        conn.execute(
+            text(f"INSERT INTO {SEARCH_TABLE}(rowid, code, title, body) VALUES (:rid, :code, :title, :body)"),
+            [
+                {"rid": rid, "code": code, "title": title, "body": body}
+                for rid, (code, title, body) in upserts.items()
+            ],
+        )
+
+
+# -----------------------------
+# Query side
+# -----------------------------
+
+def build_match_query(term: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression: the whole term as one
+    quoted phrase (no operator injection), which the trigram tokenizer
+    matches as a substring, so "BL-00" and "001" both match BL-0012.
+    None when the term is too short for trigrams.
+    """
+    term = (term or "").strip()
+    if len(term) < MIN_MATCH_CHARS:
+        return None
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _rowid_ranges(entity_types: List[str], params: dict) -> Optional[str]:
+    ranges = []
+    for i, et in enumerate(t for t in entity_types if t in ENTITY_SLOTS):
+        slot = ENTITY_SLOTS[et]
+        params[f"lo{i}"] = slot << _ID_BITS
+        params[f"hi{i}"] = ((slot + 1) << _ID_BITS) - 1
+        ranges.append(f"rowid BETWEEN :lo{i} AND :hi{i}")
+    return "(" + " OR ".join(ranges) + ")" if ranges else None
+
+
+def search(
+    term: str,
+    entity_types: Optional[List[str]] = None,
+    limit: int = 50,
+) -> List[Dict[str, object]]:
+    """
+    Ranked global search.
+    Returns [{entity_type, entity_id, code, title, snippet, rank}] best-first.
+    Returns [] when the index is unavailable or the term is empty.
+    Terms shorter than MIN_MATCH_CHARS scan the index with LIKE and come back
+    in code order (bm25/snippet need a MATCH).
+    """
+    term = (term or "").strip()
+    if not term or not search_available():
+        return []
+
+    match = build_match_query(term)
+    params = {"limit": int(limit)}
+    if match:
+        params["match"] = match
+        where = [f"{SEARCH_TABLE} MATCH :match"]
+    else:
+        params["like"] = f"%{term}%"
+        where = ["(code LIKE :like OR title LIKE :like OR body LIKE :like)"]
+
+    if entity_types:
+        ranges = _rowid_ranges(entity_types, params)
+        if not ranges:
+            return []
+        where.append(ranges)
+
+    if match:
+        w_code, w_title, w_body = SEARCH_WEIGHTS
+        cols = (
+            f"snippet({SEARCH_TABLE}, 2, '[', ']', '…', 12), "
+            f"bm25({SEARCH_TABLE}, {w_code}, {w_title}, {w_body}) AS rank"
+        )
+        order = "rank"
+    else:
+        cols = "substr(body, 1, 80), 0.0 AS rank"
+        order = "code, title"
+
+    rows = db.session.execute(
+        text(
+            f"SELECT rowid, code, title, {cols} "
+            f"FROM {SEARCH_TABLE} WHERE {' AND '.join(where)} "
+            f"ORDER BY {order} LIMIT :limit"
+        ),
+        params,
+    ).all()
+
+    out = []
+    for rowid, code, title, snippet, rank in rows:
+        entity_type, entity_id = split_rowid(int(rowid))
+        out.append({
+            "entity_type": entity_type,
+            "entity_label": DISPLAY_TYPE.get(entity_type, entity_type),
+            "entity_id": entity_id,
+            "code": code,
+            "title": title,
+            "snippet": snippet,
+            "rank": float(rank),
+        })
+    return out
+
+
+def search_id_subquery(entity_type: str, term: str):
+    """
+    SELECT of entity ids matching `term` for one entity type, for use in
+    `id_column.in_(...)`. Unranked and uncapped.
+    Returns None when the index cannot serve the term (unavailable, or the
+    term is shorter than MIN_MATCH_CHARS) so callers can fall back.
+    """
+    match = build_match_query(term)
+    if match is None or not search_available():
+        return None
+
+    slot = ENTITY_SLOTS[entity_type]
+    rowid = literal_column("rowid")
+    return (
+        select(rowid.op("&")(_ID_MASK))
+        .select_from(table(SEARCH_TABLE))
+        .where(text(f"{SEARCH_TABLE} MATCH :search_match").bindparams(search_match=match))
+        .where(rowid.between(slot << _ID_BITS, ((slot + 1) << _ID_BITS) - 1))
+    )
+
+
+def apply_search_filter(q, entity_type: str, id_column, term: str, fallback_columns):
+    """
+    Narrow an existing list query to rows matching `term` (substring, like
+    the ILIKE it replaces). Uses the FTS index when it can; otherwise the
+    ILIKE scan over `fallback_columns` (non-SQLite backends, index not built,
+    terms under MIN_MATCH_CHARS). The index also covers each entity's
+    secondary text (see the *_doc builders), so it can match a few more rows.
+    """
+    term = (term or "").strip()
+    if not term:
+        return q
+
+    ids = search_id_subquery(entity_type, term)
+    if ids is None:
+        like = f"%{term}%"
+        return q.filter(or_(*[c.ilike(like) for c in fallback_columns]))
+
+    return q.filter(id_column.in_(ids))
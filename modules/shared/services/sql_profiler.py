@@ -0,0 +1,254 @@
+# File path: modules/shared/services/sql_profiler.py
+# V1 - Per-request SQL profiling with N+1 detection
+"""
+Engine cursor events time every statement; the Flask request hooks attach the
+totals to the request that issued them.
+
+Every request (cheap, always on):
+    g.merp_sql.count / g.merp_sql.ms   → query count and SQL time
+
+Sampled requests (MERP_SQL_PROFILE_SAMPLE, 0..1):
+    statements are fingerprinted (literals and IN-lists collapsed) and kept
+    per request; any fingerprint run >= MERP_SQL_PROFILE_N1_THRESHOLD times
+    is an N+1 candidate (the same lookup issued per row). Finished profiles
+    go into a ring buffer (MERP_SQL_PROFILE_RING) and a per-endpoint rollup,
+    shown on /admin/sql-profile.
+
+X-SQL-Profile response header (queries, SQL ms, N+1 candidates) in debug,
+or always with MERP_SQL_PROFILE_HEADER.
+
+State is per process; with several workers each keeps its own buffer.
+No DB writes here.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+SLOWEST_KEPT = 5
+STATEMENT_MAX_CHARS = 600
+
+_RE_WS = re.compile(r"\s+")
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:\?|%s|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Statement shape: whitespace, literals and IN (...) lists normalised."""
+    s = _RE_WS.sub(" ", statement).strip()
+    s = _RE_STRING.sub("?", s)
+    s = _RE_NUMBER.sub("?", s)
+    s = _RE_IN_LIST.sub("IN (…)", s)
+    return s[:STATEMENT_MAX_CHARS]
+
+
+@dataclass
+class StatementStats:
+    count: int = 0
+    ms: float = 0.0
+
+
+@dataclass
+class RequestSql:
+    """Per-request accumulator (lives on flask.g)."""
+    sampled: bool
+    count: int = 0
+    ms: float = 0.0
+    statements: Dict[str, StatementStats] = field(default_factory=dict)
+    slowest: List[Tuple[float, str]] = field(default_factory=list)
+
+    def add(self, statement: str, ms: float) -> None:
+        self.count += 1
+        self.ms += ms
+        if not self.sampled:
+            return
+        fp = fingerprint(statement)
+        st = self.statements.get(fp)
+        if st is None:
+            st = self.statements[fp] = StatementStats()
+        st.count += 1
+        st.ms += ms
+        if len(self.slowest) < SLOWEST_KEPT or ms > self.slowest[-1][0]:
+            self.slowest.append((ms, fp))
+            self.slowest.sort(key=lambda x: -x[0])
+            del self.slowest[SLOWEST_KEPT:]
+
+
+@dataclass
+class RequestProfile:
+    endpoint: str
+    method: str
+    path: str
+    status: int
+    at: float
+    total_ms: float
+    query_count: int
+    sql_ms: float
+    slowest: List[Tuple[float, str]]
+    repeated: List[Tuple[str, int, float]]   # (fingerprint, count, ms) at/above the N+1 threshold
+
+    @property
+    def n_plus_one(self) -> bool:
+        return bool(self.repeated)
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    queries: int = 0
+    sql_ms: float = 0.0
+    total_ms: float = 0.0
+    max_queries: int = 0
+    n_plus_one_requests: int = 0
+    fingerprints: Dict[str, int] = field(default_factory=dict)  # N+1 fingerprint → max count seen
+
+    @property
+    def avg_queries(self) -> float:
+        return self.queries / self.requests if self.requests else 0.0
+
+    @property
+    def avg_sql_ms(self) -> float:
+        return self.sql_ms / self.requests if self.requests else 0.0
+
+    @property
+    def avg_total_ms(self) -> float:
+        return self.total_ms / self.requests if self.requests else 0.0
+
+
+class ProfileStore:
+    def __init__(self, size: int):
+        self._lock = threading.Lock()
+        self.recent: deque = deque(maxlen=size)
+        self.endpoints: Dict[str, EndpointStats] = {}
+
+    def add(self, prof: RequestProfile) -> None:
+        with self._lock:
+            self.recent.append(prof)
+            st = self.endpoints.get(prof.endpoint)
+            if st is None:
+                st = self.endpoints[prof.endpoint] = EndpointStats()
+            st.requests += 1
+            st.queries += prof.query_count
+            st.sql_ms += prof.sql_ms
+            st.total_ms += prof.total_ms
+            st.max_queries = max(st.max_queries, prof.query_count)
+            if prof.n_plus_one:
+                st.n_plus_one_requests += 1
+                for fp, count, _ in prof.repeated:
+                    st.fingerprints[fp] = max(st.fingerprints.get(fp, 0), count)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.recent)[::-1], dict(self.endpoints)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.recent.clear()
+            self.endpoints.clear()
+
+
+_store: Optional[ProfileStore] = None
+
+
+def profile_store() -> Optional[ProfileStore]:
+    return _store
+
+
+def current_request_sql() -> Optional[RequestSql]:
+    """This request's accumulator (None outside a request or when profiling is off)."""
+    if not has_request_context():
+        return None
+    return g.get("merp_sql")
+
+
+# -----------------------------
+# Wiring
+# -----------------------------
+
+def init_sql_profiler(app, db) -> None:
+    global _store
+
+    if not app.config.get("MERP_SQL_PROFILE", True):
+        return
+
+    sample = float(app.config.get("MERP_SQL_PROFILE_SAMPLE", 1.0))
+    threshold = int(app.config.get("MERP_SQL_PROFILE_N1_THRESHOLD", 5))
+    _store = ProfileStore(int(app.config.get("MERP_SQL_PROFILE_RING", 200)))
+    store = _store
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("merp_sql_t0", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("merp_sql_t0")
+        if not stack:
+            return
+        ms = (time.perf_counter() - stack.pop()) * 1000.0
+        acc = current_request_sql()
+        if acc is not None:
+            acc.add(statement, ms)
+
+    @app.before_request
+    def _start_sql_profile():
+        g.merp_sql = RequestSql(sampled=sample >= 1.0 or random.random() < sample)
+        g.merp_sql_t0 = time.perf_counter()
+
+    def _finish(status: int):
+        acc = g.get("merp_sql")
+        if acc is None or g.get("merp_sql_recorded"):
+            return acc, None
+        g.merp_sql_recorded = True
+        if not acc.sampled:
+            return acc, None
+
+        t0 = g.get("merp_sql_t0")
+        repeated = sorted(
+            ((fp, st.count, st.ms) for fp, st in acc.statements.items() if st.count >= threshold),
+            key=lambda r: -r[1],
+        )
+        prof = RequestProfile(
+            endpoint=request.endpoint or "(unmatched)",
+            method=request.method,
+            path=request.full_path.rstrip("?"),
+            status=status,
+            at=time.time(),
+            total_ms=(time.perf_counter() - t0) * 1000.0 if t0 else 0.0,
+            query_count=acc.count,
+            sql_ms=acc.ms,
+            slowest=list(acc.slowest),
+            repeated=repeated,
+        )
+        store.add(prof)
+        return acc, prof
+
+    @app.after_request
+    def _record_sql_profile(response):
+        acc, prof = _finish(response.status_code)
+        if acc is not None and (app.debug or app.config.get("MERP_SQL_PROFILE_HEADER")):
+            value = f"queries={acc.count}; sql_ms={acc.ms:.1f}"
+            if prof is not None and prof.repeated:
+                value += f"; n_plus_one={len(prof.repeated)}"
+            response.headers["X-SQL-Profile"] = value
+        return response
+
+    @app.teardown_request
+    def _record_failed_sql_profile(exc):
+        # after_request does not run for unhandled exceptions
+        _finish(500)
@@ -0,0 +1,177 @@
+# File path: modules/shared/services/startup.py
+# V1 - CLI-aware blueprint loading + startup timing tools
+"""
+Most `flask` commands (db upgrade, create-admin, cad-worker, ...) never
+serve a page. create_app therefore skips importing and registering the
+route blueprints when wants_routes() says the running command does not need
+them. Only run, routes, shell and bench (and bare `flask` / --help) do.
+Flask-Migrate (which imports alembic) is likewise only set up under the CLI.
+
+Heavy optional subsystems stay behind function-level imports:
+modules.assembly.parser (OCC, numpy) is only imported by the CAD worker and
+the cad-cache commands, never by create_app.
+
+`flask startup importtime` digests `python -X importtime` for a fresh
+create_app. `flask startup check` times fresh create_app runs against
+MERP_STARTUP_BUDGET_MS and exits non-zero when over budget (usable in CI).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import click
+
+# Commands that need the URL map (everything else runs without blueprints);
+# bench requests the module pages through the test client
+ROUTE_COMMANDS = {"", "run", "routes", "shell", "bench"}
+
+# Modules that must not be imported by create_app
+FORBIDDEN_AT_STARTUP = ("OCC", "numpy", "modules.assembly.parser")
+
+
+def cli_command_name() -> Optional[str]:
+    """Top-level `flask` subcommand being run; "" for bare `flask`; None outside the CLI."""
+    ctx = click.get_current_context(silent=True)
+    if ctx is None:
+        return None
+
+    chain = []
+    while ctx.parent is not None:
+        chain.append(ctx)
+        ctx = ctx.parent
+    if chain:
+        # Built-in / plugin commands load the app from inside their own context
+        return chain[-1].info_name or ""
+
+    # App commands are looked up (and the app loaded) from the root context,
+    # after click has already consumed its pending args: read them from argv
+    return _argv_command(ctx.command, sys.argv[1:])
+
+
+def _argv_command(group, argv: List[str]) -> str:
+    """First positional token of argv, skipping the group's own options and their values."""
+    takes_value = set()
+    for param in getattr(group, "params", []):
+        if isinstance(param, click.Option) and not param.is_flag and not param.count:
+            takes_value.update(param.opts)
+
+    skip = False
+    for token in argv:
+        if skip:
+            skip = False
+            continue
+        if token == "--":
+            continue
+        if token.startswith("-"):
+            skip = "=" not in token and token in takes_value
+            continue
+        return token
+    return ""
+
+
+def in_cli() -> bool:
+    return cli_command_name() is not None
+
+
+def wants_routes() -> bool:
+    name = cli_command_name()
+    return name is None or name in ROUTE_COMMANDS
+
+
+# -----------------------------
+# Timing tools (run in a fresh interpreter)
+# -----------------------------
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+a = app.create_app(load_blueprints={load})
+t2 = time.perf_counter()
+forbidden = sorted(m for m in sys.modules if any(m == f or m.startswith(f + ".") for f in {forbidden!r}))
+print(json.dumps({{"import_ms": (t1 - t0) * 1000, "create_ms": (t2 - t1) * 1000,
+                  "rules": len(list(a.url_map.iter_rules())), "forbidden": forbidden}}))
+"""
+
+
+@dataclass
+class StartupRun:
+    import_ms: float
+    create_ms: float
+    rules: int
+    forbidden: List[str]
+
+    @property
+    def total_ms(self) -> float:
+        return self.import_ms + self.create_ms
+
+
+def _probe_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.pop("FLASK_RUN_FROM_CLI", None)
+    env.setdefault("MERP_LOG_CONSOLE_LEVEL", "WARNING")
+    return env
+
+
+def measure_startup(root: str, *, load_blueprints: bool = True) -> StartupRun:
+    code = _PROBE.format(load=bool(load_blueprints), forbidden=FORBIDDEN_AT_STARTUP)
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=root,
+        env=_probe_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    data = json.loads(out.stdout.strip().splitlines()[-1])
+    return StartupRun(**data)
+
+
+def median_run(runs: List[StartupRun]) -> StartupRun:
+    return sorted(runs, key=lambda r: r.total_ms)[len(runs) // 2]
+
+
+@dataclass
+class ImportRow:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def run_importtime(root: str, *, load_blueprints: bool = True) -> List[ImportRow]:
+    """Parse `-X importtime` output for `import app; create_app()`."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         f"import app; app.create_app(load_blueprints={bool(load_blueprints)})"],
+        cwd=root,
+        env=_probe_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cum_us, name = [p.strip() for p in line[len("import time:"):].split("|")]
+            rows.append(ImportRow(name, int(self_us), int(cum_us)))
+        except ValueError:
+            continue  # header line
+    return rows
+
+
+def digest_by_package(rows: List[ImportRow], depth: int = 1) -> Dict[str, int]:
+    """Self time (µs) summed per top-level package (or first `depth` dotted parts)."""
+    totals: Dict[str, int] = {}
+    for r in rows:
+        key = ".".join(r.module.split(".")[:depth])
+        totals[key] = totals.get(key, 0) + r.self_us
+    return dict(sorted(totals.items(), key=lambda kv: -kv[1]))
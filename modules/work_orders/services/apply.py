@@ -8,6 +8,7 @@ from database.models import db, Job, Build, BOMItem, WorkOrder, BOMHeader, Part
 # Update these imports if your routing functions live elsewhere
 from modules.jobs_management.services.routing import ensure_operations_for_bom_item, enforce_release_state_for_bom_item
 from modules.inventory.services.bom_explode import explode_bom_header_to_build
+from modules.inventory.services.reservation_service import reserve_for_build
 
 def generate_ops_for_bom_item(bom: BOMItem):
     ensure_operations_for_bom_item(bom)
@@ -167,5 +168,7 @@ def apply_work_order_to_new_build(wo_id: int) -> Build:
             assembly_qty=requested_qty,
         )
 
+    # Hold on-hand stock for the new BOM snapshot (stock-first; remainder stays make/buy)
+    reserve_for_build(build.id, work_order_id=wo.id)
 
     return build
@@ -1,4 +1,6 @@
 # File path: modules/work_orders/services/planning.py
+from sqlalchemy.orm import selectinload
+
 from database.models import (
     db,
     PartInventory,
@@ -9,10 +11,56 @@ from database.models import (
     PartType,
 )
 from database.models import Part
-
-OPEN_WO_STATUSES = ("open", "in_progress")
-
-
+from modules.inventory.services.planning import (
+    OPEN_WO_STATUSES,
+    FG_AVAILABLE,
+    SUB_ASSY_AVAILABLE,
+    COMP_AVAILABLE,
+    COMP_EXPECTED,
+)
+from modules.inventory.services.reservation_service import (
+    get_atp_map,
+    get_reserved_map,
+    get_work_order_holds,
+)
+from modules.shared.services.metrics import timed
+
+
+def _load_active_boms(part_ids, rev="A", max_depth=6):
+    """
+    {assembly part_id: active BOMHeader} for part_ids and every sub-assembly
+    below them, lines / components / part types loaded. One round of queries
+    per BOM level instead of one lookup per exploded part.
+    """
+    boms = {}
+    seen = set()
+    frontier = set(part_ids)
+    for _ in range(max_depth):
+        frontier -= seen
+        if not frontier:
+            break
+        seen |= frontier
+
+        rows = (
+            BOMHeader.query
+            .filter(BOMHeader.assembly_part_id.in_(frontier))
+            .filter_by(rev=rev, is_active=True)
+            .options(
+                selectinload(BOMHeader.lines)
+                .selectinload(BOMLine.component_part)
+                .selectinload(Part.part_type)
+            )
+            .order_by(BOMHeader.id.asc())
+            .all()
+        )
+        frontier = set()
+        for bom in rows:
+            boms.setdefault(bom.assembly_part_id, bom)
+            frontier.update(line.component_part_id for line in bom.lines)
+    return boms
+
+
+@timed("merp_planning_run_seconds")
 def plan_global_netting(rev="A", max_depth=6):
     from collections import defaultdict
 
@@ -23,14 +71,14 @@ def plan_global_netting(rev="A", max_depth=6):
     # Track current recursion path (part_id) to detect cycles
     path = set()
 
-    def explode_part(part_id, qty, depth):
+    def explode_part(part_id, qty, depth, wo_id):
         if depth > max_depth:
             raise RuntimeError("BOM recursion depth exceeded (check for deep nesting)")
 
         if part_id in path:
             raise RuntimeError("BOM cycle detected (a sub-assembly references itself)")
 
-        bom = _get_active_bom(part_id, rev=rev)
+        bom = boms.get(part_id)
         if not bom:
             # If no BOM exists, treat it as a leaf component demand
             comp_demand[part_id] += qty
@@ -52,13 +100,12 @@ def plan_global_netting(rev="A", max_depth=6):
 
             elif cat == "sub_assembly":
                 # Stock-first for sub assemblies:
-                have = _sum_inventory(child.id, SUB_ASSY_AVAILABLE, rev=rev)
-                remaining = max(0.0, child_qty - have)
+                remaining = child_qty - _take(child.id, child_qty, SUB_ASSY_AVAILABLE, wo_id)
 
                 sub_assy_demand[child.id] += child_qty
 
                 if remaining > 0:
-                    explode_part(child.id, remaining, depth + 1)
+                    explode_part(child.id, remaining, depth + 1, wo_id)
 
             else:
                 # Defensive: unknown categories count as component demand
@@ -66,8 +113,65 @@ def plan_global_netting(rev="A", max_depth=6):
 
         path.remove(part_id)
 
-    # --- Gather open work orders ---
-    work_orders = WorkOrder.query.filter(WorkOrder.status.in_(OPEN_WO_STATUSES)).all()
+    # --- Gather open work orders (oldest first: earlier WOs get free stock first) ---
+    work_orders = (
+        WorkOrder.query
+        .filter(WorkOrder.status.in_(OPEN_WO_STATUSES))
+        .order_by(WorkOrder.id.asc())
+        .options(
+            selectinload(WorkOrder.lines)
+            .selectinload(WorkOrderLine.part)
+            .selectinload(Part.part_type)
+        )
+        .all()
+    )
+    open_wo_ids = [wo.id for wo in work_orders]
+
+    # --- Availability for every part this run can touch, looked up from dicts ---
+    line_part_ids = {line.part_id for wo in work_orders for line in wo.lines}
+    boms = _load_active_boms(line_part_ids, rev=rev, max_depth=max_depth)
+    part_ids = line_part_ids | {line.component_part_id for bom in boms.values() for line in bom.lines}
+
+    atp = {bucket: v["atp"] for bucket, v in get_atp_map(part_ids).items()}
+    held = get_reserved_map(part_ids, work_order_ids=open_wo_ids)
+    # Drawn down as lines are netted, so no two lines count the same stock
+    free = {bucket: max(0.0, qty) for bucket, qty in atp.items()}
+    holds = get_work_order_holds(part_ids, open_wo_ids)
+    labels = {
+        p.id: {"part_number": p.part_number, "name": p.name}
+        for p in Part.query.filter(Part.id.in_(part_ids)).all()
+    } if part_ids else {}
+
+    def _bucket_sum(qty_map, part_id, stage_keys, config_key=None):
+        return sum(qty_map.get((part_id, sk, rev, config_key), 0.0) for sk in stage_keys)
+
+    def _available(part_id, stage_keys, config_key=None):
+        # ATP: on-hand net of every active reservation
+        return _bucket_sum(atp, part_id, stage_keys, config_key)
+
+    def _held(part_id, stage_keys, config_key=None):
+        # Stock already reserved by builds applied from these open WOs
+        return _bucket_sum(held, part_id, stage_keys, config_key)
+
+    def _take(part_id, qty, stage_keys, wo_id, config_key=None):
+        # Cover qty from this WO's own holds, then from the free ATP left;
+        # returns the qty covered and uses it up
+        covered = 0.0
+        for pool in (holds.get(wo_id, {}), free):
+            for sk in stage_keys:
+                if covered >= qty:
+                    return covered
+                key = (part_id, sk, rev, config_key)
+                left = pool.get(key, 0.0)
+                if left <= 0:
+                    continue
+                use = min(left, qty - covered)
+                pool[key] = left - use
+                covered += use
+        return covered
+
+    def _part_label(part_id):
+        return labels.get(part_id, {"part_number": None, "name": None})
 
     for wo in work_orders:
         for line in wo.lines:
@@ -85,22 +189,20 @@ def plan_global_netting(rev="A", max_depth=6):
             cfg = line.config_key
 
             if cat == "assembly":
-                have = _sum_inventory(part.id, FG_AVAILABLE, rev=rev, config_key=cfg)
-                remaining = max(0.0, qty - have)
+                remaining = qty - _take(part.id, qty, FG_AVAILABLE, wo.id, config_key=cfg)
 
                 fg_demand[(part.id, cfg)] += qty
 
                 if remaining > 0:
-                    explode_part(part.id, remaining, depth=1)
+                    explode_part(part.id, remaining, depth=1, wo_id=wo.id)
 
             elif cat == "sub_assembly":
-                have = _sum_inventory(part.id, SUB_ASSY_AVAILABLE, rev=rev)
-                remaining = max(0.0, qty - have)
+                remaining = qty - _take(part.id, qty, SUB_ASSY_AVAILABLE, wo.id)
 
                 sub_assy_demand[part.id] += qty
 
                 if remaining > 0:
-                    explode_part(part.id, remaining, depth=1)
+                    explode_part(part.id, remaining, depth=1, wo_id=wo.id)
 
             else:
                 comp_demand[part.id] += qty
@@ -108,8 +210,11 @@ def plan_global_netting(rev="A", max_depth=6):
     # --- Net components ---
     component_results = []
     for part_id, demand in comp_demand.items():
-        available = _sum_inventory(part_id, COMP_AVAILABLE, rev=rev)
-        expected = _sum_inventory(part_id, COMP_EXPECTED, rev=rev)
+        # available = ATP (on-hand net of every active reservation);
+        # allocated = the part of that reservation held for open WO demand
+        available = _available(part_id, COMP_AVAILABLE)
+        allocated = _held(part_id, COMP_AVAILABLE)
+        expected = _available(part_id, COMP_EXPECTED)
         
         label = _part_label(part_id)
         
@@ -118,9 +223,10 @@ def plan_global_netting(rev="A", max_depth=6):
             ** label,
             "demand": demand,
             "available": available,
+            "allocated": allocated,
             "expected": expected,
-            "shortage_now": max(0.0, demand - available),
-            "shortage_after_expected": max(0.0, demand - (available + expected)),
+            "shortage_now": max(0.0, demand - allocated - available),
+            "shortage_after_expected": max(0.0, demand - allocated - (available + expected)),
         })
 
     component_results.sort(key=lambda r: r["part_id"])
@@ -134,7 +240,8 @@ def plan_global_netting(rev="A", max_depth=6):
             **label,
             "config_key": cfg,
             "demand": qty,
-            "available": _sum_inventory(pid, FG_AVAILABLE, rev=rev, config_key=cfg),
+            "available": _available(pid, FG_AVAILABLE, config_key=cfg),
+            "allocated": _held(pid, FG_AVAILABLE, config_key=cfg),
         })
 
     finished_goods.sort(key=lambda r: (r["part_id"], r["config_key"] or ""))
@@ -147,7 +254,8 @@ def plan_global_netting(rev="A", max_depth=6):
             "part_id": pid,
             **label,
             "demand": qty,
-            "available": _sum_inventory(pid, SUB_ASSY_AVAILABLE, rev=rev),
+            "available": _available(pid, SUB_ASSY_AVAILABLE),
+            "allocated": _held(pid, SUB_ASSY_AVAILABLE),
         })
 
     sub_assemblies.sort(key=lambda r: r["part_id"])
@@ -0,0 +1,52 @@
+# File path: routes/search.py
+# V1 - Global search (FTS5 index, see modules/shared/services/search_index.py)
+
+from flask import Blueprint, render_template, request, url_for
+from modules.user.decorators import login_required
+from modules.shared.services.search_index import search, search_available, ENTITY_SLOTS
+
+search_bp = Blueprint("search_bp", __name__, url_prefix="/search")
+
+
+# entity_type -> (endpoint, id kwarg) for result links
+RESULT_LINKS = {
+    "part": ("inventory_bp.parts_edit", "part_id"),
+    "raw_stock": ("inventory_bp.raw_stock_details", "item_id"),
+    "bulk_hardware": ("inventory_bp.bulk_edit", "item_id"),
+    "waterjet_consumable": ("raw_mats_waterjet_bp.waterjet_manager_edit", "item_id"),
+    "customer": ("work_orders_bp.customers_detail", "customer_id"),
+    "job": ("jobs_bp.job_detail", "job_id"),
+    "work_order": ("work_orders_bp.wo_detail", "wo_id"),
+}
+
+
+def _run_search():
+    term = (request.args.get("q") or "").strip()
+    types = [t for t in request.args.getlist("type") if t in ENTITY_SLOTS] or None
+    limit = min(request.args.get("limit", type=int) or 50, 200)
+
+    results = search(term, entity_types=types, limit=limit) if term else []
+    for r in results:
+        endpoint, kw = RESULT_LINKS[r["entity_type"]]
+        r["url"] = url_for(endpoint, **{kw: r["entity_id"]})
+    return term, types, results
+
+
+@search_bp.route("/")
+@login_required
+def global_search():
+    term, types, results = _run_search()
+    return render_template(
+        "search.html",
+        q=term,
+        types=types or [],
+        results=results,
+        index_ready=search_available(),
+    )
+
+
+@search_bp.route("/results.json")
+@login_required
+def global_search_json():
+    term, _types, results = _run_search()
+    return {"q": term, "results": results}